@@ -0,0 +1,207 @@
+"""
+Smart Budget Planner - Multi-account import
+Parses several bank/card exports (CSV files or ZIPs of them) in parallel, tags every row
+with its source account, merges the date-sorted files into one batch, spots transfers
+between the accounts and finds the rows the ledger already has without scanning all of it.
+"""
+
+import io
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from auto_categorizer import categorize_with
+from budget_analytics import CATEGORIES, REQUIRED_COLUMNS, clean_expenses, concat_expenses
+from income_ledger import month_index
+
+# A transfer's two legs are booked at most this many days apart
+TRANSFER_DAYS = 3
+# Wording of money moved between own accounts; a bare "payment" (loan payment, parking payment) is spending
+TRANSFER_WORDS = re.compile(r"\btransfer|\bxfer\b|card payment|payment\W*thank you|autopay payment"
+                            r"|(?:to|from) (?:savings|checking)", re.I)
+DUPLICATE_KEY = ['Date', 'Category', 'Amount', 'Account']
+
+
+def expand_uploads(files):
+    """(name, bytes) of every CSV among `files` ((name, bytes) pairs), unpacking ZIP archives"""
+    expanded = []
+    for name, data in files:
+        if name.lower().endswith('.zip'):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.infolist():
+                    if (not member.is_dir() and member.filename.lower().endswith('.csv')
+                            and not member.filename.startswith('__MACOSX/')):
+                        expanded.append((member.filename, archive.read(member)))
+        else:
+            expanded.append((name, data))
+    return expanded
+
+
+def account_name(file_name):
+    """Account label of an export file: its name without folders or extension"""
+    return Path(file_name).stem.replace('_', ' ').strip()
+
+
+def _days(dates):
+    return pd.to_datetime(dates, errors='coerce', format='mixed').to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def parse_account_file(name, data, categories=CATEGORIES, categorizer=None, currencies=None):
+    """One export validated into ledger rows sorted by date, with its account and outgoing credits.
+
+    Rows get the file's account unless the file has its own Account column. Negative amounts
+    (money coming in) aren't expenses, but are kept as `credits` to match transfers against.
+    Rows in a currency outside `currencies` (when given) are dropped and their codes reported.
+    """
+    raw = pd.read_csv(io.BytesIO(data))
+    if categorizer is not None:
+        raw = categorize_with(categorizer, raw, categories)
+    missing = [col for col in REQUIRED_COLUMNS if col not in raw.columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+
+    account = account_name(name)
+    raw['Account'] = raw['Account'].fillna(account) if 'Account' in raw.columns else account
+    amounts = pd.to_numeric(raw['Amount'], errors='coerce')
+    incoming = raw[amounts < 0]
+    credits = pd.DataFrame({'Day': _days(incoming['Date']), 'Amount': -amounts[amounts < 0].to_numpy(),
+                            'Account': incoming['Account'].astype(str).str.strip().to_numpy()})
+
+    unknown = []
+    if currencies is not None and 'Currency' in raw.columns:
+        unknown = sorted(set(raw['Currency'].dropna().astype(str).str.upper().str.strip()) - set(currencies))
+    expenses = clean_expenses(raw, categories, currencies)
+    days = _days(expenses['Date'])
+    order = np.argsort(days, kind='stable')
+    confidence = raw['Confidence'] if 'Confidence' in raw.columns else pd.Series(dtype=float)
+    return {
+        'file': name,
+        'account': account,
+        'rows': len(raw),
+        'expenses': expenses.iloc[order].reset_index(drop=True),
+        'days': days[order],
+        'credits': credits[credits['Day'] >= 0].reset_index(drop=True),
+        'unknown_currencies': unknown,
+        # Auto-categorized rows as read, for a preview of the predictions
+        'predicted': raw[confidence.notna()] if len(confidence) else raw.iloc[:0],
+    }
+
+
+def parse_files(files, categories=CATEGORIES, categorizer=None, workers=None, currencies=None):
+    """parse_account_file over every file on a thread pool; a file that fails gets an 'error' instead"""
+    def parse(item):
+        name, data = item
+        try:
+            return parse_account_file(name, data, categories, categorizer, currencies)
+        except Exception as exc:
+            return {'file': name, 'account': account_name(name), 'error': str(exc)}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse, files))
+
+
+def merge_sorted(parsed):
+    """All files' rows as one date-ordered batch: (expenses, day numbers, credits).
+
+    Each file is already sorted, so the stable sort below (timsort) only merges the k runs:
+    O(n log k), and rows of the same day keep their file and in-file order.
+    """
+    parsed = [p for p in parsed if 'error' not in p]
+    # A file of only incoming money (e.g. a card's payments) has no expenses but still has credits
+    credits = [p['credits'] for p in parsed if len(p['credits'])]
+    credits = pd.concat(credits, ignore_index=True) if credits else pd.DataFrame(columns=['Day', 'Amount', 'Account'])
+    parsed = [p for p in parsed if len(p['expenses'])]
+    if not parsed:
+        return concat_expenses([]), np.empty(0, dtype=np.int64), credits
+    days = np.concatenate([p['days'] for p in parsed])
+    order = np.argsort(days, kind='stable')
+    merged = concat_expenses([p['expenses'] for p in parsed]).iloc[order].reset_index(drop=True)
+    return merged, days[order], credits
+
+
+def _pairs(left, right, window):
+    """One-to-one matches of equal amounts in different accounts at most `window` days apart,
+    closest dates first (left/right: frames with Row, Day, Cents, Account)"""
+    pairs = left.merge(right, on='Cents', suffixes=('', '_other'))
+    gap = (pairs['Day'] - pairs['Day_other']).abs().to_numpy()
+    # Gap is assigned as an array: assigning a Series to an emptied frame would adopt the
+    # Series' index and add NaN rows (float Row ids) that can't index the counterpart array
+    candidate = (pairs['Account'].to_numpy(dtype=object) != pairs['Account_other'].to_numpy(dtype=object)) \
+        & (gap <= window)
+    pairs = pairs[candidate].assign(Gap=gap[candidate])
+    # Candidates are few (equal amounts days apart), so the greedy pass can be a plain loop
+    used, keep = set(), []
+    for i, row, other in pairs.sort_values(['Gap', 'Row', 'Row_other'])[['Row', 'Row_other']].itertuples():
+        if row not in used and other not in used:
+            used.update((row, other))
+            keep.append(i)
+    return pairs.loc[keep]
+
+
+def detect_transfers(expenses, days, credits, window=TRANSFER_DAYS):
+    """Account each row's money went to when it is one leg of a transfer between the imported
+    accounts ('' for real spending).
+
+    A transfer is an expense matched by the same amount arriving in another account (a credit)
+    within `window` days, or two expenses of the same amount in different accounts where at
+    least one reads like a transfer or card payment; both of those legs are transfers.
+    """
+    counterpart = np.full(len(expenses), '', dtype=object)
+    if expenses.empty or 'Account' not in expenses.columns:
+        return counterpart
+    rows = pd.DataFrame({'Row': np.arange(len(expenses)), 'Day': days,
+                         'Cents': np.round(expenses['Amount'].to_numpy(dtype=float) * 100).astype(np.int64),
+                         'Account': expenses['Account'].astype(str).to_numpy()})
+
+    if len(credits):
+        incoming = pd.DataFrame({'Row': -1 - np.arange(len(credits)), 'Day': credits['Day'].to_numpy(),
+                                 'Cents': np.round(credits['Amount'].to_numpy(dtype=float) * 100).astype(np.int64),
+                                 'Account': credits['Account'].to_numpy()})
+        matched = _pairs(rows, incoming, window)
+        counterpart[matched['Row'].to_numpy()] = matched['Account_other'].to_numpy()
+
+    # Descriptions are dictionary-encoded: match the distinct strings, then expand by code
+    descriptions = expenses['Description']
+    worded = np.asarray(descriptions.cat.categories.astype(str).str.contains(TRANSFER_WORDS))[descriptions.cat.codes]
+    open_rows = rows[counterpart == '']
+    matched = _pairs(open_rows[worded[open_rows['Row']]], open_rows, window)
+    counterpart[matched['Row'].to_numpy()] = matched['Account_other'].to_numpy()
+    counterpart[matched['Row_other'].to_numpy()] = matched['Account'].to_numpy()
+    return counterpart
+
+
+def new_rows(ledger, batch):
+    """Mask of `batch` rows the ledger doesn't already have (same Date, Category, Amount, Account).
+
+    Ledger rows without an account (imported before accounts were tracked) match any account.
+    One vectorized pass over the ledger's Year/Month drops rows outside the batch's months;
+    only the remaining overlap gets the (much costlier) row keys built and compared.
+    """
+    if ledger.empty or batch.empty:
+        return np.ones(len(batch), dtype=bool)
+    batch_months = month_index(batch['Year'].to_numpy(dtype=int), batch['Month'].to_numpy(dtype=int))
+    ledger_months = month_index(ledger['Year'].to_numpy(dtype=int), ledger['Month'].to_numpy(dtype=int))
+    overlap = ledger[(ledger_months >= batch_months.min()) & (ledger_months <= batch_months.max())]
+
+    unassigned = (_accounts(overlap) == '').to_numpy()
+    keys = _keys(batch)
+    seen = keys.isin(_keys(overlap[~unassigned]))
+    if unassigned.any():
+        seen |= keys.droplevel('Account').isin(_keys(overlap[unassigned]).droplevel('Account'))
+    return ~seen
+
+
+def _accounts(frame):
+    if 'Account' not in frame.columns:
+        return pd.Series('', index=frame.index)
+    return frame['Account'].fillna('').astype(str).str.strip()
+
+
+def _keys(frame):
+    return pd.MultiIndex.from_arrays([frame['Date'].astype(str).to_numpy(), frame['Category'].astype(str).to_numpy(),
+                                      frame['Amount'].to_numpy(dtype=float), _accounts(frame).to_numpy()],
+                                     names=DUPLICATE_KEY)
@@ -0,0 +1,113 @@
+"""
+Smart Budget Planner - Description-based auto-categorization
+A hashing-vectorizer + linear classifier trained on the ledger's own
+(Description, Category) pairs, used to fill in categories for imported rows.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+MIN_TRAINING_ROWS = 20
+N_FEATURES = 2 ** 18
+MAX_CACHED_MODELS = 8
+
+_models = OrderedDict()
+# Sessions run on separate threads; fits happen outside the lock, so a race only costs a duplicate fit
+_models_lock = threading.Lock()
+
+
+def _normalize(descriptions):
+    return pd.Series(descriptions, dtype=object).fillna('').astype(str).str.lower().str.strip()
+
+
+class AutoCategorizer:
+    """Predicts a category and a confidence (class probability) for each description"""
+
+    def __init__(self):
+        # Stateless: no vocabulary to fit or store, so transform cost is linear in text length
+        self.vectorizer = HashingVectorizer(n_features=N_FEATURES, ngram_range=(1, 2),
+                                            alternate_sign=False, norm='l2')
+        self.model = SGDClassifier(loss='log_loss', alpha=1e-5, max_iter=20, tol=None, random_state=42)
+
+    def fit(self, descriptions, categories):
+        text = _normalize(descriptions)
+        # Train on distinct pairs; repeated rows only re-weight identical samples
+        pairs = pd.DataFrame({'text': text.to_numpy(), 'category': np.asarray(categories)})
+        counts = pairs.value_counts().reset_index(name='weight')
+        X = self.vectorizer.transform(counts['text'])
+        self.model.fit(X, counts['category'], sample_weight=counts['weight'].to_numpy(dtype=float))
+        return self
+
+    @property
+    def classes(self):
+        return self.model.classes_
+
+    def predict(self, descriptions):
+        """(categories, confidences) arrays, one entry per description"""
+        text = _normalize(descriptions)
+        if text.empty:
+            return np.array([], dtype=object), np.array([])
+        # Bank exports repeat the same merchant strings, so score each distinct one once
+        codes, uniques = pd.factorize(text)
+        proba = self.model.predict_proba(self.vectorizer.transform(uniques))
+        best = proba.argmax(axis=1)
+        return self.classes[best][codes], proba[np.arange(len(uniques)), best][codes]
+
+
+def ledger_fingerprint(expenses):
+    """Content hash of the ledger's (Description, Category) pairs"""
+    if expenses.empty:
+        return 0
+    hashed = pd.util.hash_pandas_object(expenses[['Description', 'Category']], index=False)
+    return int(hashed.sum()) ^ len(expenses)
+
+
+def categorizer_for(expenses):
+    """Trained categorizer for this ledger revision (cached), or None if there is too little data"""
+    if len(expenses) < MIN_TRAINING_ROWS or expenses['Category'].nunique() < 2:
+        return None
+
+    key = ledger_fingerprint(expenses)
+    with _models_lock:
+        if key in _models:
+            _models.move_to_end(key)
+            return _models[key]
+
+    categorizer = AutoCategorizer().fit(expenses['Description'], expenses['Category'])
+    with _models_lock:
+        _models[key] = categorizer
+        while len(_models) > MAX_CACHED_MODELS:
+            _models.popitem(last=False)
+    return categorizer
+
+
+def auto_categorize(raw, expenses, categories):
+    """Copy of `raw` with missing/unknown categories predicted from Description.
+
+    Adds a 'Confidence' column (NaN where the row already had a valid category).
+    Returns `raw` unchanged if there's no Description column or no trainable ledger.
+    """
+    return categorize_with(categorizer_for(expenses), raw, categories)
+
+
+def categorize_with(categorizer, raw, categories):
+    """auto_categorize with an already-trained categorizer (e.g. one lookup for many files)"""
+    if categorizer is None or 'Description' not in raw.columns:
+        return raw
+
+    result = raw.copy()
+    if 'Category' not in result.columns:
+        result['Category'] = None
+    result['Confidence'] = np.nan
+
+    missing = ~result['Category'].isin(categories) & result['Description'].notna()
+    if missing.any():
+        labels, confidence = categorizer.predict(result.loc[missing, 'Description'])
+        result.loc[missing, 'Category'] = labels
+        result.loc[missing, 'Confidence'] = confidence
+    return result
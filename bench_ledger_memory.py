@@ -0,0 +1,84 @@
+"""
+Smart Budget Planner - Ledger memory benchmark
+Compares a synthetic ledger with plain string descriptions against the
+dictionary-encoded (categorical) ledger the app now keeps.
+
+Usage:
+    python bench_ledger_memory.py --rows 1000000 --merchants 5000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from budget_analytics import CATEGORIES, encode_descriptions, merchant_codes
+
+
+def synthetic_ledger(rows, merchants, seed=0):
+    """`rows` expenses whose descriptions repeat `merchants` merchant names (Zipf-like popularity),
+    each seen with a few store-number variants as in bank exports"""
+    rng = np.random.default_rng(seed)
+    letters = np.array(list('abcdefghijklmnopqrstuvwxyz'))
+    merchant_names = {''.join(rng.choice(letters, size=8)).upper() for _ in range(merchants)}
+    names = np.array([f"{name} #{store:04d}" for name in sorted(merchant_names) for store in range(3)] +
+                     [f"{cat} expense" for cat in CATEGORIES], dtype=object)
+    weights = 1 / np.arange(1, len(names) + 1)
+    picks = rng.choice(len(names), size=rows, p=weights / weights.sum())
+    days = rng.integers(0, 3 * 365, size=rows)
+    dates = pd.Timestamp('2023-01-01') + pd.to_timedelta(days, unit='D')
+    return pd.DataFrame({
+        'Year': dates.year,
+        'Month': dates.month,
+        'Date': dates.strftime('%Y-%m-%d'),
+        'Category': np.array(CATEGORIES, dtype=object)[rng.integers(0, len(CATEGORIES), size=rows)],
+        'Amount': rng.gamma(2.0, 30.0, size=rows).round(2),
+        'Description': names[picks],
+    })
+
+
+def _timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def measure(ledger):
+    return {
+        'Description MB': ledger['Description'].memory_usage(deep=True) / 1e6,
+        'Ledger MB': ledger.memory_usage(deep=True).sum() / 1e6,
+        'to_csv s': _timed(lambda: ledger.to_csv(index=False)),
+        'drop_duplicates s': _timed(lambda: ledger.drop_duplicates(subset=['Date', 'Description', 'Amount'])),
+        'groupby Description s': _timed(lambda: ledger.groupby('Description', observed=True)['Amount'].sum()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ledger memory: plain vs dictionary-encoded descriptions")
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--merchants', type=int, default=5000)
+    args = parser.parse_args(argv)
+
+    plain = synthetic_ledger(args.rows, args.merchants).astype({'Description': object})
+    arrow = plain.astype({'Description': 'str'})
+    encode_time = _timed(lambda: encode_descriptions(plain))
+    encoded = encode_descriptions(plain)
+
+    results = {'object': measure(plain), 'str': measure(arrow), 'encoded': measure(encoded)}
+    print(f"{args.rows:,} rows, {encoded['Description'].cat.categories.size:,} distinct descriptions "
+          f"(encoding took {encode_time:.2f}s)")
+    print(f"{'':24}" + "".join(f"{name:>12}" for name in results) + f"{'object/encoded':>16}")
+    for key in results['object']:
+        values = [results[name][key] for name in results]
+        print(f"{key:24}" + "".join(f"{v:12.2f}" for v in values) + f"{values[0] / max(values[-1], 1e-9):15.1f}x")
+
+    start = time.perf_counter()
+    codes, merchants = merchant_codes(encoded)
+    per_merchant = np.bincount(codes, weights=encoded['Amount'].to_numpy(), minlength=len(merchants))
+    print(f"Merchant-level totals for {len(merchants):,} merchants via integer codes: "
+          f"{time.perf_counter() - start:.3f}s (top: {merchants[per_merchant.argmax()]})")
+
+
+if __name__ == "__main__":
+    main()
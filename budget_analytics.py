@@ -0,0 +1,193 @@
+"""
+Smart Budget Planner - Shared analytics helpers
+Pure pandas/numpy calculations used by the Streamlit pages (no UI code here)
+"""
+
+import pandas as pd
+from datetime import datetime
+from pandas.api.types import union_categoricals
+
+from income_ledger import month_index
+from spending_windows import SpendingWindows
+
+CATEGORIES = ['Food', 'Transportation', 'Entertainment', 'Shopping', 'Bills', 'Healthcare', 'Education', 'Other']
+MONTH_NAMES = ['', 'January', 'February', 'March', 'April', 'May', 'June', 
+               'July', 'August', 'September', 'October', 'November', 'December']
+EXPENSE_COLUMNS = ['Year', 'Month', 'Date', 'Category', 'Amount', 'Description']
+# Columns a raw export or ledger file must have; the rest are optional
+REQUIRED_COLUMNS = ['Date', 'Category', 'Amount']
+# Monthly budgets: this share of salary, split across categories
+BUDGET_SHARE = 0.80
+BUDGET_SPLIT = {
+    'Food': 0.30, 'Transportation': 0.15, 'Entertainment': 0.10,
+    'Shopping': 0.10, 'Bills': 0.15, 'Healthcare': 0.05,
+    'Education': 0.02, 'Other': 0.02
+}
+# Emergency fund (home currency) to fill before goals are funded, unless one is configured
+EMERGENCY_FUND_TARGET = 300
+
+
+def clean_expenses(raw, categories=CATEGORIES, currencies=None):
+    """Validate raw (Date, Category, Amount[, Description, Currency, Account]) rows into ledger rows.
+
+    Rows with an unparseable date, an unknown category or a non-positive amount are dropped, and
+    so are rows in a currency outside `currencies` (the rate table's) when it is given.
+    A Currency column is kept (upper-cased) when present; missing currencies mean the home currency.
+    An Account column (the bank or card account a row came from) is kept when present.
+    """
+    dates = pd.to_datetime(raw['Date'], errors='coerce', format='mixed')
+    amounts = pd.to_numeric(raw['Amount'], errors='coerce')
+    valid = dates.notna() & raw['Category'].isin(categories) & (amounts > 0)
+    if currencies is not None and 'Currency' in raw.columns:
+        codes = raw['Currency'].str.upper().str.strip()
+        valid &= codes.isna() | codes.isin(currencies)
+
+    if 'Description' in raw.columns:
+        descriptions = raw['Description'].fillna(raw['Category']).astype(str)
+    else:
+        descriptions = raw['Category'].astype(str)
+
+    cleaned = pd.DataFrame({
+        'Year': dates[valid].dt.year,
+        'Month': dates[valid].dt.month,
+        'Date': raw.loc[valid, 'Date'].astype(str),
+        'Category': raw.loc[valid, 'Category'],
+        'Amount': amounts[valid].astype(float),
+        'Description': descriptions[valid],
+    }, columns=EXPENSE_COLUMNS)
+    if 'Currency' in raw.columns:
+        cleaned['Currency'] = raw.loc[valid, 'Currency'].str.upper().str.strip()
+    if 'Account' in raw.columns:
+        cleaned['Account'] = raw.loc[valid, 'Account'].astype(str).str.strip()
+    return encode_descriptions(cleaned.reset_index(drop=True))
+
+
+def normalize_descriptions(descriptions):
+    """Descriptions with surrounding/repeated whitespace removed (case is kept for display)"""
+    return pd.Series(descriptions).astype(str).str.strip().str.replace(r'\s+', ' ', regex=True)
+
+
+def encode_descriptions(expenses):
+    """Ledger with Description dictionary-encoded as a categorical (each distinct string stored once)"""
+    if isinstance(expenses['Description'].dtype, pd.CategoricalDtype):
+        return expenses
+    encoded = expenses.copy()
+    # Normalize only the distinct strings, then expand through the integer codes
+    codes, uniques = pd.factorize(expenses['Description'].fillna(''))
+    normalized = normalize_descriptions(uniques).to_numpy()
+    categories = pd.unique(normalized)
+    remap = pd.Index(categories).get_indexer(normalized)
+    encoded['Description'] = pd.Categorical.from_codes(remap[codes], categories=categories)
+    return encoded
+
+
+def concat_expenses(frames):
+    """Concatenate ledger pieces keeping Description dictionary-encoded (categories are merged, not re-scanned)"""
+    frames = [encode_descriptions(f) for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=EXPENSE_COLUMNS)
+    if len(frames) == 1:
+        return frames[0].reset_index(drop=True)
+    descriptions = union_categoricals([f['Description'] for f in frames], ignore_order=True)
+    combined = pd.concat([f.drop(columns='Description') for f in frames], ignore_index=True)
+    combined.insert(frames[0].columns.get_loc('Description'), 'Description', descriptions)
+    return combined
+
+
+def append_expenses(ledger, new_rows):
+    """ledger + new_rows with Description kept dictionary-encoded"""
+    if ledger.empty:
+        return encode_descriptions(new_rows).reset_index(drop=True)
+    return concat_expenses([ledger, new_rows])
+
+
+def merchant_key(descriptions):
+    """Lower-case merchant name with digits, punctuation and extra spaces removed"""
+    return (pd.Series(descriptions, dtype=object).fillna('').astype(str).str.lower()
+            .str.replace(r'[^a-z ]+', ' ', regex=True)
+            .str.replace(r'\s+', ' ', regex=True).str.strip())
+
+
+def merchant_codes(expenses):
+    """(integer merchant id per row, merchant names) for cheap merchant-level groupby"""
+    descriptions = encode_descriptions(expenses[['Description']])['Description']
+    # Normalizing the categories (not the rows) keeps this O(distinct descriptions)
+    merchant_of_category, merchants = pd.factorize(merchant_key(descriptions.cat.categories))
+    codes = descriptions.cat.codes.to_numpy()
+    return merchant_of_category[codes], merchants.to_numpy()
+
+
+def default_budgets(salary):
+    """Monthly budget per category for a salary"""
+    return {category: salary * BUDGET_SHARE * pct for category, pct in BUDGET_SPLIT.items()}
+
+
+def monthly_totals(expenses):
+    """Total spending per (Year, Month) with a readable period label"""
+    monthly = expenses.groupby(['Year', 'Month'])['Amount'].sum().reset_index()
+    monthly['Period'] = [f"{MONTH_NAMES[int(m)]} {int(y)}" for y, m in zip(monthly['Year'], monthly['Month'])]
+    return monthly
+
+
+def expense_window(expenses):
+    """First and last month index covered by the expenses"""
+    idx = month_index(expenses['Year'].to_numpy(dtype=int), expenses['Month'].to_numpy(dtype=int))
+    return int(idx.min()), int(idx.max())
+
+
+def monthly_income(salary, income_ledger, now=None):
+    """Income for the current month: all ledger sources, or the salary when no ledger exists"""
+    if income_ledger is None:
+        return salary
+    now = now or datetime.now()
+    return income_ledger.income_for_month(now.year, now.month)
+
+
+def total_income(expenses, salary, income_ledger):
+    """Income over exactly the calendar months the expenses cover"""
+    if expenses.empty:
+        return 0
+    first, last = expense_window(expenses)
+    if income_ledger is not None:
+        return float(income_ledger.income_between(first, last))
+    return salary * (last - first + 1)
+
+
+def accumulated_savings(expenses, salary, income_ledger):
+    """Accumulated savings (income - expenses), never negative"""
+    if expenses.empty or salary <= 0:
+        return 0
+    income = total_income(expenses, salary, income_ledger)
+    return max(0, income - expenses['Amount'].sum())
+
+
+def recent_spending(expenses, days=90, now=None, windows=None):
+    """Average monthly spending over the last `days` days, total and per category.
+
+    Pass the ledger's SpendingWindows to answer from its prefix sums instead of rebuilding them.
+    """
+    if expenses.empty:
+        return 0, pd.Series(dtype=float)
+    windows = windows or SpendingWindows(expenses)
+    return windows.monthly_average(days, now)
+
+
+def savings_snapshot(expenses, salary, income_ledger, emergency_fund_target, now=None, windows=None):
+    """Savings, spending and capacity figures shared by the Goals and AI Insights pages"""
+    savings = accumulated_savings(expenses, salary, income_ledger)
+
+    if not expenses.empty and salary > 0:
+        spending, category_spending = recent_spending(expenses, now=now, windows=windows)
+        capacity = max(0, monthly_income(salary, income_ledger, now) - spending)
+    else:
+        spending, category_spending = 0, pd.Series(dtype=float)
+        capacity = salary * 0.20
+
+    return {
+        'calculated_savings': savings,
+        'recent_spending': spending,
+        'category_spending': category_spending,
+        'monthly_savings_capacity': capacity,
+        'available_for_goals': max(0, savings - emergency_fund_target),
+        'emergency_shortfall': max(0, emergency_fund_target - savings),
+    }
@@ -0,0 +1,297 @@
+"""
+Smart Budget Planner - Local analytics API
+Serves the Dashboard, Analysis, Goals and AI Insights numbers for one ledger file as
+JSON over HTTP/1.1 (keep-alive), with revision-based ETags and a cap on concurrent ML fits.
+
+Usage:
+    python budget_api.py expenses.csv --salary 4000 --goals goals.json --port 8765
+    curl http://127.0.0.1:8765/categories
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+from datetime import date
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from budget_analytics import EMERGENCY_FUND_TARGET, monthly_totals, savings_snapshot
+from budget_batch import load_ledger
+from fx_rates import FX_RATES_PATH, HOME_CURRENCY, load_fx_table
+from goal_optimizer import solve_goal_plan
+from goal_store import GoalStore
+from ml_insights import MIN_ANOMALY_ROWS, MIN_PREDICTION_ROWS, detect_anomalies, predict_next_month
+
+ML_ENDPOINTS = ('/predictions', '/anomalies')
+
+
+class BadRequest(ValueError):
+    """A query parameter an endpoint can't use; answered with 400 Bad Request"""
+
+
+def _count_param(query, name, default):
+    """Non-negative integer query parameter `name`, or `default` when it is absent"""
+    if name not in query:
+        return default
+    try:
+        value = int(query[name])
+    except ValueError:
+        raise BadRequest(f"{name} must be a non-negative integer, got {query[name]!r}") from None
+    if value < 0:
+        raise BadRequest(f"{name} must be a non-negative integer, got {value}")
+    return value
+
+
+def _finite(value):
+    """`value` with inf/NaN floats (e.g. an unfunded goal's End Month) as None, which JSON can carry"""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_finite(item) for item in value]
+    return value
+
+
+def _json_default(value):
+    if isinstance(value, pd.DataFrame):
+        return _finite(value.to_dict('records'))
+    if isinstance(value, pd.Series):
+        return _finite(value.to_dict())
+    if isinstance(value, np.generic):
+        return _finite(value.item())
+    if isinstance(value, np.ndarray):
+        return _finite(value.tolist())
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+class LedgerSource:
+    """A ledger file reloaded whenever it or the FX rate table changes; `revision` identifies its contents.
+
+    Amounts are served in the home currency; rows the rate table can't price are dropped on load.
+    """
+
+    def __init__(self, path, salary=None, emergency_fund_target=None, goals=None, fx_rates=None):
+        self.path = Path(path)
+        self.fx_rates = fx_rates
+        self.salary = salary
+        self.emergency_fund_target = emergency_fund_target if emergency_fund_target is not None \
+            else EMERGENCY_FUND_TARGET
+        self.goals = GoalStore(goals or ())
+        self._lock = threading.Lock()
+        self._revision = None
+        self._expenses = None
+
+    def current(self):
+        """(revision, expenses), reloading the file if its mtime or size (or the rate table) changed.
+
+        Savings and goal plans count months from today, so the revision also changes every month.
+        """
+        stat = os.stat(self.path)
+        table = load_fx_table(self.fx_rates)
+        revision = f"{stat.st_mtime_ns:x}-{stat.st_size:x}-{table.version if table is not None else HOME_CURRENCY}"
+        with self._lock:
+            if revision != self._revision:
+                self._expenses = load_ledger(self.path, table)
+                self._revision = revision
+            return f"{self._revision}-{date.today():%Y%m}", self._expenses
+
+
+class AnalyticsService:
+    """Endpoint computations, cached per (ledger revision, path, query)"""
+
+    def __init__(self, source, ml_concurrency=2, ml_wait=30.0):
+        self.source = source
+        self.ml_slots = threading.BoundedSemaphore(ml_concurrency)
+        self.ml_wait = ml_wait
+        self._cache = {}
+        self._cache_revision = None
+        self._key_locks = {}
+        self._lock = threading.Lock()
+        self.routes = {
+            '/health': self.health,
+            '/categories': self.categories,
+            '/monthly': self.monthly,
+            '/savings': self.savings,
+            '/goals': self.goal_plan,
+            '/predictions': self.predictions,
+            '/anomalies': self.anomalies,
+        }
+
+    def revision(self):
+        return self.source.current()[0]
+
+    def get(self, path, query):
+        """(revision, payload) for an endpoint; None when the ML slots stay busy past `ml_wait`"""
+        revision, expenses = self.source.current()
+        key = (path, tuple(sorted(query.items())))
+
+        with self._lock:
+            if revision != self._cache_revision:
+                self._cache.clear()
+                self._key_locks.clear()
+                self._cache_revision = revision
+            if key in self._cache:
+                return revision, self._cache[key]
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Concurrent requests for the same key wait for one computation
+        with key_lock:
+            with self._lock:
+                if self._cache_revision == revision and key in self._cache:
+                    return revision, self._cache[key]
+
+            if path in ML_ENDPOINTS:
+                if not self.ml_slots.acquire(timeout=self.ml_wait):
+                    return revision, None
+                try:
+                    payload = self.routes[path](expenses, query)
+                finally:
+                    self.ml_slots.release()
+            else:
+                payload = self.routes[path](expenses, query)
+
+            with self._lock:
+                if self._cache_revision == revision:
+                    self._cache[key] = payload
+            return revision, payload
+
+    # Endpoints
+
+    def health(self, expenses, query):
+        return {'status': 'ok', 'rows': len(expenses)}
+
+    def categories(self, expenses, query):
+        """Dashboard category totals"""
+        totals = expenses.groupby('Category')['Amount'].sum().sort_values(ascending=False)
+        return {'currency': HOME_CURRENCY, 'total': float(totals.sum()),
+                'categories': [{'Category': c, 'Amount': float(a)} for c, a in totals.items()]}
+
+    def monthly(self, expenses, query):
+        """Analysis monthly trend"""
+        return {'months': monthly_totals(expenses)}
+
+    def savings(self, expenses, query):
+        """Goals page savings snapshot"""
+        if not self.source.salary:
+            return {'error': 'no salary configured'}
+        return savings_snapshot(expenses, self.source.salary, None, self.source.emergency_fund_target)
+
+    def goal_plan(self, expenses, query):
+        """Optimizer schedule and category cuts for the configured goals"""
+        if not self.source.salary:
+            return {'error': 'no salary configured'}
+        snapshot = savings_snapshot(expenses, self.source.salary, None, self.source.emergency_fund_target)
+        return solve_goal_plan(self.source.goals, snapshot['category_spending'],
+                               snapshot['monthly_savings_capacity'], snapshot['calculated_savings'],
+                               self.source.emergency_fund_target)
+
+    def predictions(self, expenses, query):
+        if len(expenses) < MIN_PREDICTION_ROWS:
+            return {'error': f'need at least {MIN_PREDICTION_ROWS} expenses'}
+        year, month, pred_df = predict_next_month(expenses)
+        return {'year': year, 'month': month, 'predictions': pred_df,
+                'total': float(pred_df['Predicted Amount'].sum())}
+
+    def anomalies(self, expenses, query):
+        limit = _count_param(query, 'limit', 100)
+        if len(expenses) < MIN_ANOMALY_ROWS:
+            return {'error': f'need at least {MIN_ANOMALY_ROWS} expenses'}
+        found = detect_anomalies(expenses)
+        return {'analyzed': len(expenses), 'found': len(found),
+                'anomalies': found[['Date', 'Category', 'Amount', 'Description']].head(limit)}
+
+
+class AnalyticsHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections open between requests
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; Nagle would delay the body ~40ms on keep-alive
+    disable_nagle_algorithm = True
+    server_version = 'BudgetAPI/1.0'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        service = self.server.service
+        if url.path not in service.routes:
+            return self._send_json(HTTPStatus.NOT_FOUND, {'error': f'unknown endpoint {url.path}'})
+
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        etag = f'"{service.revision()}"'
+        if self.headers.get('If-None-Match') == etag:
+            return self._send_json(HTTPStatus.NOT_MODIFIED, None, etag)
+
+        try:
+            revision, payload = service.get(url.path, query)
+        except BadRequest as e:
+            return self._send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+        except Exception as e:
+            return self._send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {'error': str(e)})
+        if payload is None:
+            return self._send_json(HTTPStatus.SERVICE_UNAVAILABLE, {'error': 'ML workers busy'},
+                                   extra={'Retry-After': '1'})
+        self._send_json(HTTPStatus.OK, payload, f'"{revision}"')
+
+    def _send_json(self, status, payload, etag=None, extra=None):
+        body = b'' if payload is None else json.dumps(_finite(payload), default=_json_default, allow_nan=False).encode()
+        self.send_response(status)
+        if payload is not None:
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+def make_server(source, host='127.0.0.1', port=8765, ml_concurrency=2, verbose=False):
+    """Bound (not yet serving) API server; port=0 picks a free port"""
+    server = ThreadingHTTPServer((host, port), AnalyticsHandler)
+    server.daemon_threads = True
+    server.service = AnalyticsService(source, ml_concurrency)
+    server.verbose = verbose
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve budget analytics for a ledger file as JSON")
+    parser.add_argument('ledger', help="expense CSV or Parquet file")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--salary', type=float, default=None, help="monthly salary for savings and goals")
+    parser.add_argument('--emergency-target', type=float, default=None,
+                        help=f"emergency fund target (default: {EMERGENCY_FUND_TARGET})")
+    parser.add_argument('--goals', default=None, help="JSON file with a list of goals")
+    parser.add_argument('--fx-rates', default=FX_RATES_PATH,
+                        help=f"FX rate table for converting amounts to {HOME_CURRENCY} (default: %(default)s)")
+    parser.add_argument('--ml-concurrency', type=int, default=2, help="max concurrent ML fits")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args(argv)
+
+    goals = json.loads(Path(args.goals).read_text()) if args.goals else []
+    source = LedgerSource(args.ledger, args.salary, args.emergency_target, goals, args.fx_rates)
+    server = make_server(source, args.host, args.port, args.ml_concurrency, args.verbose)
+    print(f"Serving {args.ledger} on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
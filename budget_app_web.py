@@ -10,9 +10,34 @@ import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
+import functools
+import os
 import random
-from sklearn.ensemble import RandomForestRegressor, IsolationForest
-from sklearn.preprocessing import LabelEncoder
+import time
+
+from budget_analytics import (CATEGORIES, MONTH_NAMES, total_income, monthly_income, accumulated_savings,
+                              append_expenses, BUDGET_SHARE, EMERGENCY_FUND_TARGET, default_budgets)
+from budget_tracker import BudgetTracker
+from income_ledger import IncomeLedger, month_index
+from goal_optimizer import DEFAULT_FLOOR_PCT, solve_goal_plan
+from goal_store import PRIORITIES, Goal, GoalStore, months_until
+from scenario_sweep import pct_range, sweep
+from savings_forecast import forecast_goals
+from auto_categorizer import categorizer_for
+from account_import import DUPLICATE_KEY, detect_transfers, expand_uploads, merge_sorted, new_rows, parse_files
+from fx_rates import FX_RATES_PATH, HOME_CURRENCY, convert_ledger, currency_symbol, format_money, load_fx_table
+from ledger_archive import HOT_MONTHS, LedgerArchive, split_hot_cold
+from ledger_journal import LedgerJournal
+from recurring_charges import fixed_monthly_outflow, project_occurrences
+from quantile_sketch import MIN_SKETCH_COUNT, UNUSUAL_QUANTILE, AmountSketches
+from search_index import DescriptionIndex, match_summary
+from spending_windows import WINDOWS
+from seasonal_predictor import SEASONAL_TIPS, get_season
+from ml_insights import MIN_ANOMALY_ROWS, MIN_PREDICTION_ROWS
+from cache_warmer import CacheWarmer, LedgerArtifacts
+from profiling import PROCESS_PROFILER, Profiler, section, to_json, to_prometheus
+
+run_start = time.perf_counter()
 
 # Page configuration
 st.set_page_config(
@@ -287,33 +312,264 @@ if 'salary' not in st.session_state:
 if 'budgets' not in st.session_state:
     st.session_state.budgets = {}
 if 'goals' not in st.session_state:
-    st.session_state.goals = []
-if 'salary_history' not in st.session_state:
-    st.session_state.salary_history = {}
+    st.session_state.goals = GoalStore()
+if 'editing_goals' not in st.session_state:
+    # IDs of goals whose edit form is open
+    st.session_state.editing_goals = set()
+if 'income_ledger' not in st.session_state:
+    st.session_state.income_ledger = None
 if 'emergency_fund_target' not in st.session_state:
-    st.session_state.emergency_fund_target = 300
+    st.session_state.emergency_fund_target = EMERGENCY_FUND_TARGET
+if 'rerun_stats' not in st.session_state:
+    st.session_state.rerun_stats = {'full_runs': 0, 'fragment_runs': 0, 'full_ms': [], 'fragment_ms': [],
+                                    'last_fragment': None, 'in_full_run': False}
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = Profiler()
+if 'archive' not in st.session_state:
+    # Cold tier: months older than the hot window, memory-mapped from disk once archived
+    st.session_state.archive = None
+if 'cache_warmer' not in st.session_state:
+    # Refills the derived-data cache on the shared background threads after each data change
+    st.session_state.cache_warmer = CacheWarmer()
+if 'journal' not in st.session_state:
+    # Undo/redo history of expenses and goals
+    st.session_state.journal = LedgerJournal(st.session_state.expenses, st.session_state.goals)
+if 'budget_tracker' not in st.session_state or not st.session_state.budget_tracker.is_current():
+    # Month-to-date totals; rebuilt from the ledger only when a new month starts
+    st.session_state.budget_tracker = BudgetTracker.from_ledger(
+        convert_ledger(st.session_state.expenses, load_fx_table(FX_RATES_PATH), HOME_CURRENCY))
+if 'amount_sketches' not in st.session_state:
+    # Quantile sketches of expense sizes per (category, month), updated as expenses arrive
+    st.session_state.amount_sketches = AmountSketches.from_ledger(
+        convert_ledger(st.session_state.expenses, load_fx_table(FX_RATES_PATH), HOME_CURRENCY))
+if 'description_index' not in st.session_state:
+    # Token -> row ids over descriptions; appended rows are indexed on the next search
+    st.session_state.description_index = DescriptionIndex()
 
-# Constants
-CATEGORIES = ['Food', 'Transportation', 'Entertainment', 'Shopping', 'Bills', 'Healthcare', 'Education', 'Other']
-MONTH_NAMES = ['', 'January', 'February', 'March', 'April', 'May', 'June', 
-               'July', 'August', 'September', 'October', 'November', 'December']
+st.session_state.rerun_stats['full_runs'] += 1
+st.session_state.rerun_stats['in_full_run'] = True
 
 # Helper functions
-def generate_salary_history(base_salary):
-    """Generate 24-month salary history"""
-    salary_history = {}
-    for months_ago in range(23, -1, -1):
-        date = datetime.now() - timedelta(days=months_ago * 30)
-        year = date.year
-        month = date.month
-        
-        years_back = (datetime.now().year - year) + (1 if datetime.now().month < 8 and month >= 8 else 0)
-        hist_salary = base_salary / (1.15 ** years_back)
-        
-        month_key = f"{year}-{month:02d}"
-        salary_history[month_key] = hist_salary
-    
-    return salary_history
+def profiled(name):
+    """Time a section for both this session's and the process-wide profiler"""
+    return section(name, st.session_state.profiler)
+
+def counted_fragment(func):
+    """st.fragment that records its own partial reruns for the rerun monitor"""
+    @functools.wraps(func)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats = st.session_state.rerun_stats
+            if not stats['in_full_run']:
+                stats['fragment_runs'] += 1
+                stats['fragment_ms'] = (stats['fragment_ms'] + [(time.perf_counter() - start) * 1000])[-50:]
+                stats['last_fragment'] = func.__name__
+    return st.fragment(timed)
+
+def update_emergency_target():
+    """Form callback: apply the new emergency target before the page reruns"""
+    st.session_state.emergency_fund_target = st.session_state.emergency_target_input
+    st.toast(f"✓ Emergency target updated to {home_money(st.session_state.emergency_fund_target)}")
+
+def set_goal_editing(goal_id, editing):
+    """Button callback: open or close the edit form of a goal"""
+    st.session_state.editing_goals = st.session_state.editing_goals - {goal_id} | ({goal_id} if editing else set())
+
+def delete_goal(goal_id):
+    """Button callback: remove a goal"""
+    goal = st.session_state.goals.get(goal_id)
+    st.session_state.goals = st.session_state.goals.remove(goal_id)
+    st.session_state.journal.set_goals(st.session_state.goals, f"Delete goal: {goal.name}")
+    set_goal_editing(goal_id, False)
+    st.toast(f"✓ Deleted: {goal.name} (undo from the sidebar)")
+
+def save_goal(goal_id):
+    """Form callback: store the edited values of a goal"""
+    new_name = st.session_state[f'edit_name_{goal_id}']
+    new_year = st.session_state[f'edit_year_{goal_id}']
+    new_month = st.session_state[f'edit_month_{goal_id}']
+    
+    if months_until(new_year, new_month) > 0:
+        st.session_state.goals = st.session_state.goals.update(
+            goal_id, name=new_name, target_amount=float(st.session_state[f'edit_amount_{goal_id}']),
+            target_year=int(new_year), target_month=int(new_month),
+            priority=st.session_state[f'edit_priority_{goal_id}'])
+        st.session_state.journal.set_goals(st.session_state.goals, f"Edit goal: {new_name}")
+        set_goal_editing(goal_id, False)
+        st.toast(f"✓ Updated: {new_name}")
+    else:
+        st.toast("Target date must be in the future!")
+
+def fx_table():
+    """Today's FX rate table, or None when no rate file is available"""
+    return load_fx_table(FX_RATES_PATH)
+
+def display_currency():
+    return st.session_state.get('display_currency', HOME_CURRENCY)
+
+def plan_inputs():
+    """Inputs of the savings snapshot and goal plan, with the artifact variants they map to"""
+    income = st.session_state.income_ledger
+    floor_pct = {cat: st.session_state.get(f"floor_{cat}", int(DEFAULT_FLOOR_PCT.get(cat, 0) * 100)) / 100
+                 for cat in CATEGORIES}
+    plan = {'salary': st.session_state.salary, 'income_ledger': income,
+            'emergency_fund_target': st.session_state.emergency_fund_target,
+            'goals': st.session_state.goals, 'floor_pct': floor_pct}
+    savings_key = (st.session_state.salary, st.session_state.emergency_fund_target,
+                   None if income is None else (income.start, income.monthly_totals().tobytes()))
+    return plan, savings_key, (savings_key, st.session_state.goals.goals, tuple(floor_pct.items()))
+
+def ledger_artifacts():
+    """Derived data of the current ledger, rate table and plan; the cache starts over when the ledger changes"""
+    expenses, table = st.session_state.expenses, fx_table()
+    # The journal numbers every ledger change; ids of dropped frames can be reused
+    revision = (st.session_state.journal.ledger_revision, table.version if table is not None else None)
+    cache = st.session_state.get('artifact_cache')
+    if cache is None or cache['revision'] != revision:
+        cache = st.session_state.artifact_cache = {'revision': revision}
+    return LedgerArtifacts(cache, expenses, table, st.session_state.archive,
+                           (st.session_state.profiler,), plan_inputs()[0])
+
+def home_expenses():
+    """The ledger with every amount in the home currency (the ledger itself if it's single-currency)"""
+    return ledger_artifacts().get('ledger', HOME_CURRENCY)
+
+def home_history():
+    """Full-history amounts in the home currency, for totals and savings that span archived months"""
+    return ledger_artifacts().history(HOME_CURRENCY)
+
+def spending_summary(currency=None):
+    """Total, count, category and monthly totals in `currency`; re-pricing reuses the ledger rollup"""
+    return ledger_artifacts().get('summary', currency or display_currency())
+
+def savings():
+    """Savings snapshot for the current salary, income and emergency fund target"""
+    return ledger_artifacts().get('savings', plan_inputs()[1])
+
+def money(amount, currency=None, decimals=2):
+    return format_money(amount, currency or display_currency(), decimals)
+
+def display_rate():
+    """Display-currency units per home-currency unit at today's rate"""
+    table, currency = fx_table(), display_currency()
+    if table is None or currency == HOME_CURRENCY:
+        return 1.0
+    return float(table.factors([HOME_CURRENCY], None, currency)[0])
+
+def home_to_display(amount):
+    """Convert a home-currency figure (salary, savings) at today's rate"""
+    return amount * display_rate()
+
+def home_money(amount, decimals=2):
+    """A home-currency figure (budget, goal, plan) formatted in the display currency"""
+    return money(home_to_display(amount), decimals=decimals)
+
+def money_column(label=None):
+    """Number column for amounts already converted to the display currency"""
+    return st.column_config.NumberColumn(label, format=f"{currency_symbol(display_currency())}%.2f")
+
+def spending_windows(currency=HOME_CURRENCY):
+    """Prefix-sum windows over the ledger in `currency`, built once per ledger"""
+    return ledger_artifacts().get('windows', currency)
+
+def recurring_charges():
+    """(series, per-row series id) for the current ledger, re-detected only when it changes"""
+    return ledger_artifacts().get('recurring')
+
+def description_index():
+    """Search index over the in-memory ledger, after indexing any rows appended since the last search"""
+    return st.session_state.description_index.extend(st.session_state.expenses)
+
+def warm_caches():
+    """Post-run hook: warm what the other pages derive from this revision in the background"""
+    rows = len(st.session_state.expenses)
+    if not rows:
+        return
+    artifacts = ledger_artifacts()
+    _, savings_key, plan_key = plan_inputs()
+    currency = display_currency()
+    keys = [('ledger', HOME_CURRENCY), ('rollup', None), ('summary', currency), ('summary', HOME_CURRENCY),
+            ('windows', HOME_CURRENCY), ('windows', currency), ('seasonal_views', currency),
+            ('recurring', None), ('savings', savings_key)]
+    if st.session_state.goals:
+        keys.append(('goal_plan', plan_key))
+    # Model fits are only warmed for sessions that have asked for them once
+    if rows >= MIN_PREDICTION_ROWS and st.session_state.get('used_predictions'):
+        keys += [('seasonal_prediction', None), ('predictions', None)]
+    if rows >= MIN_ANOMALY_ROWS and st.session_state.get('used_anomalies'):
+        keys.append(('anomalies', None))
+    st.session_state.cache_warmer.schedule((artifacts.cache['revision'], plan_key, currency), artifacts, keys)
+
+def apply_tiering():
+    """Move months older than the hot window to the archive (when tiering is on)"""
+    expenses = st.session_state.expenses
+    if not st.session_state.get('tiering') or expenses.empty:
+        return
+    hot, cold = split_hot_cold(expenses, st.session_state.get('hot_months', HOT_MONTHS))
+    if cold.empty:
+        return
+    with profiled("archive_cold"):
+        if st.session_state.archive is None:
+            st.session_state.archive = LedgerArchive.create()
+        st.session_state.archive.append(cold)
+    st.session_state.expenses = hot.reset_index(drop=True)
+    st.session_state.description_index = DescriptionIndex()
+    # Older versions would keep the archived rows resident, so undo history starts over
+    st.session_state.journal = LedgerJournal(st.session_state.expenses, st.session_state.goals)
+    st.toast(f"🗄️ Archived {len(cold):,} expenses older than {st.session_state.get('hot_months', HOT_MONTHS)} months")
+
+def rebuild_amount_sketches():
+    """Sketches of the in-memory ledger, keeping those of archived months (their rows aren't resident)"""
+    sketches = AmountSketches.from_ledger(convert_ledger(st.session_state.expenses, fx_table(), HOME_CURRENCY))
+    archive = st.session_state.archive
+    if archive is not None and archive.rows:
+        rollup = archive.rollup
+        last_archived = month_index(rollup['Year'].to_numpy(dtype=int), rollup['Month'].to_numpy(dtype=int)).max()
+        sketches.merge(st.session_state.amount_sketches.between(last_month=int(last_archived)))
+    st.session_state.amount_sketches = sketches
+
+def delete_all_expenses():
+    """Button callback: empty the ledger before the page reruns"""
+    st.session_state.expenses = pd.DataFrame(columns=['Year', 'Month', 'Date', 'Category', 'Amount', 'Description'])
+    st.session_state.journal.replace(st.session_state.expenses, "Delete all expenses")
+    st.session_state.budget_tracker = BudgetTracker.from_ledger(st.session_state.expenses)
+    rebuild_amount_sketches()
+    st.session_state.description_index = DescriptionIndex()
+    st.toast("✓ All expenses deleted! (undo from the sidebar)")
+
+def load_journal_version():
+    """Put the journal's current version back into the session"""
+    journal = st.session_state.journal
+    st.session_state.expenses = journal.expenses()
+    st.session_state.goals = GoalStore(journal.current.goals)
+    st.session_state.budget_tracker = BudgetTracker.from_ledger(
+        convert_ledger(st.session_state.expenses, fx_table(), HOME_CURRENCY))
+    rebuild_amount_sketches()
+    # Row ids of the restored version don't line up with the old index
+    st.session_state.description_index = DescriptionIndex()
+
+def undo_change():
+    """Button callback: step back one change"""
+    label = st.session_state.journal.current.label
+    st.session_state.journal.undo()
+    load_journal_version()
+    st.toast(f"↩️ Undone: {label}")
+
+def redo_change():
+    """Button callback: re-apply the next change"""
+    st.session_state.journal.redo()
+    load_journal_version()
+    st.toast(f"↪️ Redone: {st.session_state.journal.current.label}")
+
+def restore_version():
+    """Button callback: restore the version picked in the history panel"""
+    step = st.session_state.history_step
+    st.session_state.journal.restore(step)
+    load_journal_version()
+    st.toast(f"✓ Restored step {step}")
 
 def generate_sample_data():
     """Generate sample expenses for testing"""
@@ -343,67 +599,28 @@ def generate_sample_data():
                 'Amount': amount,
                 'Description': f"{category} expense"
             })
+        
+        # Recurring bills and subscriptions
+        for category, description, share, day in [('Bills', 'Rent', 0.6, 1), ('Entertainment', 'Streaming subscription', 0.1, 15)]:
+            expenses.append({
+                'Year': year,
+                'Month': month,
+                'Date': f"{year}-{month:02d}-{day:02d}",
+                'Category': category,
+                'Amount': round(st.session_state.budgets.get(category, 100) * share, 2),
+                'Description': description
+            })
     
     new_df = pd.DataFrame(expenses)
-    st.session_state.expenses = pd.concat([st.session_state.expenses, new_df], ignore_index=True)
+    st.session_state.expenses = append_expenses(st.session_state.expenses, new_df)
+    st.session_state.journal.append(new_df, "Generate sample data", expenses=st.session_state.expenses)
+    st.session_state.budget_tracker.add_frame(new_df)
+    st.session_state.amount_sketches.add_frame(new_df)
     st.success(f"✓ Generated {len(expenses)} sample expenses for last 6 months!")
 
-# Header with brand colors
-st.markdown("""
-<div style='background: linear-gradient(135deg, #FFD706 0%, #FFC107 100%); 
-            padding: 35px; border-radius: 15px; margin-bottom: 30px;
-            box-shadow: 0 6px 12px rgba(255, 215, 6, 0.4);'>
-    <h1 style='color: #000000; margin: 0; font-size: 42px; font-weight: 800;'>💰 Smart Budget Planner</h1>
-    <p style='color: #000000; font-size: 20px; margin: 10px 0 0 0; font-weight: 600;'>
-        AI-Powered Personal Finance Manager
-    </p>
-</div>
-""", unsafe_allow_html=True)
-
-# Sidebar navigation with improved styling
-with st.sidebar:
-    st.markdown("<br><br>", unsafe_allow_html=True)
-    
-    # Navigation menu with modern button-style radio buttons
-    page = st.radio(
-        "Select Page",
-        [
-            "📊 Dashboard",
-            "⚙️ Setup",
-            "💳 Expenses",
-            "📈 Analysis",
-            "🎯 Goals",
-            "🤖 AI Insights"
-        ],
-        label_visibility="collapsed"
-    )
-    
-    st.markdown("---")
-    
-    # Quick stats in sidebar
-    if st.session_state.salary > 0:
-        st.metric("Monthly Salary", f"${st.session_state.salary:,.2f}")
-    
-    if not st.session_state.expenses.empty:
-        total_expenses = st.session_state.expenses['Amount'].sum()
-        st.metric("Total Expenses", f"${total_expenses:,.2f}")
-        
-        if st.session_state.salary > 0:
-            # Calculate income from salary history or current salary
-            total_income = 0
-            if st.session_state.salary_history:
-                total_income = sum(st.session_state.salary_history.values())
-            else:
-                months = len(st.session_state.expenses['Month'].unique())
-                total_income = st.session_state.salary * months
-            
-            savings = max(0, total_income - total_expenses)  # Never negative
-            st.metric("Total Savings", f"${savings:,.2f}")
-    
-    st.metric("Active Goals", len(st.session_state.goals))
-
-# Main content based on selected page
-if page == "📊 Dashboard":
+# Pages
+def render_dashboard():
+    """Dashboard: key metrics, charts and budget vs actual"""
     st.header("📊 Dashboard Overview")
     
     if st.session_state.expenses.empty:
@@ -412,36 +629,33 @@ if page == "📊 Dashboard":
         # Key metrics
         col1, col2, col3, col4 = st.columns(4)
         
-        total_expenses = st.session_state.expenses['Amount'].sum()
-        avg_expense = st.session_state.expenses['Amount'].mean()
-        transaction_count = len(st.session_state.expenses)
+        summary = spending_summary()
+        total_expenses = summary['total']
+        transaction_count = summary['count']
+        avg_expense = total_expenses / transaction_count
         months_tracked = len(st.session_state.expenses['Month'].unique())
         
         with col1:
-            st.metric("Total Spent", f"${total_expenses:,.2f}", 
+            st.metric("Total Spent", money(total_expenses), 
                      f"{transaction_count} transactions")
         
         with col2:
-            st.metric("Avg Transaction", f"${avg_expense:.2f}",
+            st.metric("Avg Transaction", money(avg_expense),
                      f"{months_tracked} months tracked")
         
         with col3:
             if st.session_state.salary > 0:
-                # Calculate income based on salary history (realistic calculation)
-                total_income = 0
-                if st.session_state.salary_history:
-                    # Use actual salary history
-                    total_income = sum(st.session_state.salary_history.values())
-                else:
-                    # Fallback: assume current salary for tracked months
-                    total_income = st.session_state.salary * months_tracked
+                # Income from salary history, or current salary for tracked months
+                income = total_income(home_history(), st.session_state.salary,
+                                      st.session_state.income_ledger)
                 
-                savings = max(0, total_income - total_expenses)  # Never show negative savings
-                savings_rate = (savings / total_income) * 100 if total_income > 0 else 0
-                st.metric("Total Savings", f"${savings:,.2f}",
+                home_spent = spending_summary(HOME_CURRENCY)['total']
+                savings = max(0, income - home_spent)  # Never show negative savings
+                savings_rate = (savings / income) * 100 if income > 0 else 0
+                st.metric("Total Savings", money(home_to_display(savings)),
                          f"{savings_rate:.1f}% rate")
             else:
-                st.metric("Total Savings", "$0", "Set salary first")
+                st.metric("Total Savings", money(0), "Set salary first")
         
         with col4:
             st.metric("Active Goals", len(st.session_state.goals),
@@ -450,61 +664,91 @@ if page == "📊 Dashboard":
         st.markdown("---")
         
         # Charts
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.subheader("Category Breakdown")
-            category_totals = st.session_state.expenses.groupby('Category')['Amount'].sum()
-            fig = px.pie(values=category_totals.values, names=category_totals.index,
-                        color_discrete_sequence=px.colors.qualitative.Set3)
-            fig.update_traces(textposition='inside', textinfo='percent+label')
-            st.plotly_chart(fig, use_container_width=True)
+        with profiled("dashboard_charts"):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                st.subheader("Category Breakdown")
+                category_totals = summary['category_totals']
+                fig = px.pie(values=category_totals.values, names=category_totals.index,
+                            color_discrete_sequence=px.colors.qualitative.Set3)
+                fig.update_traces(textposition='inside', textinfo='percent+label')
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with col2:
+                st.subheader("Monthly Spending Trend")
+                monthly = summary['monthly'].copy()
+                monthly['Period'] = monthly.apply(lambda x: f"{MONTH_NAMES[int(x['Month'])]} {int(x['Year'])}", axis=1)
+                
+                fig = px.line(monthly, x='Period', y='Amount', markers=True)
+                fig.update_traces(line_color='#4CAF50', line_width=3, marker=dict(size=10))
+                fig.update_layout(xaxis_title="Month", yaxis_title=f"Amount ({display_currency()})")
+                st.plotly_chart(fig, use_container_width=True)
         
-        with col2:
-            st.subheader("Monthly Spending Trend")
-            monthly = st.session_state.expenses.groupby(['Year', 'Month'])['Amount'].sum().reset_index()
-            monthly['Period'] = monthly.apply(lambda x: f"{MONTH_NAMES[int(x['Month'])]} {int(x['Year'])}", axis=1)
+        # Budget vs actual for the current month (read from the running tracker)
+        if st.session_state.budgets:
+            st.markdown("---")
+            tracker = st.session_state.budget_tracker
+            st.subheader(f"🎯 Budget vs Actual - {MONTH_NAMES[tracker.month]} {tracker.year}")
             
-            fig = px.line(monthly, x='Period', y='Amount', markers=True)
-            fig.update_traces(line_color='#4CAF50', line_width=3, marker=dict(size=10))
-            fig.update_layout(xaxis_title="Month", yaxis_title="Amount ($)")
-            st.plotly_chart(fig, use_container_width=True)
+            budget_status = tracker.status(st.session_state.budgets)
+            for row in budget_status:
+                if row['Alert'] == 'over':
+                    st.error(f"🚨 {row['Category']}: {home_money(row['Spent'])} spent, already over the {home_money(row['Budget'])} budget!")
+                elif row['Alert'] == 'on pace to exceed':
+                    st.warning(f"⚠️ {row['Category']}: on pace for {home_money(row['Projected'])} this month (budget {home_money(row['Budget'])})")
+            
+            status_df = pd.DataFrame(budget_status)
+            status_df['Used %'] = status_df['Used %'].clip(upper=100)
+            status_df[['Budget', 'Spent', 'Projected']] *= display_rate()
+            st.dataframe(
+                status_df, use_container_width=True, hide_index=True,
+                column_config={
+                    'Budget': money_column(),
+                    'Spent': money_column(),
+                    'Projected': money_column("Projected (month end)"),
+                    'Used %': st.column_config.ProgressColumn("Budget Used", format="%.0f%%", min_value=0, max_value=100),
+                }
+            )
 
-elif page == "⚙️ Setup":
+
+def render_setup():
+    """Setup: salary, category budgets and income sources"""
     st.header("⚙️ Salary & Budget Setup")
     
     # Monthly Salary section (full width)
     st.subheader("💵 Monthly Salary")
     
-    col1, col2, col3 = st.columns([2, 1, 1])
-    
-    with col1:
-        salary_input = st.number_input("Enter your monthly salary:", 
-                                       min_value=0.0, value=float(st.session_state.salary),
-                                       step=100.0, format="%.2f")
+    with st.form("salary_form", border=False):
+        col1, col2, col3 = st.columns([2, 1, 1])
+        
+        with col1:
+            salary_input = st.number_input("Enter your monthly salary:", 
+                                           min_value=0.0, value=float(st.session_state.salary),
+                                           step=100.0, format="%.2f")
+        
+        with col2:
+            st.markdown("<br>", unsafe_allow_html=True)
+            set_salary = st.form_submit_button("Set Salary", type="primary", use_container_width=True)
     
-    with col2:
-        st.markdown("<br>", unsafe_allow_html=True)
-        if st.button("Set Salary", type="primary", use_container_width=True):
-            st.session_state.salary = salary_input
-            
-            # Calculate budgets (80% of salary)
-            total_budget = salary_input * 0.80
-            percentages = {
-                'Food': 0.30, 'Transportation': 0.15, 'Entertainment': 0.10,
-                'Shopping': 0.10, 'Bills': 0.15, 'Healthcare': 0.05,
-                'Education': 0.02, 'Other': 0.02
-            }
-            
-            for category, pct in percentages.items():
-                st.session_state.budgets[category] = total_budget * pct
-            
-            st.session_state.salary_history = generate_salary_history(salary_input)
-            
-            st.success(f"✓ Salary set to ${salary_input:,.2f}")
-            st.success(f"✓ Budget: ${total_budget:,.2f} (80%)")
-            st.success(f"✓ Planned savings: ${salary_input * 0.20:,.2f} (20%)")
-            st.rerun()
+    if set_salary:
+        st.session_state.salary = salary_input
+        
+        # Calculate budgets (80% of salary)
+        total_budget = salary_input * BUDGET_SHARE
+        st.session_state.budgets.update(default_budgets(salary_input))
+        
+        if st.session_state.income_ledger is None:
+            # Estimated 24-month history for a new user
+            st.session_state.income_ledger = IncomeLedger.from_salary(salary_input)
+        else:
+            # Record an actual salary change from this month onwards
+            st.session_state.income_ledger.set_income('Salary', datetime.now().year,
+                                                      datetime.now().month, salary_input)
+        
+        st.success(f"✓ Salary set to {home_money(salary_input)}")
+        st.success(f"✓ Budget: {home_money(total_budget)} (80%)")
+        st.success(f"✓ Planned savings: {home_money(salary_input * 0.20)} (20%)")
     
     st.markdown("---")
     
@@ -513,7 +757,7 @@ elif page == "⚙️ Setup":
     
     if st.session_state.budgets:
         budget_df = pd.DataFrame([
-            {'Category': cat, 'Monthly Budget': f"${amount:.2f}", 
+            {'Category': cat, 'Monthly Budget': home_money(amount), 
              'Percentage': f"{(amount/sum(st.session_state.budgets.values()))*100:.1f}%"}
             for cat, amount in st.session_state.budgets.items()
         ])
@@ -526,30 +770,112 @@ elif page == "⚙️ Setup":
         st.markdown(f"""
         <div class='info-box'>
             <strong>Budget Summary:</strong><br>
-            Total Budget: ${total:,.2f} (80% of salary)<br>
-            Planned Savings: ${savings:,.2f} (20% of salary)
+            Total Budget: {home_money(total)} (80% of salary)<br>
+            Planned Savings: {home_money(savings)} (20% of salary)
         </div>
         """, unsafe_allow_html=True)
     else:
         st.info("Set your salary to auto-calculate category budgets")
+    
+    st.markdown("---")
+    
+    # Income sources and salary changes
+    st.subheader("💼 Income Sources")
+    
+    if st.session_state.income_ledger is None:
+        st.info("Set your salary to start your income history")
+    else:
+        ledger = st.session_state.income_ledger
+        
+        with st.form("income_form", border=False):
+            col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+            with col1:
+                source_name = st.text_input("Source", "Salary", key="income_source")
+            with col2:
+                source_amount = st.number_input(f"Monthly amount ({HOME_CURRENCY})", min_value=0.0, step=100.0,
+                                                format="%.2f", key="income_amount")
+            with col3:
+                source_year = st.number_input("From year", min_value=2000, max_value=2050,
+                                              value=datetime.now().year, key="income_year")
+            with col4:
+                source_month = st.selectbox("From month", list(range(1, 13)), index=datetime.now().month - 1,
+                                            format_func=lambda x: MONTH_NAMES[x], key="income_month")
+            
+            record_income = st.form_submit_button("Record Income Change", type="primary")
+        
+        if record_income:
+            if source_name:
+                ledger.set_income(source_name, int(source_year), source_month, source_amount)
+                st.success(f"✓ {source_name}: {home_money(source_amount)}/month from {MONTH_NAMES[source_month]} {int(source_year)}")
+            else:
+                st.error("Please enter a source name!")
+        
+        # Last 24 months of income by source
+        months = list(ledger.history().keys())[-24:]
+        income_df = pd.DataFrame(
+            {name: values[-len(months):] for name, values in ledger.sources.items()}, index=months
+        ) * display_rate()
+        fig = px.bar(income_df, labels={'index': 'Month', 'value': f"Income ({display_currency()})", 'variable': 'Source'},
+                     color_discrete_sequence=px.colors.qualitative.Set3)
+        st.plotly_chart(fig, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # Hot/cold tiering of old history
+    st.subheader("🗄️ History Archive")
+    col1, col2 = st.columns(2)
+    col1.toggle("Keep only recent months in memory", key="tiering",
+                help="Older months move to a memory-mapped Arrow archive on disk; totals, savings and "
+                     "seasonal views still cover the full history")
+    col2.number_input("Months kept in memory", min_value=1, max_value=120, value=HOT_MONTHS, key="hot_months")
+    
+    archive = st.session_state.archive
+    hot_mb = st.session_state.expenses.memory_usage(deep=True).sum() / 1e6
+    col1, col2, col3 = st.columns(3)
+    col1.metric("In memory", f"{len(st.session_state.expenses):,} expenses", f"{hot_mb:.2f} MB", delta_color="off")
+    if archive is None:
+        st.caption("Nothing archived yet.")
+    else:
+        col2.metric("Archived", f"{archive.rows:,} expenses", f"{archive.disk_bytes / 1e6:.2f} MB on disk",
+                    delta_color="off")
+        col3.metric("Archived Months", archive.rollup[['Year', 'Month']].drop_duplicates().shape[0])
+        
+        months = (archive.rollup[['Year', 'Month']].drop_duplicates()
+                  .sort_values(['Year', 'Month'], ascending=False))
+        month_keys = [int(month_index(y, m)) for y, m in zip(months['Year'], months['Month'])]
+        picked = st.selectbox("Browse an archived month", month_keys,
+                              format_func=lambda i: f"{MONTH_NAMES[i % 12 + 1]} {i // 12}", key="archive_month")
+        with profiled("archive_read"):
+            archived = archive.read(picked, picked)
+        st.dataframe(archived, use_container_width=True, hide_index=True)
 
-elif page == "💳 Expenses":
+
+def render_expenses():
+    """Expenses: add, import, generate and browse expenses"""
     st.header("💳 Expense Management")
     
     tab1, tab2, tab3 = st.tabs(["➕ Add Expense", "📁 Import CSV", "🎲 Generate Sample"])
     
     with tab1:
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            expense_date = st.date_input("Date", datetime.now())
-            expense_category = st.selectbox("Category", CATEGORIES)
+        with st.form("add_expense_form", border=False):
+            col1, col2 = st.columns(2)
             
-        with col2:
-            expense_amount = st.number_input("Amount ($)", min_value=0.0, step=0.01)
-            expense_desc = st.text_input("Description", f"{expense_category} expense")
+            with col1:
+                expense_date = st.date_input("Date", datetime.now())
+                expense_category = st.selectbox("Category", CATEGORIES)
+                
+            with col2:
+                amount_col, currency_col = st.columns([3, 1])
+                expense_amount = amount_col.number_input("Amount", min_value=0.0, step=0.01)
+                currencies = fx_table().currencies if fx_table() is not None else [HOME_CURRENCY]
+                expense_currency = currency_col.selectbox("Currency", currencies,
+                                                          index=currencies.index(HOME_CURRENCY) if HOME_CURRENCY in currencies else 0)
+                expense_desc = st.text_input("Description", placeholder="<Category> expense")
+            
+            add_expense = st.form_submit_button("Add Expense", type="primary")
         
-        if st.button("Add Expense", type="primary"):
+        if add_expense:
+            expense_desc = expense_desc or f"{expense_category} expense"
             if expense_amount > 0:
                 new_expense = pd.DataFrame([{
                     'Year': expense_date.year,
@@ -557,82 +883,132 @@ elif page == "💳 Expenses":
                     'Date': expense_date.strftime("%Y-%m-%d"),
                     'Category': expense_category,
                     'Amount': expense_amount,
-                    'Description': expense_desc
+                    'Description': expense_desc,
+                    'Currency': expense_currency
                 }])
                 
-                st.session_state.expenses = pd.concat([st.session_state.expenses, new_expense], 
-                                                      ignore_index=True)
-                st.success(f"✓ Added ${expense_amount:.2f} to {expense_category}!")
-                st.rerun()
+                st.session_state.expenses = append_expenses(st.session_state.expenses, new_expense)
+                st.session_state.journal.append(new_expense, f"Add {expense_category} expense",
+                                                expenses=st.session_state.expenses)
+                # Budgets are in the home currency
+                home_amount = convert_ledger(new_expense, fx_table(), HOME_CURRENCY)['Amount'].iloc[0]
+                st.session_state.budget_tracker.add(expense_date.year, expense_date.month,
+                                                    expense_category, home_amount)
+                st.success(f"✓ Added {format_money(expense_amount, expense_currency)} to {expense_category}!")
+                
+                # Compare with the category's last 12 months before recording it
+                sketches = st.session_state.amount_sketches
+                this_month = int(month_index(datetime.now().year, datetime.now().month))
+                share, count = sketches.percentile_of(expense_category, home_amount, this_month - 11, this_month)
+                if count >= MIN_SKETCH_COUNT and share >= UNUSUAL_QUANTILE:
+                    typical = sketches.merged([expense_category], this_month - 11, this_month).quantile(0.5)
+                    st.warning(f"💡 This purchase is above your {UNUSUAL_QUANTILE * 100:.0f}th percentile for "
+                               f"{expense_category} (larger than {share * 100:.0f}% of the last 12 months; "
+                               f"typical: {format_money(typical, HOME_CURRENCY)})")
+                sketches.add(expense_date.year, expense_date.month, expense_category, home_amount)
             else:
                 st.error("Please enter a valid amount!")
     
     with tab2:
-        st.info("Import expenses from a CSV file (Date, Category, Amount, Description)")
+        st.info("Import expenses from CSV files or a ZIP of them (Date, Category, Amount, Description), "
+                "one file per bank or card account. Rows are tagged with the file's name as their account "
+                "unless the file has an Account column. Rows without a known Category can be categorized "
+                "from their Description.")
         
         col1, col2 = st.columns([3, 1])
         with col1:
-            uploaded_file = st.file_uploader("Choose a CSV file", type=['csv'])
+            uploaded_files = st.file_uploader("Choose CSV or ZIP files", type=['csv', 'zip'], accept_multiple_files=True)
         with col2:
             replace_existing = st.checkbox("Replace existing data", value=False)
+            auto_categorize_rows = st.checkbox("Auto-categorize", value=True,
+                                               help="Predict missing categories from Description using your existing expenses")
+            skip_transfers = st.checkbox("Skip transfers", value=True,
+                                         help="Leave out money moved between the imported accounts (card payments, "
+                                              "transfers to savings) so it isn't counted as spending twice")
         
-        if uploaded_file is not None:
+        if uploaded_files:
             try:
-                imported_df = pd.read_csv(uploaded_file)
+                files = expand_uploads([(f.name, f.getvalue()) for f in uploaded_files])
+                with profiled("parse_imports"):
+                    # One categorizer lookup for all files; the files are parsed in parallel
+                    categorizer = categorizer_for(st.session_state.expenses) if auto_categorize_rows else None
+                    # Rows the rate table can't price would convert to NaN, so they are rejected here
+                    currencies = fx_table().currencies if fx_table() is not None else None
+                    parsed = parse_files(files, CATEGORIES, categorizer, currencies=currencies)
+                with profiled("merge_imports"):
+                    batch, days, credits = merge_sorted(parsed)
+                    transfer_to = detect_transfers(batch, days, credits)
+                transfers = transfer_to != ''
                 
-                required_cols = ['Date', 'Category', 'Amount']
-                if all(col in imported_df.columns for col in required_cols):
-                    # Preview
-                    st.write(f"**Preview:** {len(imported_df)} rows found")
-                    st.dataframe(imported_df.head(10), use_container_width=True)
-                    
-                    if st.button("Import CSV", type="primary"):
-                        valid_rows = []
-                        
-                        for _, row in imported_df.iterrows():
-                            try:
-                                date_obj = pd.to_datetime(row['Date'])
-                                if row['Category'] in CATEGORIES and float(row['Amount']) > 0:
-                                    valid_rows.append({
-                                        'Year': date_obj.year,
-                                        'Month': date_obj.month,
-                                        'Date': str(row['Date']),
-                                        'Category': row['Category'],
-                                        'Amount': float(row['Amount']),
-                                        'Description': str(row.get('Description', row['Category']))
-                                    })
-                            except:
-                                continue
+                # Preview
+                st.dataframe(pd.DataFrame([{
+                    'File': p['file'],
+                    'Account': p['account'],
+                    'Rows': p.get('rows', 0),
+                    'Valid': len(p['expenses']) if 'expenses' in p else 0,
+                    'From': p['expenses']['Date'].iloc[0] if len(p.get('expenses', [])) else None,
+                    'To': p['expenses']['Date'].iloc[-1] if len(p.get('expenses', [])) else None,
+                } for p in parsed]), use_container_width=True, hide_index=True)
+                for p in parsed:
+                    if 'error' in p:
+                        st.error(f"Skipped {p['file']}: {p['error']} (needs columns Date, Category, Amount)")
+                    elif p['unknown_currencies']:
+                        st.warning(f"Skipped {p['file']} rows in {', '.join(p['unknown_currencies'])}: "
+                                   f"no FX rate (known: {', '.join(currencies)})")
+                
+                predicted = [p['predicted'] for p in parsed if 'predicted' in p and len(p['predicted'])]
+                if predicted:
+                    predicted = pd.concat(predicted, ignore_index=True)
+                    low = (predicted['Confidence'] < 0.5).sum()
+                    st.caption(f"🤖 {len(predicted)} rows auto-categorized ({low} with confidence below 50%)")
+                    st.dataframe(predicted.sort_values('Confidence').head(10),
+                                 use_container_width=True, hide_index=True,
+                                 column_config={'Confidence': st.column_config.ProgressColumn(
+                                     'Confidence', min_value=0.0, max_value=1.0, format="%.2f")})
+                if transfers.any():
+                    st.caption(f"🔁 {transfers.sum()} rows are transfers between your accounts"
+                               f"{' and will be skipped' if skip_transfers else ''}")
+                    st.dataframe(batch[transfers].assign(**{'Transfer With': transfer_to[transfers]}).head(10),
+                                 use_container_width=True, hide_index=True)
+                st.write(f"**Preview:** {len(batch)} valid rows from {len(files)} file(s), merged by date")
+                st.dataframe(batch.head(10), use_container_width=True)
+                
+                if st.button("Import CSV", type="primary"):
+                    with profiled("csv_import"):
+                        new_df = batch[~transfers].reset_index(drop=True) if skip_transfers else batch
                         
-                        if valid_rows:
-                            new_df = pd.DataFrame(valid_rows)
-                            
+                        if len(new_df):
                             if replace_existing:
                                 st.session_state.expenses = new_df
-                                st.success(f"✓ Replaced with {len(valid_rows)} expenses!")
+                                st.session_state.journal.replace(new_df, f"Import CSV (replace, {len(new_df)} rows)")
+                                st.session_state.budget_tracker = BudgetTracker.from_ledger(
+                                    convert_ledger(new_df, fx_table(), HOME_CURRENCY))
+                                rebuild_amount_sketches()
+                                st.session_state.description_index = DescriptionIndex()
+                                st.success(f"✓ Replaced with {len(new_df)} expenses!")
                             else:
-                                st.session_state.expenses = pd.concat([st.session_state.expenses, new_df], 
-                                                                      ignore_index=True)
-                                # Remove duplicates based on Date, Category, Amount
-                                st.session_state.expenses = st.session_state.expenses.drop_duplicates(
-                                    subset=['Date', 'Category', 'Amount'], keep='first'
-                                )
-                                st.success(f"✓ Added {len(valid_rows)} new expenses (duplicates removed)!")
-                            st.rerun()
+                                # Skip rows already in the ledger (same Date, Category, Amount, Account)
+                                new_df = new_df.drop_duplicates(subset=DUPLICATE_KEY)
+                                added = new_df[new_rows(st.session_state.expenses, new_df)]
+                                
+                                st.session_state.expenses = append_expenses(st.session_state.expenses, added)
+                                st.session_state.journal.append(added, f"Import CSV ({len(added)} rows)",
+                                                                expenses=st.session_state.expenses)
+                                home_added = convert_ledger(added, fx_table(), HOME_CURRENCY)
+                                st.session_state.budget_tracker.add_frame(home_added)
+                                st.session_state.amount_sketches.add_frame(home_added)
+                                st.success(f"✓ Added {len(added)} new expenses ({len(new_df) - len(added)} duplicates skipped)!")
                         else:
-                            st.error("No valid expenses found in CSV!")
-                else:
-                    st.error(f"CSV must have columns: {', '.join(required_cols)}")
+                            st.error("No valid expenses found in the files!")
             
             except Exception as e:
-                st.error(f"Error reading CSV: {str(e)}")
+                st.error(f"Error reading files: {str(e)}")
     
     with tab3:
         st.info("Generate realistic sample expenses for last 6 months")
         
         if st.button("Generate Sample Data", type="primary"):
             generate_sample_data()
-            st.rerun()
     
     # Display expenses table
     st.markdown("---")
@@ -642,13 +1018,12 @@ elif page == "💳 Expenses":
         st.subheader("📋 Recent Expenses")
     with col2:
         if not st.session_state.expenses.empty:
-            if st.button("🗑️ Clear All Data", type="secondary"):
-                if st.button("⚠️ Confirm Clear", type="secondary"):
-                    st.session_state.expenses = pd.DataFrame(columns=['Year', 'Month', 'Date', 'Category', 'Amount', 'Description'])
-                    st.success("✓ All expenses cleared!")
-                    st.rerun()
+            st.button("🗑️ Clear All Data", type="secondary", on_click=delete_all_expenses,
+                      help="Can be undone from the sidebar")
     
     if not st.session_state.expenses.empty:
+        render_expense_search()
+        
         # Show total count
         st.info(f"📊 Showing last 50 of **{len(st.session_state.expenses):,} total expenses**")
         
@@ -666,28 +1041,65 @@ elif page == "💳 Expenses":
                 mime="text/csv"
             )
         with col2:
-            if st.button("🗑️ Delete All Expenses"):
-                st.session_state.expenses = pd.DataFrame(columns=['Year', 'Month', 'Date', 'Category', 'Amount', 'Description'])
-                st.success("✓ All expenses deleted!")
-                st.rerun()
+            st.button("🗑️ Delete All Expenses", on_click=delete_all_expenses)
     else:
         st.info("No expenses yet. Add some to get started!")
 
-elif page == "📈 Analysis":
+
+@counted_fragment
+def render_expense_search():
+    """Description search (fragment: typing a query reruns only the results)"""
+    query = st.text_input("🔍 Search descriptions", key="expense_search",
+                          placeholder="e.g. netflix, rent, coffee shop",
+                          help="Every word must match the start of a word in the description")
+    if not query.strip():
+        return
+    
+    with profiled("description_search"):
+        rows = description_index().search(query)
+        matches = match_summary(ledger_artifacts().get('ledger', display_currency()), rows)
+    
+    if not matches['count']:
+        st.info(f"No expenses match \"{query}\".")
+        return
+    
+    col1, col2 = st.columns(2)
+    col1.metric("Matching Expenses", f"{matches['count']:,}")
+    col2.metric("Total", money(matches['total']))
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        totals = matches['category_totals'].rename('Total').rename_axis('Category').reset_index()
+        st.dataframe(totals, use_container_width=True, hide_index=True,
+                     column_config={'Total': st.column_config.NumberColumn(format="%.2f")})
+    with col2:
+        # Row ids follow insertion order, so the last ones are the newest
+        st.dataframe(st.session_state.expenses.iloc[rows[-50:][::-1]], use_container_width=True, hide_index=True)
+    caption = f"Totals in {display_currency()}; showing the {min(50, len(rows))} latest matches."
+    if st.session_state.archive is not None and st.session_state.archive.rows:
+        caption += " Archived months are not searched."
+    st.caption(caption)
+
+
+def render_analysis():
+    """Analysis: category breakdown and monthly trend"""
     st.header("📈 Spending Analysis")
     
     if st.session_state.expenses.empty:
         st.warning("No expenses to analyze. Please add expenses first!")
     else:
         # Summary statistics
-        total_spent = st.session_state.expenses['Amount'].sum()
-        total_transactions = len(st.session_state.expenses)
-        avg_transaction = st.session_state.expenses['Amount'].mean()
+        summary = spending_summary()
+        total_spent = summary['total']
+        total_transactions = summary['count']
+        avg_transaction = total_spent / total_transactions
+        sketches = st.session_state.amount_sketches
         
-        col1, col2, col3 = st.columns(3)
-        col1.metric("Total Spent", f"${total_spent:,.2f}")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Total Spent", money(total_spent))
         col2.metric("Transactions", f"{total_transactions:,}")
-        col3.metric("Avg Transaction", f"${avg_transaction:.2f}")
+        col3.metric("Avg Transaction", money(avg_transaction))
+        col4.metric("Median Transaction", money(home_to_display(sketches.merged().quantile(0.5))))
         
         st.markdown("---")
         
@@ -696,24 +1108,24 @@ elif page == "📈 Analysis":
         
         with col1:
             st.subheader("Category Breakdown")
-            cat_totals = st.session_state.expenses.groupby('Category')['Amount'].sum().sort_values(ascending=False)
+            cat_totals = summary['category_totals'].sort_values(ascending=False)
             
             fig = go.Figure(data=[go.Bar(
                 x=cat_totals.index,
                 y=cat_totals.values,
                 marker_color='#4CAF50'
             )])
-            fig.update_layout(xaxis_title="Category", yaxis_title="Amount ($)")
+            fig.update_layout(xaxis_title="Category", yaxis_title=f"Amount ({display_currency()})")
             st.plotly_chart(fig, use_container_width=True)
             
             # Show percentages
             for cat, total in cat_totals.items():
                 pct = (total / total_spent) * 100
-                st.write(f"**{cat}**: ${total:,.2f} ({pct:.1f}%)")
+                st.write(f"**{cat}**: {money(total)} ({pct:.1f}%)")
         
         with col2:
             st.subheader("Monthly Trend")
-            monthly = st.session_state.expenses.groupby(['Year', 'Month'])['Amount'].sum().reset_index()
+            monthly = summary['monthly'].copy()
             monthly['Period'] = monthly.apply(lambda x: f"{MONTH_NAMES[int(x['Month'])][:3]} {int(x['Year'])}", axis=1)
             
             fig = go.Figure(data=[go.Scatter(
@@ -723,99 +1135,291 @@ elif page == "📈 Analysis":
                 line=dict(color='#45B7D1', width=3),
                 marker=dict(size=10)
             )])
-            fig.update_layout(xaxis_title="Month", yaxis_title="Amount ($)")
+            fig.update_layout(xaxis_title="Month", yaxis_title=f"Amount ({display_currency()})")
+            st.plotly_chart(fig, use_container_width=True)
+        
+        st.markdown("---")
+        
+        # Transaction-size percentiles from the per-month sketches (no ledger scan)
+        st.subheader("📐 Transaction Sizes")
+        periods = {"Last 3 months": 3, "Last 12 months": 12, "All time": None}
+        period = st.selectbox("Period", list(periods), index=1, key="size_period")
+        this_month = int(month_index(datetime.now().year, datetime.now().month))
+        first_month = this_month - periods[period] + 1 if periods[period] else None
+        with profiled("size_percentiles"):
+            sizes = sketches.percentile_table(CATEGORIES, first_month=first_month)
+        if sizes.empty:
+            st.info("No expenses in this period.")
+        else:
+            amount_cols = ['P50', 'P90', 'P99', 'Max']
+            sizes[amount_cols] = sizes[amount_cols] * display_rate()
+            st.dataframe(sizes, use_container_width=True, hide_index=True,
+                         column_config={col: st.column_config.NumberColumn(format="%.2f") for col in amount_cols})
+            st.caption(f"Amounts in {display_currency()}. Median (P50), 90th and 99th percentile expense per "
+                       f"category, estimated from quantile sketches (within about 1% of the exact rank).")
+        
+        st.markdown("---")
+        
+        # Trailing windows answered from daily prefix sums
+        st.subheader("📉 Rolling Windows")
+        windows = spending_windows(display_currency())
+        col1, col2 = st.columns([3, 1])
+        selected = col1.multiselect("Categories", windows.categories, default=windows.categories,
+                                    key="rolling_categories")
+        window_days = col2.selectbox("Window", WINDOWS, index=1, format_func=lambda d: f"{d} days",
+                                     key="rolling_window")
+        
+        if not selected:
+            st.info("Select at least one category.")
+        else:
+            with profiled("rolling_windows"):
+                window_summary = windows.summary(categories=selected)
+                rolling = windows.rolling(window_days, selected)
+            
+            st.dataframe(window_summary, use_container_width=True, hide_index=True,
+                         column_config={'Total': st.column_config.NumberColumn(format="%.2f"),
+                                        'Daily Avg': st.column_config.NumberColumn(format="%.2f"),
+                                        'Volatility': st.column_config.NumberColumn(format="%.2f"),
+                                        'Prior Total': st.column_config.NumberColumn(format="%.2f"),
+                                        'Change %': st.column_config.NumberColumn(format="%+.1f%%")})
+            st.caption(f"Trailing windows ending today, in {display_currency()}. Volatility is the standard "
+                       f"deviation of daily spending; Prior Total is the same-length window just before.")
+            
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                upper = rolling['Daily Avg'] + rolling['Volatility']
+                lower = (rolling['Daily Avg'] - rolling['Volatility']).clip(lower=0)
+                fig = go.Figure([
+                    go.Scatter(x=rolling['Date'], y=upper, line=dict(width=0), showlegend=False, hoverinfo='skip'),
+                    go.Scatter(x=rolling['Date'], y=lower, line=dict(width=0), fill='tonexty',
+                               fillcolor='rgba(69, 183, 209, 0.2)', name='± volatility', hoverinfo='skip'),
+                    go.Scatter(x=rolling['Date'], y=rolling['Daily Avg'], line=dict(color='#45B7D1', width=2),
+                               name=f'{window_days}-day daily avg'),
+                ])
+                fig.update_layout(title=f"Rolling {window_days}-Day Average", xaxis_title="Date",
+                                  yaxis_title=f"Per day ({display_currency()})")
+                st.plotly_chart(fig, use_container_width=True)
+            
+            with col2:
+                fig = go.Figure([
+                    go.Bar(x=window_summary['Window'], y=window_summary['Prior Total'], name='Prior',
+                           marker_color='#B0BEC5'),
+                    go.Bar(x=window_summary['Window'], y=window_summary['Total'], name='Trailing',
+                           marker_color='#4CAF50'),
+                ])
+                fig.update_layout(title="Trailing vs Prior Window", barmode='group',
+                                  yaxis_title=f"Amount ({display_currency()})")
+                st.plotly_chart(fig, use_container_width=True)
+        
+        st.markdown("---")
+        
+        # Year-over-year and season-over-season panels (reshapes of one month x category matrix)
+        st.subheader("📅 Year-over-Year & Seasons")
+        currency = display_currency()
+        views = ledger_artifacts().get('seasonal_views', currency)
+        latest_label = f"{MONTH_NAMES[views['latest_month']]} {views['latest_year']}"
+        latest = views['latest']
+        this_total, last_total = latest['This Year'].sum(), latest['Last Year'].sum()
+        
+        col1, col2, col3 = st.columns(3)
+        col1.metric(latest_label, money(this_total),
+                    f"{(this_total - last_total) / last_total * 100:+.1f}% vs last year" if last_total > 0 else None,
+                    delta_color="inverse")
+        col2.metric(f"{MONTH_NAMES[views['latest_month']]} {views['latest_year'] - 1}", money(last_total))
+        season = get_season(views['latest_month'])
+        col3.metric("Season", season)
+        st.caption(f"{season} tips: " + ", ".join(SEASONAL_TIPS[season]))
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            grid = views['grid']
+            fig = go.Figure([go.Scatter(x=grid.columns, y=grid.loc[year], mode='lines+markers', name=str(year))
+                             for year in grid.index[-5:]])
+            fig.update_layout(title="Same Month, Each Year", xaxis_title="Month",
+                              yaxis_title=f"Amount ({currency})")
             st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            st.markdown(f"**{latest_label} vs same month last year**")
+            st.dataframe(latest, use_container_width=True, hide_index=True,
+                         column_config={'This Year': st.column_config.NumberColumn(format="%.2f"),
+                                        'Last Year': st.column_config.NumberColumn(format="%.2f"),
+                                        'Change %': st.column_config.NumberColumn(format="%+.1f%%")})
+        
+        seasons, mix = views['seasons'].tail(8), views['season_mix'].tail(8)
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            fig = go.Figure([go.Bar(x=mix['Label'], y=mix[cat], name=cat) for cat in CATEGORIES])
+            fig.update_layout(title="Category Mix by Season", barmode='stack', yaxis_title="Share of spending (%)")
+            st.plotly_chart(fig, use_container_width=True)
+        
+        with col2:
+            st.markdown("**Season over season**")
+            st.dataframe(seasons[['Label', 'Months', 'Total', 'vs Previous Season %', 'vs Last Year %']],
+                         use_container_width=True, hide_index=True,
+                         column_config={'Total': st.column_config.NumberColumn(format="%.2f"),
+                                        'vs Previous Season %': st.column_config.NumberColumn(format="%+.1f%%"),
+                                        'vs Last Year %': st.column_config.NumberColumn(format="%+.1f%%")})
+            st.caption("Seasons with fewer than 3 recorded months are shown but not compared.")
+        
+        st.markdown("---")
+        
+        # Recurring bills and subscriptions
+        st.subheader("🔁 Recurring Charges")
+        series, _ = recurring_charges()
+        if series.empty:
+            st.info("No recurring charges detected yet (needs at least 3 regular occurrences).")
+        else:
+            fixed = fixed_monthly_outflow(series)
+            col1, col2 = st.columns(2)
+            col1.metric("Recurring Series", int(series['Active'].sum()),
+                        f"{int((~series['Active']).sum())} inactive", delta_color="off")
+            col2.metric("Fixed Monthly Outflow", home_money(sum(fixed.values())))
+            
+            rate = display_rate()
+            shown = series[['Description', 'Category', 'Amount', 'Period', 'Occurrences', 'Last Date', 'Next Date', 'Monthly Amount', 'Active']]
+            st.dataframe(shown.assign(Amount=shown['Amount'] * rate, **{'Monthly Amount': shown['Monthly Amount'] * rate}),
+                         use_container_width=True, hide_index=True,
+                         column_config={'Amount': money_column(),
+                                        'Monthly Amount': money_column(),
+                                        'Last Date': st.column_config.DateColumn(),
+                                        'Next Date': st.column_config.DateColumn()})
+            
+            upcoming = project_occurrences(series, months=3)
+            if not upcoming.empty:
+                st.markdown("**📅 Upcoming in the next 3 months**")
+                st.dataframe(upcoming.assign(Amount=upcoming['Amount'] * rate), use_container_width=True, hide_index=True,
+                             column_config={'Amount': money_column(),
+                                            'Date': st.column_config.DateColumn()})
+
 
-elif page == "🎯 Goals":
+@counted_fragment
+def render_whatif(snapshot):
+    """What-if tab (fragment: slider changes rerun only the sweep)"""
+    st.subheader("🔬 What-If Scenarios")
+    
+    if st.session_state.salary <= 0:
+        st.info("Set your salary first to explore what-if scenarios.")
+    else:
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            salary_range = st.slider("Salary change (%)", -30, 50, (-10, 20), step=5, key="whatif_salary")
+            whatif_category = st.selectbox("Category to vary", CATEGORIES, key="whatif_category")
+            category_range = st.slider(f"{whatif_category} spending change (%)", -50, 50, (-30, 10),
+                                       step=5, key="whatif_category_range")
+        
+        with col2:
+            base_target = float(st.session_state.emergency_fund_target)
+            emergency_targets = sorted({base_target, base_target * 0.5, base_target * 2, base_target * 3})
+            target_labels = {target: home_money(target, 0) for target in emergency_targets}
+            emergency_choice = st.select_slider("Emergency fund target", emergency_targets,
+                                                value=base_target, format_func=target_labels.get,
+                                                key="whatif_emergency")
+        
+        result = sweep(
+            monthly_income(st.session_state.salary, st.session_state.income_ledger),
+            snapshot['category_spending'], snapshot['calculated_savings'],
+            emergency_targets, st.session_state.goals,
+            pct_range(*salary_range, 5), whatif_category, pct_range(*category_range, 5)
+        )
+        e_idx = emergency_targets.index(emergency_choice)
+        x_labels = [f"{p:+.0f}%" for p in result['category_pcts']]
+        y_labels = [f"{p:+.0f}%" for p in result['salary_pcts']]
+        
+        with col2:
+            base_capacity = snapshot['monthly_savings_capacity']
+            best_capacity = result['capacity'].max()
+            gain = best_capacity - base_capacity
+            st.metric("Best-case Monthly Capacity", home_money(best_capacity),
+                     f"{'-' if gain < 0 else '+'}{home_money(abs(gain))} vs today")
+        
+        st.markdown("**💰 Monthly Savings Capacity**")
+        fig = px.imshow(result['capacity'] * display_rate(), x=x_labels, y=y_labels, text_auto='.0f',
+                        color_continuous_scale='YlGn', aspect='auto',
+                        labels=dict(x=f"{whatif_category} change", y="Salary change", color=f"{display_currency()} / month"))
+        st.plotly_chart(fig, use_container_width=True)
+        
+        if st.session_state.goals:
+            months = result['months_to_all_goals'][:, :, e_idx]
+            st.markdown("**📅 Months Until All Goals Are Funded**")
+            fig = px.imshow(np.where(np.isinf(months), np.nan, months), x=x_labels, y=y_labels,
+                            text_auto='.0f', color_continuous_scale='YlOrRd', aspect='auto',
+                            labels=dict(x=f"{whatif_category} change", y="Salary change", color="Months"))
+            st.plotly_chart(fig, use_container_width=True)
+            
+            st.markdown(f"**🎯 Goals Reached On Time (of {len(st.session_state.goals)})**")
+            fig = px.imshow(result['goals_on_time'][:, :, e_idx], x=x_labels, y=y_labels,
+                            text_auto=True, color_continuous_scale='Greens', aspect='auto',
+                            labels=dict(x=f"{whatif_category} change", y="Salary change", color="Goals"))
+            st.plotly_chart(fig, use_container_width=True)
+        else:
+            st.info("Add goals to see how each scenario changes your roadmap.")
+
+
+def render_goals():
+    """Goals: savings overview, goal management, roadmap and what-if"""
     st.header("🎯 Financial Goals & Savings Tracker")
     
-    tab1, tab2, tab3 = st.tabs(["💰 Savings Overview", "➕ Manage Goals", "📊 Goal Roadmap"])
+    tab1, tab2, tab3, tab4 = st.tabs(["💰 Savings Overview", "➕ Manage Goals", "📊 Goal Roadmap", "🔬 What-If"])
     
     with tab1:
         st.subheader("💎 Your Current Financial Status")
         
         # Calculate actual savings from income - expenses
-        if not st.session_state.expenses.empty and st.session_state.salary > 0:
-            total_income = 0
-            if st.session_state.salary_history:
-                total_income = sum(st.session_state.salary_history.values())
-            else:
-                months = len(st.session_state.expenses['Month'].unique())
-                total_income = st.session_state.salary * months
-            
-            total_expenses = st.session_state.expenses['Amount'].sum()
-            calculated_savings = max(0, total_income - total_expenses)
-        else:
-            calculated_savings = 0
+        snapshot = savings()
+        calculated_savings = snapshot['calculated_savings']
         
         col1, col2 = st.columns(2)
         
         with col1:
             st.markdown("### 💰 Your Savings")
-            st.metric("Total Accumulated Savings", f"${calculated_savings:,.2f}", "Based on income - expenses")
+            st.metric("Total Accumulated Savings", home_money(calculated_savings), "Based on income - expenses")
             st.info("This is calculated from your salary history minus all expenses.")
         
         with col2:
             st.markdown("### 🚨 Emergency Fund")
-            emergency_target = st.number_input(
-                "Emergency fund target:",
-                min_value=0.0,
-                value=float(st.session_state.emergency_fund_target),
-                step=50.0,
-                format="%.2f",
-                key="emergency_target_input"
-            )
-            
-            if st.button("Update Emergency Target", type="primary"):
-                st.session_state.emergency_fund_target = emergency_target
-                st.success(f"✓ Emergency target updated to ${emergency_target:,.2f}")
-                st.rerun()
+            with st.form("emergency_form", border=False):
+                st.number_input(
+                    "Emergency fund target:",
+                    min_value=0.0,
+                    value=float(st.session_state.emergency_fund_target),
+                    step=50.0,
+                    format="%.2f",
+                    key="emergency_target_input"
+                )
+                st.form_submit_button("Update Emergency Target", type="primary",
+                                      on_click=update_emergency_target)
             
             emergency_progress = min(100, (calculated_savings / st.session_state.emergency_fund_target) * 100) if st.session_state.emergency_fund_target > 0 else 0
             st.progress(emergency_progress / 100)
             st.metric("Emergency Fund Status", f"{emergency_progress:.1f}%", 
-                     f"${max(0, st.session_state.emergency_fund_target - calculated_savings):,.2f} needed")
+                     f"{home_money(max(0, st.session_state.emergency_fund_target - calculated_savings))} needed")
         
         st.markdown("---")
         
-        # Calculate monthly savings capacity
-        if not st.session_state.expenses.empty and st.session_state.salary > 0:
-            # Get last 3 months of data properly
-            df = st.session_state.expenses.copy()
-            df['Date'] = pd.to_datetime(df['Date'])
-            three_months_ago = datetime.now() - timedelta(days=90)
-            recent_df = df[df['Date'] >= three_months_ago]
-            
-            if not recent_df.empty:
-                # Count actual months in the data
-                months_count = len(recent_df['Month'].unique())
-                if months_count > 0:
-                    recent_spending = recent_df['Amount'].sum() / months_count
-                else:
-                    recent_spending = recent_df['Amount'].sum() / 3
-            else:
-                recent_spending = 0
-            
-            monthly_savings_capacity = max(0, st.session_state.salary - recent_spending)
-        else:
-            recent_spending = 0
-            monthly_savings_capacity = st.session_state.salary * 0.20
+        # Monthly savings capacity from the last 3 months of spending
+        recent_spending = snapshot['recent_spending']
+        monthly_savings_capacity = snapshot['monthly_savings_capacity']
         
         col1, col2, col3 = st.columns(3)
-        col1.metric("Monthly Salary", f"${st.session_state.salary:,.2f}")
-        col2.metric("Avg Monthly Spending", f"${recent_spending:,.2f}")
-        col3.metric("Monthly Savings Capacity", f"${monthly_savings_capacity:,.2f}")
+        col1.metric("Monthly Income", home_money(monthly_income(st.session_state.salary, st.session_state.income_ledger)))
+        col2.metric("Avg Monthly Spending", home_money(recent_spending))
+        col3.metric("Monthly Savings Capacity", home_money(monthly_savings_capacity))
         
         # Available for goals after emergency fund
-        available_for_goals = max(0, calculated_savings - st.session_state.emergency_fund_target)
+        available_for_goals = snapshot['available_for_goals']
         
         st.markdown(f"""
         <div class='info-box'>
             <h3 style='margin: 0; color: white;'>💰 Available for Goals</h3>
             <p style='margin: 10px 0;'>
-                <strong>Total Savings:</strong> ${calculated_savings:,.2f}<br>
-                <strong>Emergency Reserve:</strong> ${st.session_state.emergency_fund_target:,.2f}<br>
-                <strong>Available for Goals:</strong> ${available_for_goals:,.2f}
+                <strong>Total Savings:</strong> {home_money(calculated_savings)}<br>
+                <strong>Emergency Reserve:</strong> {home_money(st.session_state.emergency_fund_target)}<br>
+                <strong>Available for Goals:</strong> {home_money(available_for_goals)}
             </p>
         </div>
         """, unsafe_allow_html=True)
@@ -824,39 +1428,29 @@ elif page == "🎯 Goals":
         st.subheader("➕ Add New Goal")
     
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            goal_name = st.text_input("Goal Name", "New Laptop")
-            goal_amount = st.number_input("Target Amount ($)", min_value=0.0, value=1500.0, step=100.0)
-            goal_priority = st.selectbox("Priority", ["High", "Medium", "Low"])
-        
-        with col2:
-            goal_year = st.number_input("Target Year", min_value=2026, max_value=2050, value=2026)
-            goal_month = st.selectbox("Target Month", list(range(1, 13)), 
-                                     format_func=lambda x: MONTH_NAMES[x])
+        with st.form("add_goal_form", border=False):
+            col1, col2 = st.columns(2)
+            
+            with col1:
+                goal_name = st.text_input("Goal Name", "New Laptop")
+                goal_amount = st.number_input(f"Target Amount ({HOME_CURRENCY})", min_value=0.0, value=1500.0, step=100.0)
+                goal_priority = st.selectbox("Priority", PRIORITIES)
+            
+            with col2:
+                goal_year = st.number_input("Target Year", min_value=2026, max_value=2050, value=2026)
+                goal_month = st.selectbox("Target Month", list(range(1, 13)), 
+                                         format_func=lambda x: MONTH_NAMES[x])
+            
+            add_goal = st.form_submit_button("Add Goal", type="primary")
         
-        if st.button("Add Goal", type="primary"):
+        if add_goal:
             if goal_name and goal_amount > 0:
-                current_date = datetime.now().year * 12 + datetime.now().month
-                target_date = goal_year * 12 + goal_month
-                months_until = target_date - current_date
-                
-                if months_until > 0:
-                    goal = {
-                        'name': goal_name,
-                        'target_amount': goal_amount,
-                        'target_year': goal_year,
-                        'target_month': goal_month,
-                        'months_until_goal': months_until,
-                        'monthly_savings_needed': goal_amount / months_until,
-                        'priority': goal_priority,
-                        'allocated_savings': 0
-                    }
+                if months_until(goal_year, goal_month) > 0:
+                    goal = Goal.new(goal_name, goal_amount, goal_year, goal_month, goal_priority)
                     
-                    st.session_state.goals.append(goal)
-                    st.success(f"✓ Goal '{goal_name}' added! Need ${goal['monthly_savings_needed']:.2f}/month")
-                    st.rerun()
+                    st.session_state.goals = st.session_state.goals.add(goal)
+                    st.session_state.journal.set_goals(st.session_state.goals, f"Add goal: {goal_name}")
+                    st.success(f"✓ Goal '{goal_name}' added! Need {home_money(goal.monthly_savings_needed())}/month")
                 else:
                     st.error("Target date must be in the future!")
             else:
@@ -868,65 +1462,41 @@ elif page == "🎯 Goals":
         if not st.session_state.goals:
             st.info("No goals yet! Add a goal above.")
         else:
-            for i, goal in enumerate(st.session_state.goals):
+            for goal in st.session_state.goals:
                 priority_color = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}
-                with st.expander(f"{priority_color.get(goal.get('priority', 'Medium'), '🟡')} {goal['name']} - ${goal['target_amount']:,.2f}"):
+                with st.expander(f"{priority_color.get(goal.priority, '🟡')} {goal.name} - {home_money(goal.target_amount)}"):
                     col1, col2 = st.columns([3, 1])
                     
                     with col1:
-                        st.write(f"**Priority:** {goal.get('priority', 'Medium')}")
-                        st.write(f"**Target:** ${goal['target_amount']:,.2f}")
-                        st.write(f"**Due:** {MONTH_NAMES[goal['target_month']]} {goal['target_year']}")
-                        st.write(f"**Months Remaining:** {goal['months_until_goal']}")
-                        st.write(f"**Monthly Need:** ${goal['monthly_savings_needed']:.2f}")
+                        st.write(f"**Priority:** {goal.priority}")
+                        st.write(f"**Target:** {home_money(goal.target_amount)}")
+                        st.write(f"**Due:** {MONTH_NAMES[goal.target_month]} {goal.target_year}")
+                        st.write(f"**Months Remaining:** {goal.months_until()}")
+                        st.write(f"**Monthly Need:** {home_money(goal.monthly_savings_needed())}")
                     
+                    # Callbacks run before the rerun, so no extra st.rerun() is needed
                     with col2:
-                        if st.button("✏️ Edit", key=f"edit_{i}"):
-                            st.session_state[f'editing_goal_{i}'] = True
-                            st.rerun()
-                        
-                        if st.button("🗑️ Delete", key=f"delete_{i}"):
-                            st.session_state.goals.pop(i)
-                            st.success(f"✓ Deleted: {goal['name']}")
-                            st.rerun()
+                        st.button("✏️ Edit", key=f"edit_{goal.id}", on_click=set_goal_editing, args=(goal.id, True))
+                        st.button("🗑️ Delete", key=f"delete_{goal.id}", on_click=delete_goal, args=(goal.id,))
                     
                     # Edit form
-                    if st.session_state.get(f'editing_goal_{i}', False):
+                    if goal.id in st.session_state.editing_goals:
                         st.markdown("---")
-                        edit_col1, edit_col2 = st.columns(2)
-                        
-                        with edit_col1:
-                            new_name = st.text_input("Name", value=goal['name'], key=f"edit_name_{i}")
-                            new_amount = st.number_input("Amount", min_value=0.0, value=float(goal['target_amount']), step=100.0, key=f"edit_amount_{i}")
-                            new_priority = st.selectbox("Priority", ["High", "Medium", "Low"], index=["High", "Medium", "Low"].index(goal.get('priority', 'Medium')), key=f"edit_priority_{i}")
-                        
-                        with edit_col2:
-                            new_year = st.number_input("Year", min_value=2026, max_value=2050, value=goal['target_year'], key=f"edit_year_{i}")
-                            new_month = st.selectbox("Month", list(range(1, 13)), index=goal['target_month']-1, format_func=lambda x: MONTH_NAMES[x], key=f"edit_month_{i}")
-                        
-                        if st.button("💾 Save", key=f"save_{i}", type="primary"):
-                            current_date = datetime.now().year * 12 + datetime.now().month
-                            target_date = new_year * 12 + new_month
-                            months_until = target_date - current_date
+                        with st.form(f"edit_goal_form_{goal.id}", border=False):
+                            edit_col1, edit_col2 = st.columns(2)
+                            
+                            with edit_col1:
+                                st.text_input("Name", value=goal.name, key=f"edit_name_{goal.id}")
+                                st.number_input("Amount", min_value=0.0, value=goal.target_amount, step=100.0, key=f"edit_amount_{goal.id}")
+                                st.selectbox("Priority", PRIORITIES, index=PRIORITIES.index(goal.priority), key=f"edit_priority_{goal.id}")
                             
-                            if months_until > 0:
-                                st.session_state.goals[i] = {
-                                    'name': new_name,
-                                    'target_amount': new_amount,
-                                    'target_year': new_year,
-                                    'target_month': new_month,
-                                    'months_until_goal': months_until,
-                                    'monthly_savings_needed': new_amount / months_until,
-                                    'priority': new_priority,
-                                    'allocated_savings': goal.get('allocated_savings', 0)
-                                }
-                                st.session_state[f'editing_goal_{i}'] = False
-                                st.success(f"✓ Updated: {new_name}")
-                                st.rerun()
+                            with edit_col2:
+                                st.number_input("Year", min_value=2026, max_value=2050, value=goal.target_year, key=f"edit_year_{goal.id}")
+                                st.selectbox("Month", list(range(1, 13)), index=goal.target_month - 1, format_func=lambda x: MONTH_NAMES[x], key=f"edit_month_{goal.id}")
+                            
+                            st.form_submit_button("💾 Save", type="primary", on_click=save_goal, args=(goal.id,))
                         
-                        if st.button("❌ Cancel", key=f"cancel_{i}"):
-                            st.session_state[f'editing_goal_{i}'] = False
-                            st.rerun()
+                        st.button("❌ Cancel", key=f"cancel_{goal.id}", on_click=set_goal_editing, args=(goal.id, False))
     
     with tab3:
         st.subheader("📊 Smart Goal Roadmap")
@@ -934,64 +1504,32 @@ elif page == "🎯 Goals":
         if not st.session_state.goals:
             st.info("No goals yet! Add goals in the 'Manage Goals' tab.")
         else:
-            # Calculate monthly savings capacity
-            if not st.session_state.expenses.empty and st.session_state.salary > 0:
-                # Get last 3 months of data properly
-                df = st.session_state.expenses.copy()
-                df['Date'] = pd.to_datetime(df['Date'])
-                three_months_ago = datetime.now() - timedelta(days=90)
-                recent_df = df[df['Date'] >= three_months_ago]
-                
-                if not recent_df.empty:
-                    # Count actual months in the data
-                    months_count = len(recent_df['Month'].unique())
-                    if months_count > 0:
-                        recent_spending = recent_df['Amount'].sum() / months_count
-                    else:
-                        recent_spending = recent_df['Amount'].sum() / 3
-                else:
-                    recent_spending = 0
-                
-                monthly_savings_capacity = max(0, st.session_state.salary - recent_spending)
-            else:
-                monthly_savings_capacity = st.session_state.salary * 0.20
-            
-            # Calculate actual savings
-            if not st.session_state.expenses.empty and st.session_state.salary > 0:
-                total_income = 0
-                if st.session_state.salary_history:
-                    total_income = sum(st.session_state.salary_history.values())
-                else:
-                    months = len(st.session_state.expenses['Month'].unique())
-                    total_income = st.session_state.salary * months
-                
-                total_expenses = st.session_state.expenses['Amount'].sum()
-                calculated_savings = max(0, total_income - total_expenses)
-            else:
-                calculated_savings = 0
+            # Savings capacity and actual savings
+            snapshot = savings()
+            monthly_savings_capacity = snapshot['monthly_savings_capacity']
+            calculated_savings = snapshot['calculated_savings']
+            fixed_outflow = sum(fixed_monthly_outflow(recurring_charges()[0]).values())
             
             # Current financial status
-            available_for_goals = max(0, calculated_savings - st.session_state.emergency_fund_target)
-            emergency_shortfall = max(0, st.session_state.emergency_fund_target - calculated_savings)
+            available_for_goals = snapshot['available_for_goals']
+            emergency_shortfall = snapshot['emergency_shortfall']
             
             st.markdown(f"""
             <div class='info-box'>
                 <h3 style='margin: 0; color: white;'>💰 Current Financial Status</h3>
-                <p style='margin: 10px 0 5px 0;'><strong>Total Savings:</strong> ${calculated_savings:,.2f}</p>
-                <p style='margin: 5px 0;'><strong>Emergency Fund Target:</strong> ${st.session_state.emergency_fund_target:,.2f}</p>
-                <p style='margin: 5px 0;'><strong>Emergency Shortfall:</strong> ${emergency_shortfall:,.2f}</p>
-                <p style='margin: 5px 0;'><strong>Available for Goals:</strong> ${available_for_goals:,.2f}</p>
-                <p style='margin: 5px 0;'><strong>Monthly Savings Capacity:</strong> ${monthly_savings_capacity:,.2f}</p>
+                <p style='margin: 10px 0 5px 0;'><strong>Total Savings:</strong> {home_money(calculated_savings)}</p>
+                <p style='margin: 5px 0;'><strong>Emergency Fund Target:</strong> {home_money(st.session_state.emergency_fund_target)}</p>
+                <p style='margin: 5px 0;'><strong>Emergency Shortfall:</strong> {home_money(emergency_shortfall)}</p>
+                <p style='margin: 5px 0;'><strong>Available for Goals:</strong> {home_money(available_for_goals)}</p>
+                <p style='margin: 5px 0;'><strong>Monthly Savings Capacity:</strong> {home_money(monthly_savings_capacity)}</p>
+                <p style='margin: 5px 0;'><strong>Fixed Recurring Charges:</strong> {home_money(fixed_outflow)}/month (already in spending, never cut)</p>
             </div>
             """, unsafe_allow_html=True)
             
             st.markdown("---")
             
-            # Sort goals by priority and deadline
-            priority_order = {'High': 0, 'Medium': 1, 'Low': 2}
-            sorted_goals = sorted(st.session_state.goals, 
-                                 key=lambda g: (priority_order.get(g.get('priority', 'Medium'), 1), 
-                                               g['months_until_goal']))
+            # Goals in priority, then deadline order
+            sorted_goals = st.session_state.goals.ordered()
             
             # Calculate optimal allocation strategy
             st.subheader("🎯 Recommended Goal Achievement Strategy")
@@ -1002,9 +1540,9 @@ elif page == "🎯 Goals":
                 st.markdown(f"""
                 <div class='warning-box'>
                     <h4 style='margin: 0; color: white;'>🚨 PRIORITY 1: Complete Emergency Fund</h4>
-                    <p style='margin: 10px 0 5px 0;'><strong>Needed:</strong> ${emergency_shortfall:,.2f}</p>
-                    <p style='margin: 5px 0;'><strong>Time:</strong> {months_for_emergency} months at ${monthly_savings_capacity:,.2f}/month</p>
-                    <p style='margin: 5px 0;'><strong>Why:</strong> Always keep ${st.session_state.emergency_fund_target:,.2f} for unexpected expenses!</p>
+                    <p style='margin: 10px 0 5px 0;'><strong>Needed:</strong> {home_money(emergency_shortfall)}</p>
+                    <p style='margin: 5px 0;'><strong>Time:</strong> {months_for_emergency} months at {home_money(monthly_savings_capacity)}/month</p>
+                    <p style='margin: 5px 0;'><strong>Why:</strong> Always keep {home_money(st.session_state.emergency_fund_target)} for unexpected expenses!</p>
                 </div>
                 """, unsafe_allow_html=True)
                 
@@ -1027,40 +1565,41 @@ elif page == "🎯 Goals":
             timeline_data = []
             cumulative_months = max(1, months_for_emergency if emergency_shortfall > 0 else 0)
             
-            for i, goal in enumerate(sorted_goals, 1):
-                priority_emoji = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}
-                emoji = priority_emoji.get(goal.get('priority', 'Medium'), '🟡')
-                
-                # Check if current savings cover this goal
-                if running_savings >= goal['target_amount']:
-                    # Can achieve immediately
-                    timeline_data.append({
-                        'Step': i,
-                        'Goal': f"{emoji} {goal['name']}",
-                        'Amount': goal['target_amount'],
-                        'Start Month': cumulative_months,
-                        'End Month': cumulative_months,
-                        'Status': '✅ Achievable Now',
-                        'Strategy': f"Use ${goal['target_amount']:,.2f} from savings"
-                    })
-                    running_savings -= goal['target_amount']
-                else:
-                    # Need to save
-                    still_needed = goal['target_amount'] - running_savings
-                    months_needed = int(np.ceil(still_needed / monthly_savings_capacity)) if monthly_savings_capacity > 0 else 999
+            with profiled("roadmap_loop"):
+                for i, goal in enumerate(sorted_goals, 1):
+                    priority_emoji = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}
+                    emoji = priority_emoji.get(goal.priority, '🟡')
                     
-                    timeline_data.append({
-                        'Step': i,
-                        'Goal': f"{emoji} {goal['name']}",
-                        'Amount': goal['target_amount'],
-                        'Start Month': cumulative_months,
-                        'End Month': cumulative_months + months_needed,
-                        'Status': f'💰 Save {months_needed}mo',
-                        'Strategy': f"${running_savings:,.2f} from savings + save ${monthly_savings_capacity:,.2f}/mo for {months_needed} months"
-                    })
-                    
-                    cumulative_months += months_needed
-                    running_savings = 0  # Used all savings
+                    # Check if current savings cover this goal
+                    if running_savings >= goal.target_amount:
+                        # Can achieve immediately
+                        timeline_data.append({
+                            'Step': i,
+                            'Goal': f"{emoji} {goal.name}",
+                            'Amount': goal.target_amount,
+                            'Start Month': cumulative_months,
+                            'End Month': cumulative_months,
+                            'Status': '✅ Achievable Now',
+                            'Strategy': f"Use {home_money(goal.target_amount)} from savings"
+                        })
+                        running_savings -= goal.target_amount
+                    else:
+                        # Need to save
+                        still_needed = goal.target_amount - running_savings
+                        months_needed = int(np.ceil(still_needed / monthly_savings_capacity)) if monthly_savings_capacity > 0 else 999
+                        
+                        timeline_data.append({
+                            'Step': i,
+                            'Goal': f"{emoji} {goal.name}",
+                            'Amount': goal.target_amount,
+                            'Start Month': cumulative_months,
+                            'End Month': cumulative_months + months_needed,
+                            'Status': f'💰 Save {months_needed}mo',
+                            'Strategy': f"{home_money(running_savings)} from savings + save {home_money(monthly_savings_capacity)}/mo for {months_needed} months"
+                        })
+                        
+                        cumulative_months += months_needed
+                        running_savings = 0  # Used all savings
             
             # Display timeline
             for item in timeline_data:
@@ -1069,7 +1608,7 @@ elif page == "🎯 Goals":
                 st.markdown(f"""
                 <div class='info-box'>
                     <h4 style='margin: 0; color: white;'>Step {item['Step']}: {item['Goal']}</h4>
-                    <p style='margin: 10px 0 5px 0;'><strong>Target Amount:</strong> ${item['Amount']:,.2f}</p>
+                    <p style='margin: 10px 0 5px 0;'><strong>Target Amount:</strong> {home_money(item['Amount'])}</p>
                     <p style='margin: 5px 0;'><strong>Timeline:</strong> {months_range}</p>
                     <p style='margin: 5px 0;'><strong>Status:</strong> {item['Status']}</p>
                     <p style='margin: 5px 0;'><strong>Strategy:</strong> {item['Strategy']}</p>
@@ -1078,12 +1617,12 @@ elif page == "🎯 Goals":
             
             # Summary
             st.markdown("---")
-            total_goal_amount = sum(g['target_amount'] for g in sorted_goals)
+            total_goal_amount = st.session_state.goals.table()['target_amount'].sum()
             total_time = cumulative_months
             
             col1, col2, col3 = st.columns(3)
             col1.metric("Total Goals", len(sorted_goals))
-            col2.metric("Total Amount Needed", f"${total_goal_amount:,.2f}")
+            col2.metric("Total Amount Needed", home_money(total_goal_amount))
             col3.metric("Estimated Timeline", f"{total_time} months")
             
             # Recommendations
@@ -1094,343 +1633,537 @@ elif page == "🎯 Goals":
                 st.warning("⚠️ Your monthly savings capacity is low. Consider reducing expenses or increasing income.")
             
             if emergency_shortfall > 0:
-                st.info(f"💡 Focus on building your emergency fund to ${st.session_state.emergency_fund_target:,.2f} before pursuing other goals.")
+                st.info(f"💡 Focus on building your emergency fund to {home_money(st.session_state.emergency_fund_target)} before pursuing other goals.")
             
-            high_priority_goals = [g for g in sorted_goals if g.get('priority') == 'High']
+            high_priority_goals = st.session_state.goals.ordered(priorities=['High'])
             if len(high_priority_goals) > 2:
                 st.info(f"💡 You have {len(high_priority_goals)} high-priority goals. Consider reducing some to medium priority for better focus.")
             
-            st.success("✅ Always maintain your emergency fund even after achieving goals!")
+            due_soon = st.session_state.goals.ordered(due_within=3)
+            if due_soon:
+                st.info(f"⏰ Due within 3 months: {', '.join(g.name for g in due_soon)}. "
+                        "Keep their savings aside, or move their deadlines if they're out of reach.")
 
-elif page == "🤖 AI Insights":
-    st.header("🤖 AI-Powered Insights")
+            st.success("✅ Always maintain your emergency fund even after achieving goals!")
     
-    tab1, tab2, tab3 = st.tabs(["🔮 Predictions", "🔍 Anomalies", "💡 Optimizer"])
+    with tab4:
+        render_whatif(snapshot)
+
+
+@counted_fragment
+def render_predictions():
+    """Predictions tab: Random Forest vs seasonal trend model (fragment)"""
+    st.subheader("AI Spending Predictions")
     
-    with tab1:
-        st.subheader("AI Spending Predictions")
-        
-        if len(st.session_state.expenses) < 50:
-            st.warning("Need at least 50 expenses for AI predictions!")
-        else:
-            if st.button("Run AI Predictions", type="primary"):
-                try:
-                    df = st.session_state.expenses.copy()
-                    monthly_data = df.groupby(['Year', 'Month', 'Category'])['Amount'].sum().reset_index()
-                    
-                    le = LabelEncoder()
-                    monthly_data['Category_Encoded'] = le.fit_transform(monthly_data['Category'])
-                    
-                    X = monthly_data[['Year', 'Month', 'Category_Encoded']]
-                    y = monthly_data['Amount']
-                    
-                    rf = RandomForestRegressor(n_estimators=100, random_state=42)
-                    rf.fit(X, y)
-                    
-                    next_month = datetime.now().month + 1
-                    next_year = datetime.now().year
-                    if next_month > 12:
-                        next_month = 1
-                        next_year += 1
-                    
-                    st.success(f"Predictions for {MONTH_NAMES[next_month]} {next_year}:")
-                    
-                    predictions = []
-                    for cat in CATEGORIES:
-                        cat_encoded = le.transform([cat])[0]
-                        pred = float(rf.predict([[next_year, next_month, cat_encoded]])[0])
-                        predictions.append({'Category': cat, 'Predicted Amount': pred})
-                    
-                    pred_df = pd.DataFrame(predictions)
-                    total_pred = pred_df['Predicted Amount'].sum()
-                    
-                    # Format for display
-                    pred_df['Predicted Amount'] = pred_df['Predicted Amount'].apply(lambda x: f"${x:,.2f}")
-                    
-                    st.dataframe(pred_df, use_container_width=True, hide_index=True)
-                    st.metric("Total Predicted", f"${total_pred:,.2f}")
-                    
-                except Exception as e:
-                    st.error(f"Prediction error: {str(e)}")
+    if len(st.session_state.expenses) < MIN_PREDICTION_ROWS:
+        st.warning(f"Need at least {MIN_PREDICTION_ROWS} expenses for AI predictions!")
+    else:
+        if st.button("Run AI Predictions", type="primary"):
+            st.session_state.used_predictions = True
+            try:
+                # Warmed in the background after data changes once predictions have been run
+                artifacts = ledger_artifacts()
+                next_year, next_month, rf_df, rf_time = artifacts.get('predictions')
+                _, _, seasonal_df, seasonal_time = artifacts.get('seasonal_prediction')
+                
+                season = get_season(next_month)
+                st.success(f"Predictions for {MONTH_NAMES[next_month]} {next_year} ({season}):")
+                st.caption(f"{season} tips: " + ", ".join(SEASONAL_TIPS[season]))
+                
+                pred_df = seasonal_df[['Category', 'Predicted Amount', 'Confidence']].rename(
+                    columns={'Predicted Amount': 'Seasonal Trend'})
+                pred_df = pred_df.merge(rf_df.rename(columns={'Predicted Amount': 'Random Forest'}),
+                                        on='Category', how='left')
+                pred_df = pred_df[['Category', 'Random Forest', 'Seasonal Trend', 'Confidence']]
+                pred_df[['Random Forest', 'Seasonal Trend']] *= display_rate()
+                
+                st.dataframe(pred_df, use_container_width=True, hide_index=True,
+                             column_config={'Random Forest': money_column(),
+                                            'Seasonal Trend': money_column(),
+                                            'Confidence': st.column_config.ProgressColumn(
+                                                'Confidence', min_value=0, max_value=100, format="%.0f%%")})
+                
+                col1, col2 = st.columns(2)
+                col1.metric("Random Forest Total", money(pred_df['Random Forest'].sum()),
+                            f"{rf_time * 1000:,.0f} ms to train + predict", delta_color="off")
+                col2.metric("Seasonal Trend Total", money(pred_df['Seasonal Trend'].sum()),
+                            f"{seasonal_time * 1000:,.1f} ms, no training", delta_color="off")
+                st.caption("Seasonal Trend blends year-over-year growth, the 6-month trend, the last 3 months "
+                           "and the long-run average with seasonal multipliers and 1% monthly inflation.")
+                
+            except Exception as e:
+                st.error(f"Prediction error: {str(e)}")
+
+
+@counted_fragment
+def render_anomalies():
+    """Anomaly detection tab (fragment)"""
+    st.subheader("Anomaly Detection")
     
-    with tab2:
-        st.subheader("Anomaly Detection")
-        
-        if len(st.session_state.expenses) < 30:
-            st.warning("Need at least 30 expenses for anomaly detection!")
-        else:
-            if st.button("Detect Anomalies", type="primary"):
-                try:
-                    df = st.session_state.expenses.copy()
-                    amounts = df['Amount'].values.reshape(-1, 1)
-                    
-                    iso = IsolationForest(contamination=0.1, random_state=42)
-                    predictions = iso.fit_predict(amounts)
-                    
-                    df['Anomaly'] = predictions
-                    anomalies = df[df['Anomaly'] == -1]
-                    
-                    col1, col2 = st.columns(2)
-                    col1.metric("Total Analyzed", len(df))
-                    col2.metric("Anomalies Found", len(anomalies))
-                    
-                    if len(anomalies) > 0:
-                        st.warning("Unusual transactions detected:")
-                        st.dataframe(anomalies[['Date', 'Category', 'Amount', 'Description']].head(20),
-                                   use_container_width=True, hide_index=True)
-                    else:
-                        st.success("✓ No significant anomalies detected!")
+    if len(st.session_state.expenses) < MIN_ANOMALY_ROWS:
+        st.warning(f"Need at least {MIN_ANOMALY_ROWS} expenses for anomaly detection!")
+    else:
+        if st.button("Detect Anomalies", type="primary"):
+            st.session_state.used_anomalies = True
+            try:
+                df = home_expenses()
+                anomalies, recurring = ledger_artifacts().get('anomalies')
+                
+                col1, col2 = st.columns(2)
+                col1.metric("Total Analyzed", len(df) - recurring.sum())
+                col2.metric("Anomalies Found", len(anomalies))
+                if recurring.any():
+                    st.caption(f"{recurring.sum()} recurring charges (bills, subscriptions) excluded.")
                 
-                except Exception as e:
-                    st.error(f"Detection error: {str(e)}")
+                if len(df) - recurring.sum() < MIN_ANOMALY_ROWS:
+                    st.info(f"Only {len(df) - recurring.sum()} non-recurring expenses: need at least "
+                            f"{MIN_ANOMALY_ROWS} to look for anomalies.")
+                elif len(anomalies) > 0:
+                    st.warning("Unusual transactions detected:")
+                    st.dataframe(anomalies[['Date', 'Category', 'Amount', 'Description']].head(20),
+                               use_container_width=True, hide_index=True)
+                else:
+                    st.success("✓ No significant anomalies detected!")
+            
+            except Exception as e:
+                st.error(f"Detection error: {str(e)}")
+
+
+@counted_fragment
+def render_optimizer():
+    """Optimizer tab (fragment: floor sliders and goal picker rerun only this tab)"""
+    st.subheader("💡 Smart Financial Optimizer & Goal Strategy")
+    
+    # Calculate current savings and monthly savings capacity
+    snapshot = savings()
+    calculated_savings = snapshot['calculated_savings']
+    recent_spending = snapshot['recent_spending']
+    monthly_savings_capacity = snapshot['monthly_savings_capacity']
+    cat_spending = snapshot['category_spending']
+    fixed_spending = fixed_monthly_outflow(recurring_charges()[0])
+    
+    # Display financial overview
+    st.markdown(f"""
+    <div class='info-box'>
+        <h3 style='margin: 0; color: white;'>💰 Your Financial Status</h3>
+        <p style='margin: 10px 0 5px 0;'><strong>Total Savings:</strong> {home_money(calculated_savings)}</p>
+        <p style='margin: 5px 0;'><strong>Emergency Fund Target:</strong> {home_money(st.session_state.emergency_fund_target)}</p>
+        <p style='margin: 5px 0;'><strong>Available for Goals:</strong> {home_money(max(0, calculated_savings - st.session_state.emergency_fund_target))}</p>
+        <p style='margin: 5px 0;'><strong>Monthly Savings Capacity:</strong> {home_money(monthly_savings_capacity)}</p>
+        <p style='margin: 5px 0;'><strong>Avg Monthly Spending:</strong> {home_money(recent_spending)}</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Minimum spending floors used by the allocation solver
+    with st.expander("⚙️ Minimum Spending Floors"):
+        st.caption("The optimizer never cuts a category below this share of its current monthly spending, "
+                   "nor below its detected recurring charges.")
+        floor_cols = st.columns(4)
+        floor_pct = {}
+        for idx, cat in enumerate(CATEGORIES):
+            floor_pct[cat] = floor_cols[idx % 4].slider(
+                cat, 0, 100, int(DEFAULT_FLOOR_PCT.get(cat, 0) * 100), step=5,
+                format="%d%%", key=f"floor_{cat}"
+            ) / 100
     
-    with tab3:
-        st.subheader("💡 Smart Financial Optimizer & Goal Strategy")
+    st.markdown("---")
+    
+    # Option 1: Optimize for a specific goal
+    st.subheader("🎯 Option 1: Optimize for Specific Goal")
+    
+    if not st.session_state.goals:
+        st.info("📝 Add goals in the 'Manage Goals' tab to get personalized optimization advice!")
+    else:
+        # Keyed by id: goals may share a name, so the label carries the deadline too
+        goal_labels = {g.id: f"{g.name} ({MONTH_NAMES[g.target_month]} {g.target_year})" for g in st.session_state.goals}
+        goal_id = st.selectbox("Select Goal to Optimize", list(goal_labels),
+                              format_func=goal_labels.get, key="optimizer_goal_select")
         
-        # Calculate current savings
-        if not st.session_state.expenses.empty and st.session_state.salary > 0:
-            total_income = 0
-            if st.session_state.salary_history:
-                total_income = sum(st.session_state.salary_history.values())
-            else:
-                months = len(st.session_state.expenses['Month'].unique())
-                total_income = st.session_state.salary * months
-            
-            total_expenses = st.session_state.expenses['Amount'].sum()
-            calculated_savings = max(0, total_income - total_expenses)
+        if st.button("🔍 Analyze This Goal", type="primary"):
+            selected_goal = st.session_state.goals.get(goal_id)
             
-            # Calculate monthly savings capacity
-            df = st.session_state.expenses.copy()
-            df['Date'] = pd.to_datetime(df['Date'])
-            three_months_ago = datetime.now() - timedelta(days=90)
-            recent_df = df[df['Date'] >= three_months_ago]
-            
-            if not recent_df.empty:
-                months_count = len(recent_df['Month'].unique())
-                if months_count > 0:
-                    recent_spending = recent_df['Amount'].sum() / months_count
-                else:
-                    recent_spending = recent_df['Amount'].sum() / 3
-            else:
-                recent_spending = 0
+            plan = solve_goal_plan([selected_goal], cat_spending, monthly_savings_capacity,
+                                   calculated_savings, st.session_state.emergency_fund_target,
+                                   floor_pct=floor_pct, fixed_spending=fixed_spending)
+            savings_gap = plan['savings_gap']
             
-            monthly_savings_capacity = max(0, st.session_state.salary - recent_spending)
-        else:
-            calculated_savings = 0
-            recent_spending = 0
-            monthly_savings_capacity = st.session_state.salary * 0.20
-        
-        # Display financial overview
-        st.markdown(f"""
-        <div class='info-box'>
-            <h3 style='margin: 0; color: white;'>💰 Your Financial Status</h3>
-            <p style='margin: 10px 0 5px 0;'><strong>Total Savings:</strong> ${calculated_savings:,.2f}</p>
-            <p style='margin: 5px 0;'><strong>Emergency Fund Target:</strong> ${st.session_state.emergency_fund_target:,.2f}</p>
-            <p style='margin: 5px 0;'><strong>Available for Goals:</strong> ${max(0, calculated_savings - st.session_state.emergency_fund_target):,.2f}</p>
-            <p style='margin: 5px 0;'><strong>Monthly Savings Capacity:</strong> ${monthly_savings_capacity:,.2f}</p>
-            <p style='margin: 5px 0;'><strong>Avg Monthly Spending:</strong> ${recent_spending:,.2f}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        st.markdown("---")
-        
-        # Option 1: Optimize for a specific goal
-        st.subheader("🎯 Option 1: Optimize for Specific Goal")
-        
-        if not st.session_state.goals:
-            st.info("📝 Add goals in the 'Manage Goals' tab to get personalized optimization advice!")
-        else:
-            goal = st.selectbox("Select Goal to Optimize", 
-                               [g['name'] for g in st.session_state.goals],
-                               key="optimizer_goal_select")
+            st.markdown(f"""
+            <div class='info-box'>
+                <h4 style='margin: 0; color: white;'>📋 Goal Details</h4>
+                <p style='margin: 10px 0 5px 0;'><strong>Goal:</strong> {selected_goal.name}</p>
+                <p style='margin: 5px 0;'><strong>Target Amount:</strong> {home_money(selected_goal.target_amount)}</p>
+                <p style='margin: 5px 0;'><strong>Deadline:</strong> {selected_goal.months_until()} months</p>
+                <p style='margin: 5px 0;'><strong>Priority:</strong> {selected_goal.priority}</p>
+                <p style='margin: 5px 0;'><strong>Monthly Savings Needed:</strong> {home_money(selected_goal.monthly_savings_needed())}</p>
+                <p style='margin: 5px 0;'><strong>Your Current Capacity:</strong> {home_money(monthly_savings_capacity)}/month</p>
+            </div>
+            """, unsafe_allow_html=True)
             
-            if st.button("🔍 Analyze This Goal", type="primary"):
-                selected_goal = next(g for g in st.session_state.goals if g['name'] == goal)
-                
-                savings_gap = selected_goal['monthly_savings_needed'] - monthly_savings_capacity
-                
+            if savings_gap > 0:
                 st.markdown(f"""
-                <div class='info-box'>
-                    <h4 style='margin: 0; color: white;'>📋 Goal Details</h4>
-                    <p style='margin: 10px 0 5px 0;'><strong>Goal:</strong> {selected_goal['name']}</p>
-                    <p style='margin: 5px 0;'><strong>Target Amount:</strong> ${selected_goal['target_amount']:,.2f}</p>
-                    <p style='margin: 5px 0;'><strong>Deadline:</strong> {selected_goal['months_until_goal']} months</p>
-                    <p style='margin: 5px 0;'><strong>Priority:</strong> {selected_goal.get('priority', 'Medium')}</p>
-                    <p style='margin: 5px 0;'><strong>Monthly Savings Needed:</strong> ${selected_goal['monthly_savings_needed']:.2f}</p>
-                    <p style='margin: 5px 0;'><strong>Your Current Capacity:</strong> ${monthly_savings_capacity:.2f}/month</p>
+                <div class='warning-box'>
+                    <h4 style='margin: 0;'>⚠️ Savings Gap: {home_money(savings_gap)}/month</h4>
+                    <p style='margin: 10px 0 0 0;'>You need to increase your monthly savings by {home_money(savings_gap)} to reach this goal on time.</p>
                 </div>
                 """, unsafe_allow_html=True)
                 
-                if savings_gap > 0:
-                    st.markdown(f"""
-                    <div class='warning-box'>
-                        <h4 style='margin: 0;'>⚠️ Savings Gap: ${savings_gap:.2f}/month</h4>
-                        <p style='margin: 10px 0 0 0;'>You need to increase your monthly savings by ${savings_gap:.2f} to reach this goal on time.</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    st.subheader("💡 Recommended Actions:")
+                st.subheader("💡 Recommended Actions:")
+                
+                # Smallest cuts that close the gap without breaking any spending floor
+                if not plan['cuts'].empty:
+                    recommendations = pd.DataFrame({
+                        'Category': plan['cuts']['Category'],
+                        'Current Monthly': plan['cuts']['Current Monthly'].apply(home_money),
+                        'Suggested Target': plan['cuts']['Suggested Target'].apply(home_money),
+                        'Monthly Savings': plan['cuts']['Cut'].apply(home_money),
+                        'Annual Impact': plan['cuts']['Cut'].apply(lambda x: home_money(x * 12))
+                    })
                     
-                    # Category spending analysis
-                    if not recent_df.empty:
-                        cat_spending = recent_df.groupby('Category')['Amount'].sum() / months_count
-                        recommendations = []
-                        
-                        for cat in cat_spending.sort_values(ascending=False).head(5).index:
-                            current = cat_spending[cat]
-                            reduction_pct = 0.15  # 15% reduction
-                            reduction = current * reduction_pct
-                            target = current - reduction
-                            
-                            recommendations.append({
-                                'Category': cat,
-                                'Current Monthly': f"${current:.2f}",
-                                'Suggested Target': f"${target:.2f}",
-                                'Monthly Savings': f"${reduction:.2f}",
-                                'Annual Impact': f"${reduction * 12:.2f}"
-                            })
-                        
-                        st.markdown("**📊 Category-by-Category Reduction Plan:**")
-                        st.dataframe(pd.DataFrame(recommendations), use_container_width=True, hide_index=True)
-                        
-                        total_reduction = sum([cat_spending[cat] * 0.15 for cat in cat_spending.sort_values(ascending=False).head(5).index])
-                        
-                        if total_reduction >= savings_gap:
-                            st.success(f"✅ By reducing spending in these top 5 categories by 15%, you'll save ${total_reduction:.2f}/month, which covers your ${savings_gap:.2f} gap!")
-                        else:
-                            remaining = savings_gap - total_reduction
-                            st.warning(f"⚠️ After these reductions (${total_reduction:.2f}), you still need ${remaining:.2f}/month. Consider extending the deadline or finding additional income.")
+                    st.markdown("**📊 Category-by-Category Reduction Plan:**")
+                    st.dataframe(recommendations, use_container_width=True, hide_index=True)
+                
+                total_reduction = plan['total_cut']
+                if plan['uncovered_gap'] <= 0.005:
+                    st.success(f"✅ Cutting {home_money(total_reduction)}/month as shown covers your {home_money(savings_gap)} gap while keeping every category above its floor!")
                 else:
-                    st.success("✓ Great news! You're already saving enough to reach this goal on time!")
-                    ahead_by = monthly_savings_capacity - selected_goal['monthly_savings_needed']
-                    months_early = int((selected_goal['target_amount'] / monthly_savings_capacity) * (ahead_by / monthly_savings_capacity))
-                    st.info(f"💪 You could potentially reach this goal {max(1, months_early)} month(s) earlier, or allocate ${ahead_by:.2f}/month to other goals!")
+                    st.warning(f"⚠️ After these reductions ({home_money(total_reduction)}), you still need {home_money(plan['uncovered_gap'])}/month. Consider extending the deadline, lowering the spending floors or finding additional income.")
+            else:
+                st.success("✓ Great news! You're already saving enough to reach this goal on time!")
+                ahead_by = monthly_savings_capacity - plan['required_capacity']
+                if monthly_savings_capacity > 0:
+                    months_early = int((selected_goal.target_amount / monthly_savings_capacity) * (ahead_by / monthly_savings_capacity))
+                    st.info(f"💪 You could potentially reach this goal {max(1, months_early)} month(s) earlier, or allocate {home_money(ahead_by)}/month to other goals!")
+                else:
+                    st.info("💪 Your current savings already cover this goal.")
+    
+    st.markdown("---")
+    
+    # Option 2: Comprehensive strategy for all goals
+    st.subheader("🎯 Option 2: Comprehensive Strategy for All Goals")
+    
+    if not st.session_state.goals:
+        st.info("📝 Add goals in the 'Manage Goals' tab to get a comprehensive strategy!")
+    elif st.button("📊 Analyze All Goals & Get Complete Strategy", type="primary", key="analyze_all"):
+        st.markdown("### 🎯 Complete Financial Goal Strategy")
+        
+        # Emergency fund analysis
+        emergency_shortfall = max(0, st.session_state.emergency_fund_target - calculated_savings)
+        
+        if emergency_shortfall > 0:
+            st.markdown(f"""
+            <div class='warning-box'>
+                <h4 style='margin: 0;'>🚨 PRIORITY 1: Emergency Fund</h4>
+                <p style='margin: 10px 0 5px 0;'><strong>Status:</strong> {home_money(calculated_savings)} / {home_money(st.session_state.emergency_fund_target)}</p>
+                <p style='margin: 5px 0;'><strong>Shortfall:</strong> {home_money(emergency_shortfall)}</p>
+                <p style='margin: 5px 0;'><strong>Time Needed:</strong> {int(np.ceil(emergency_shortfall / monthly_savings_capacity)) if monthly_savings_capacity > 0 else 999} months</p>
+                <p style='margin: 5px 0;'><strong>Why First:</strong> Protect against unexpected expenses before pursuing other goals.</p>
+            </div>
+            """, unsafe_allow_html=True)
+        else:
+            st.markdown("""
+            <div class='success-box'>
+                <h4 style='margin: 0;'>✅ Emergency Fund Complete!</h4>
+                <p style='margin: 10px 0 0 0;'>Your emergency fund is fully funded. Ready to focus on goals!</p>
+            </div>
+            """, unsafe_allow_html=True)
         
         st.markdown("---")
         
-        # Option 2: Comprehensive strategy for all goals
-        st.subheader("🎯 Option 2: Comprehensive Strategy for All Goals")
+        # Analyze all goals
+        st.subheader("📋 All Goals Analysis")
         
-        if not st.session_state.goals:
-            st.info("📝 Add goals in the 'Manage Goals' tab to get a comprehensive strategy!")
-        elif st.button("📊 Analyze All Goals & Get Complete Strategy", type="primary", key="analyze_all"):
-            st.markdown("### 🎯 Complete Financial Goal Strategy")
+        sorted_goals = st.session_state.goals.ordered()
+        
+        for i, g in enumerate(sorted_goals, 1):
+            priority_emoji = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}.get(g.priority, '🟡')
             
-            # Emergency fund analysis
-            emergency_shortfall = max(0, st.session_state.emergency_fund_target - calculated_savings)
+            can_afford = monthly_savings_capacity >= g.monthly_savings_needed()
+            status_emoji = "✅" if can_afford else "⚠️"
             
-            if emergency_shortfall > 0:
-                st.markdown(f"""
-                <div class='warning-box'>
-                    <h4 style='margin: 0;'>🚨 PRIORITY 1: Emergency Fund</h4>
-                    <p style='margin: 10px 0 5px 0;'><strong>Status:</strong> ${calculated_savings:,.2f} / ${st.session_state.emergency_fund_target:,.2f}</p>
-                    <p style='margin: 5px 0;'><strong>Shortfall:</strong> ${emergency_shortfall:,.2f}</p>
-                    <p style='margin: 5px 0;'><strong>Time Needed:</strong> {int(np.ceil(emergency_shortfall / monthly_savings_capacity)) if monthly_savings_capacity > 0 else 999} months</p>
-                    <p style='margin: 5px 0;'><strong>Why First:</strong> Protect against unexpected expenses before pursuing other goals.</p>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown("""
-                <div class='success-box'>
-                    <h4 style='margin: 0;'>✅ Emergency Fund Complete!</h4>
-                    <p style='margin: 10px 0 0 0;'>Your emergency fund is fully funded. Ready to focus on goals!</p>
-                </div>
-                """, unsafe_allow_html=True)
-            
-            st.markdown("---")
+            st.markdown(f"""
+            <div class='{"success-box" if can_afford else "warning-box"}'>
+                <h4 style='margin: 0;'>{status_emoji} Goal #{i}: {g.name} {priority_emoji}</h4>
+                <p style='margin: 10px 0 5px 0;'><strong>Target:</strong> {home_money(g.target_amount)}</p>
+                <p style='margin: 5px 0;'><strong>Deadline:</strong> {g.months_until()} months</p>
+                <p style='margin: 5px 0;'><strong>Monthly Savings Needed:</strong> {home_money(g.monthly_savings_needed())}</p>
+                <p style='margin: 5px 0;'><strong>Status:</strong> {"Can afford with current capacity" if can_afford else f"Need {home_money(g.monthly_savings_needed() - monthly_savings_capacity)} more per month"}</p>
+            </div>
+            """, unsafe_allow_html=True)
+        
+        st.markdown("---")
+        
+        # Funding schedule from the allocation solver
+        st.subheader("📅 Optimal Funding Schedule")
+        
+        plan = ledger_artifacts().get('goal_plan', plan_inputs()[2])
+        
+        schedule_df = plan['schedule'].copy()
+        schedule_df['Amount'] = schedule_df['Amount'].apply(home_money)
+        for col in ['Start Month', 'End Month']:
+            schedule_df[col] = schedule_df[col].apply(lambda x: "Never" if np.isinf(x) else f"{int(x)}")
+        schedule_df['On Time'] = schedule_df['On Time'].map({True: '✅', False: '⚠️'})
+        st.dataframe(schedule_df, use_container_width=True, hide_index=True)
+        st.caption(f"Funded by priority, then deadline, at {home_money(plan['capacity_after_cuts'])}/month "
+                   f"(current capacity + recommended cuts).")
+        
+        st.markdown("---")
+        
+        # Overall strategy
+        st.subheader("💡 Recommended Overall Strategy")
+        
+        if plan['savings_gap'] <= 0:
+            st.success(f"""
+            ✅ **Great news!** Your monthly savings capacity ({home_money(monthly_savings_capacity)}) meets every goal deadline ({home_money(plan['required_capacity'])}/month needed).
             
-            # Analyze all goals
-            st.subheader("📋 All Goals Analysis")
+            **Recommended approach:**
+            1. Maintain emergency fund at {home_money(st.session_state.emergency_fund_target)}
+            2. Follow the sequential timeline in 'Goal Roadmap' tab
+            3. Focus on high-priority goals first
+            4. As you complete each goal, redirect funds to the next
+            """)
+        else:
+            gap = plan['savings_gap']
+            st.warning(f"""
+            ⚠️ **Challenge Detected:** Meeting every deadline needs {home_money(plan['required_capacity'])}/month, which exceeds your capacity ({home_money(monthly_savings_capacity)}) by {home_money(gap)}/month.
             
-            priority_order = {'High': 0, 'Medium': 1, 'Low': 2}
-            sorted_goals = sorted(st.session_state.goals, 
-                                 key=lambda g: (priority_order.get(g.get('priority', 'Medium'), 1), 
-                                               g['months_until_goal']))
+            **Recommended strategies:**
+            """)
             
-            total_needed_monthly = sum(g['monthly_savings_needed'] for g in st.session_state.goals)
+            st.markdown("**Option A: Sequential Approach** (Recommended)")
+            st.info("""
+            Focus on ONE goal at a time in priority order:
+            - Complete high-priority goals first
+            - Once achieved, redirect full capacity to next goal
+            - This guarantees success on important goals
+            - Timeline will be longer but more achievable
+            """)
             
-            for i, g in enumerate(sorted_goals, 1):
-                priority_emoji = {'High': '🔴', 'Medium': '🟡', 'Low': '🟢'}.get(g.get('priority', 'Medium'), '🟡')
-                
-                can_afford = monthly_savings_capacity >= g['monthly_savings_needed']
-                status_emoji = "✅" if can_afford else "⚠️"
-                
-                st.markdown(f"""
-                <div class='{"success-box" if can_afford else "warning-box"}'>
-                    <h4 style='margin: 0;'>{status_emoji} Goal #{i}: {g['name']} {priority_emoji}</h4>
-                    <p style='margin: 10px 0 5px 0;'><strong>Target:</strong> ${g['target_amount']:,.2f}</p>
-                    <p style='margin: 5px 0;'><strong>Deadline:</strong> {g['months_until_goal']} months</p>
-                    <p style='margin: 5px 0;'><strong>Monthly Savings Needed:</strong> ${g['monthly_savings_needed']:.2f}</p>
-                    <p style='margin: 5px 0;'><strong>Status:</strong> {"Can afford with current capacity" if can_afford else f"Need ${g['monthly_savings_needed'] - monthly_savings_capacity:.2f} more per month"}</p>
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown("**Option B: Parallel Approach with Trade-offs**")
+            st.info("""
+            Work on multiple goals simultaneously:
+            - Extend deadlines for some goals
+            - Accept slower progress on lower-priority items
+            - Requires more discipline and tracking
+            """)
             
-            st.markdown("---")
+            st.markdown("**Option C: Increase Capacity**")
             
-            # Overall strategy
-            st.subheader("💡 Recommended Overall Strategy")
+            # Minimal spending cuts that respect the category floors
+            if not plan['cuts'].empty:
+                cuts_df = plan['cuts'][['Category', 'Current Monthly', 'Cut', 'Suggested Target']].copy()
+                for col in ['Current Monthly', 'Cut', 'Suggested Target']:
+                    cuts_df[col] = cuts_df[col].apply(home_money)
+                st.dataframe(cuts_df, use_container_width=True, hide_index=True)
             
-            if total_needed_monthly <= monthly_savings_capacity:
-                st.success(f"""
-                ✅ **Great news!** Your monthly savings capacity (${monthly_savings_capacity:.2f}) can cover all goals combined (${total_needed_monthly:.2f}/month).
-                
-                **Recommended approach:**
-                1. Maintain emergency fund at ${st.session_state.emergency_fund_target:,.2f}
-                2. Follow the sequential timeline in 'Goal Roadmap' tab
-                3. Focus on high-priority goals first
-                4. As you complete each goal, redirect funds to the next
+            if plan['uncovered_gap'] > 0.005:
+                st.info(f"""
+                **Cuts above save {home_money(plan['total_cut'])}/month; {home_money(plan['uncovered_gap'])}/month is still missing.**
+                - Lower the minimum spending floors, or extend some deadlines
+                - OR seek additional income sources (side gig, raise, etc.)
                 """)
             else:
-                gap = total_needed_monthly - monthly_savings_capacity
-                st.warning(f"""
-                ⚠️ **Challenge Detected:** Total monthly needs (${total_needed_monthly:.2f}) exceed your capacity (${monthly_savings_capacity:.2f}) by ${gap:.2f}/month.
-                
-                **Recommended strategies:**
-                """)
-                
-                st.markdown("**Option A: Sequential Approach** (Recommended)")
-                st.info("""
-                Focus on ONE goal at a time in priority order:
-                - Complete high-priority goals first
-                - Once achieved, redirect full capacity to next goal
-                - This guarantees success on important goals
-                - Timeline will be longer but more achievable
-                """)
+                st.info(f"**Cutting {home_money(plan['total_cut'])}/month as shown closes the whole gap without breaking any spending floor.**")
+        
+        st.markdown("---")
+        
+        # Action items
+        st.subheader("✅ Next Steps")
+        st.markdown("""
+        1. **Review the Goal Roadmap tab** for sequential timeline
+        2. **Track spending weekly** to stay on target
+        3. **Adjust priorities** if circumstances change
+        4. **Celebrate milestones** to stay motivated
+        5. **Review strategy monthly** and adjust as needed
+        """)
+    
+    elif len(st.session_state.goals) > 0:
+        st.info(f"💡 You have {len(st.session_state.goals)} active goal(s). Click above to get a comprehensive strategy for managing all of them together!")
+
+
+@counted_fragment
+def render_forecast():
+    """Monte Carlo forecast tab (fragment: reruns on its own)"""
+    st.subheader("🎲 Monte Carlo Savings Forecast")
+    st.caption("Simulates future months by resampling your past months of spending, "
+               "instead of assuming the recent average stays constant.")
+    
+    if st.session_state.salary <= 0 or st.session_state.expenses.empty:
+        st.warning("Set your salary and add expenses to run a forecast!")
+    else:
+        col1, col2 = st.columns(2)
+        with col1:
+            n_paths = st.select_slider("Simulated paths", [10000, 20000, 50000, 100000], value=20000)
+        with col2:
+            use_pool = st.checkbox("Use process pool", value=False,
+                                   help="Split the simulation across CPU cores")
+        
+        if st.button("Run Forecast", type="primary"):
+            try:
+                start = datetime.now()
+                # Recurring charges are a known fixed outflow; only the rest is resampled
+                series, row_series = recurring_charges()
+                forecast = forecast_goals(
+                    home_expenses()[row_series.to_numpy() < 0],
+                    monthly_income(st.session_state.salary, st.session_state.income_ledger),
+                    accumulated_savings(home_history(), st.session_state.salary,
+                                        st.session_state.income_ledger),
+                    st.session_state.emergency_fund_target, st.session_state.goals,
+                    n_paths=n_paths, workers=os.cpu_count() if use_pool else None,
+                    fixed_monthly=sum(fixed_monthly_outflow(series).values())
+                )
+                elapsed = (datetime.now() - start).total_seconds()
+                if forecast is None:
+                    st.info("Nothing to resample yet: every completed month's spending is recurring charges. "
+                            "Add more expenses to forecast.")
+                    return
                 
-                st.markdown("**Option B: Parallel Approach with Trade-offs**")
-                st.info("""
-                Work on multiple goals simultaneously:
-                - Extend deadlines for some goals
-                - Accept slower progress on lower-priority items
-                - Requires more discipline and tracking
-                """)
+                st.success(f"✓ Simulated {forecast['n_paths']:,} paths from {forecast['months_sampled']} months of history in {elapsed:.2f}s")
+                if forecast['n_paths'] < n_paths:
+                    st.caption(f"Paths capped at {forecast['n_paths']:,} to keep the "
+                               f"{len(forecast['fan'])}-month forecast within memory.")
                 
-                st.markdown("**Option C: Increase Capacity**")
+                fan = forecast['fan'].copy()
+                fan[['p5', 'p25', 'p50', 'p75', 'p95']] *= display_rate()
+                fig = go.Figure()
+                fig.add_trace(go.Scatter(x=fan['Month'], y=fan['p95'], line=dict(width=0), showlegend=False))
+                fig.add_trace(go.Scatter(x=fan['Month'], y=fan['p5'], fill='tonexty', line=dict(width=0),
+                                         fillcolor='rgba(255, 215, 6, 0.2)', name='5th-95th percentile'))
+                fig.add_trace(go.Scatter(x=fan['Month'], y=fan['p75'], line=dict(width=0), showlegend=False))
+                fig.add_trace(go.Scatter(x=fan['Month'], y=fan['p25'], fill='tonexty', line=dict(width=0),
+                                         fillcolor='rgba(255, 193, 7, 0.45)', name='25th-75th percentile'))
+                fig.add_trace(go.Scatter(x=fan['Month'], y=fan['p50'], line=dict(color='#4CAF50', width=3),
+                                         name='Median'))
+                fig.update_layout(xaxis_title="Months Ahead", yaxis_title=f"Projected Savings ({display_currency()})")
+                st.plotly_chart(fig, use_container_width=True)
                 
-                # Show spending reduction opportunities
-                if not recent_df.empty:
-                    cat_spending = recent_df.groupby('Category')['Amount'].sum() / months_count
-                    st.info(f"""
-                    **Reduce spending by ${gap:.2f}/month through:**
-                    - Top 3 spending categories: {', '.join(cat_spending.sort_values(ascending=False).head(3).index.tolist())}
-                    - Consider 15-20% reduction across these categories
-                    - OR seek additional income sources (side gig, raise, etc.)
-                    """)
+                if not forecast['goals'].empty:
+                    goal_df = forecast['goals'].copy()
+                    goal_df['Savings Needed'] = goal_df['Savings Needed'].apply(home_money)
+                    goal_df['Probability'] = goal_df['Probability'].apply(lambda x: f"{x * 100:.1f}%")
+                    st.markdown("**🎯 Chance of Reaching Each Goal On Time**")
+                    st.dataframe(goal_df, use_container_width=True, hide_index=True)
+                    st.caption("Savings Needed includes the emergency fund and every goal funded before it.")
             
-            st.markdown("---")
-            
-            # Action items
-            st.subheader("✅ Next Steps")
-            st.markdown("""
-            1. **Review the Goal Roadmap tab** for sequential timeline
-            2. **Track spending weekly** to stay on target
-            3. **Adjust priorities** if circumstances change
-            4. **Celebrate milestones** to stay motivated
-            5. **Review strategy monthly** and adjust as needed
-            """)
+            except Exception as e:
+                st.error(f"Forecast error: {str(e)}")
+
+
+def render_ai_insights():
+    """AI Insights: predictions, anomalies, optimizer and forecast"""
+    st.header("🤖 AI-Powered Insights")
+    
+    tab1, tab2, tab3, tab4 = st.tabs(["🔮 Predictions", "🔍 Anomalies", "💡 Optimizer", "🎲 Forecast"])
+    
+    with tab1:
+        render_predictions()
+    
+    with tab2:
+        render_anomalies()
+    
+    with tab3:
+        render_optimizer()
+    
+    with tab4:
+        render_forecast()
+
+
+def render_sidebar_stats():
+    """Quick stats in the sidebar (rendered after the page so they reflect its changes)"""
+    if st.session_state.salary > 0:
+        st.metric("Monthly Salary", money(home_to_display(st.session_state.salary)))
+    
+    if not st.session_state.expenses.empty:
+        st.metric("Total Expenses", money(spending_summary()['total']))
         
-        elif len(st.session_state.goals) > 0:
-            st.info(f"💡 You have {len(st.session_state.goals)} active goal(s). Click above to get a comprehensive strategy for managing all of them together!")
+        if st.session_state.salary > 0:
+            savings = accumulated_savings(home_history(), st.session_state.salary,
+                                          st.session_state.income_ledger)
+            st.metric("Total Savings", money(home_to_display(savings)))
+    
+    st.metric("Active Goals", len(st.session_state.goals))
+
+
+PAGES = {
+    "📊 Dashboard": render_dashboard,
+    "⚙️ Setup": render_setup,
+    "💳 Expenses": render_expenses,
+    "📈 Analysis": render_analysis,
+    "🎯 Goals": render_goals,
+    "🤖 AI Insights": render_ai_insights,
+}
+
+# Header with brand colors
+st.markdown("""
+<div style='background: linear-gradient(135deg, #FFD706 0%, #FFC107 100%); 
+            padding: 35px; border-radius: 15px; margin-bottom: 30px;
+            box-shadow: 0 6px 12px rgba(255, 215, 6, 0.4);'>
+    <h1 style='color: #000000; margin: 0; font-size: 42px; font-weight: 800;'>💰 Smart Budget Planner</h1>
+    <p style='color: #000000; font-size: 20px; margin: 10px 0 0 0; font-weight: 600;'>
+        AI-Powered Personal Finance Manager
+    </p>
+</div>
+""", unsafe_allow_html=True)
+
+apply_tiering()
+
+# Sidebar navigation with improved styling
+with st.sidebar:
+    st.markdown("<br><br>", unsafe_allow_html=True)
+    
+    # Navigation menu with modern button-style radio buttons
+    page = st.radio(
+        "Select Page",
+        list(PAGES),
+        label_visibility="collapsed"
+    )
+    
+    st.markdown("---")
+    
+    if fx_table() is not None:
+        currencies = fx_table().currencies
+        st.selectbox("💱 Display currency", currencies, index=currencies.index(HOME_CURRENCY)
+                     if HOME_CURRENCY in currencies else 0, key='display_currency')
+    
+    # Undo / redo of expense and goal changes
+    journal = st.session_state.journal
+    undo_col, redo_col = st.columns(2)
+    undo_col.button("↩️ Undo", on_click=undo_change, disabled=not journal.can_undo, use_container_width=True,
+                    help=f"Undo: {journal.current.label}" if journal.can_undo else None)
+    redo_col.button("↪️ Redo", on_click=redo_change, disabled=not journal.can_redo, use_container_width=True)
+    
+    with st.expander("🕘 History"):
+        st.dataframe(pd.DataFrame(journal.history()).iloc[::-1], hide_index=True, use_container_width=True)
+        # The picked step is widget state and would outlive the change it pointed at, so it follows
+        # the current version whenever the journal moves (a change, undo, redo or a new journal)
+        if st.session_state.get('history_synced') is not journal.current:
+            st.session_state.history_step = journal.position
+            st.session_state.history_synced = journal.current
+        step = st.selectbox("View ledger at step", range(len(journal.versions)), key="history_step")
+        version = journal.versions[step]
+        st.caption(f"{version.label} at {version.timestamp:%H:%M:%S}: {version.rows:,} expenses, "
+                   f"{len(version.goals)} goals")
+        if step != journal.position:
+            st.dataframe(journal.expenses(version).tail(10), hide_index=True, use_container_width=True)
+            st.button("Restore this version", on_click=restore_version)
+        held, full = journal.shared_bytes()
+        st.caption(f"History memory: {held / 1e6:.2f} MB shared vs {full / 1e6:.2f} MB as full copies")
+    
+    st.markdown("---")
+    
+    # Filled in after the page runs, so data changes show up without an extra rerun
+    stats_container = st.container()
+
+# Main content based on selected page
+try:
+    with profiled(f"page:{PAGES[page].__name__}"):
+        PAGES[page]()
+    
+    with stats_container, profiled("sidebar_stats"):
+        render_sidebar_stats()
+    
+    warm_caches()
+finally:
+    st.session_state.rerun_stats['in_full_run'] = False
 
 # Footer
 st.markdown("---")
@@ -1444,3 +2177,45 @@ with col2:
         st.image("BzweenLogo.svg", width=120)
     except:
         st.markdown("<p style='text-align: center; color: #888; font-size: 12px;'>🚀 Bzwen Team</p>", unsafe_allow_html=True)
+
+# Rerun monitor: full-app reruns vs fragment-only reruns
+rerun_stats = st.session_state.rerun_stats
+rerun_stats['full_ms'] = (rerun_stats['full_ms'] + [(time.perf_counter() - run_start) * 1000])[-50:]
+with st.sidebar:
+    with st.expander("⏱️ Rerun Monitor"):
+        st.write(f"**Full reruns:** {rerun_stats['full_runs']} "
+                 f"(last {rerun_stats['full_ms'][-1]:.0f} ms, avg {np.mean(rerun_stats['full_ms']):.0f} ms)")
+        if rerun_stats['fragment_ms']:
+            st.write(f"**Fragment reruns:** {rerun_stats['fragment_runs']} "
+                     f"(last {rerun_stats['fragment_ms'][-1]:.0f} ms in `{rerun_stats['last_fragment']}`, "
+                     f"avg {np.mean(rerun_stats['fragment_ms']):.0f} ms)")
+        else:
+            st.write("**Fragment reruns:** 0")
+    
+    # Background refills of the derived-data cache after the last data change
+    with st.expander("🔥 Cache Warm-up"):
+        warmer = st.session_state.cache_warmer
+        warm_log = warmer.latest()
+        if warm_log:
+            st.dataframe(pd.DataFrame(warm_log)[['Artifact', 'Status', 'ms']], hide_index=True,
+                         use_container_width=True, column_config={'ms': st.column_config.NumberColumn(format="%.1f")})
+        st.caption(f"{warmer.pending} warm-ups still running" if warmer.pending
+                   else "Every derived view of this revision is cached.")
+    
+    # Optional hot-path profiling panel
+    if st.toggle("🛠️ Debug profiling", key="debug_profiling"):
+        scope = st.radio("Scope", ["session", "process"], horizontal=True, key="profiling_scope")
+        profiler = st.session_state.profiler if scope == "session" else PROCESS_PROFILER
+        profile_rows = profiler.summary()
+        if profile_rows:
+            st.dataframe(pd.DataFrame(profile_rows)[['section', 'count', 'p50_ms', 'p95_ms', 'avg_alloc_blocks']],
+                         hide_index=True, use_container_width=True,
+                         column_config={'p50_ms': st.column_config.NumberColumn(format="%.1f"),
+                                        'p95_ms': st.column_config.NumberColumn(format="%.1f"),
+                                        'avg_alloc_blocks': st.column_config.NumberColumn("alloc blocks", format="%.0f")})
+        
+        profilers = {'session': st.session_state.profiler, 'process': PROCESS_PROFILER}
+        st.download_button("📥 Profile (JSON)", to_json(profilers), file_name="profile.json",
+                           mime="application/json")
+        st.download_button("📥 Profile (Prometheus)", to_prometheus(profilers), file_name="profile.prom",
+                           mime="text/plain")
@@ -0,0 +1,149 @@
+"""
+Smart Budget Planner - Headless batch reports
+Computes monthly summaries, predictions and anomaly lists for a directory of expense
+ledgers (CSV or Parquet, one per user) across a process pool.
+
+Usage:
+    python budget_batch.py ledgers/ --output reports/ --workers 8 --salary 4000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from budget_analytics import (CATEGORIES, EMERGENCY_FUND_TARGET, REQUIRED_COLUMNS, clean_expenses, monthly_totals,
+                              savings_snapshot)
+from fx_rates import FX_RATES_PATH, HOME_CURRENCY, convert_ledger, load_fx_table
+from ml_insights import MIN_ANOMALY_ROWS, MIN_PREDICTION_ROWS, detect_anomalies, predict_next_month
+
+LEDGER_SUFFIXES = ('.csv', '.parquet')
+
+
+def load_ledger(path, table=None):
+    """Read one ledger file, validate its rows and convert them to the home currency.
+
+    Rows in a currency the rate `table` can't price (any foreign currency without a table) are dropped.
+    """
+    path = Path(path)
+    raw = pd.read_parquet(path) if path.suffix.lower() == '.parquet' else pd.read_csv(path)
+    missing = [col for col in REQUIRED_COLUMNS if col not in raw.columns]
+    if missing:
+        raise ValueError(f"missing columns: {', '.join(missing)}")
+    expenses = clean_expenses(raw, CATEGORIES, table.currencies if table is not None else [HOME_CURRENCY])
+    return convert_ledger(expenses, table, HOME_CURRENCY)
+
+
+def build_report(expenses, salary=None, emergency_fund_target=None):
+    """JSON-ready report for one ledger"""
+    report = {
+        'currency': HOME_CURRENCY,
+        'rows': len(expenses),
+        'total_spending': float(expenses['Amount'].sum()),
+        'category_totals': {cat: float(v) for cat, v in
+                            expenses.groupby('Category')['Amount'].sum().sort_values(ascending=False).items()},
+        'monthly': [{'period': row.Period, 'total': float(row.Amount)}
+                    for row in monthly_totals(expenses).itertuples()],
+        'predictions': None,
+        'anomalies': [],
+        'savings': None,
+    }
+
+    if len(expenses) >= MIN_PREDICTION_ROWS:
+        year, month, pred_df = predict_next_month(expenses, CATEGORIES)
+        report['predictions'] = {
+            'year': year,
+            'month': month,
+            'categories': dict(zip(pred_df['Category'], pred_df['Predicted Amount'].astype(float))),
+        }
+
+    if len(expenses) >= MIN_ANOMALY_ROWS:
+        anomalies = detect_anomalies(expenses)
+        report['anomalies'] = anomalies[['Date', 'Category', 'Amount', 'Description']].to_dict('records')
+
+    if salary:
+        target = emergency_fund_target if emergency_fund_target is not None else EMERGENCY_FUND_TARGET
+        snapshot = savings_snapshot(expenses, salary, None, target)
+        report['savings'] = {key: float(value) for key, value in snapshot.items()
+                             if key != 'category_spending'}
+
+    return report
+
+
+def process_ledger(path, output_dir, salary=None, emergency_fund_target=None, fx_rates=None):
+    """Load, analyse and write one ledger; returns (name, rows, seconds)"""
+    start = time.perf_counter()
+    expenses = load_ledger(path, load_fx_table(fx_rates))
+    report = build_report(expenses, salary, emergency_fund_target)
+    report['source'] = str(path)
+
+    out_path = Path(output_dir) / f"{Path(path).stem}.report.json"
+    out_path.write_text(json.dumps(report, indent=2, default=float))
+    return Path(path).name, len(expenses), time.perf_counter() - start
+
+
+def find_ledgers(input_dir):
+    return sorted(p for p in Path(input_dir).iterdir() if p.suffix.lower() in LEDGER_SUFFIXES)
+
+
+def run_batch(paths, output_dir, workers=None, salary=None, emergency_fund_target=None,
+              process=process_ledger, **options):
+    """Run `process` (default: the JSON report) on every ledger; returns per-ledger results, failures and wall time"""
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    results, failures = [], []
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(process, path, output_dir, salary, emergency_fund_target, **options): path
+                   for path in paths}
+        for future in as_completed(futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                failures.append((futures[future].name, str(e)))
+
+    return results, failures, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compute budget reports for a directory of expense ledgers")
+    parser.add_argument('input_dir', help="directory of expense CSV or Parquet files (one per user)")
+    parser.add_argument('--output', '-o', default='reports', help="directory for <ledger>.report.json files")
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--salary', type=float, default=None, help="monthly salary used for savings figures")
+    parser.add_argument('--emergency-target', type=float, default=None,
+                        help=f"emergency fund target (default: {EMERGENCY_FUND_TARGET})")
+    parser.add_argument('--fx-rates', default=FX_RATES_PATH,
+                        help=f"FX rate table for converting amounts to {HOME_CURRENCY} (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    paths = find_ledgers(args.input_dir)
+    if not paths:
+        print(f"No ledgers found in {args.input_dir}", file=sys.stderr)
+        return 1
+
+    results, failures, wall = run_batch(paths, args.output, args.workers, args.salary, args.emergency_target,
+                                        fx_rates=args.fx_rates)
+
+    for name, error in failures:
+        print(f"FAILED {name}: {error}", file=sys.stderr)
+
+    if results:
+        latencies = np.array([seconds for _, _, seconds in results]) * 1000
+        total_rows = sum(rows for _, rows, _ in results)
+        print(f"Processed {len(results)} ledgers ({total_rows:,} rows) in {wall:.2f}s "
+              f"with {args.workers} workers")
+        print(f"Throughput: {len(results) / wall:.1f} ledgers/s, {total_rows / wall:,.0f} rows/s")
+        print(f"Per-ledger latency: p50 {np.percentile(latencies, 50):.0f} ms, "
+              f"p95 {np.percentile(latencies, 95):.0f} ms, max {latencies.max():.0f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
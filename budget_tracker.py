@@ -0,0 +1,68 @@
+"""
+Smart Budget Planner - Incremental budget-vs-actual tracker
+Keeps running month-to-date spend per category so budget checks never rescan the ledger.
+"""
+
+import calendar
+from datetime import datetime
+
+
+class BudgetTracker:
+    """Month-to-date spending per category for a single calendar month"""
+
+    def __init__(self, year, month):
+        self.year = year
+        self.month = month
+        self.spent = {}
+
+    @classmethod
+    def from_ledger(cls, expenses, today=None):
+        """Build the tracker for the current month with one pass over the ledger"""
+        today = today or datetime.now()
+        tracker = cls(today.year, today.month)
+        tracker.add_frame(expenses)
+        return tracker
+
+    def is_current(self, today=None):
+        today = today or datetime.now()
+        return (self.year, self.month) == (today.year, today.month)
+
+    def add(self, year, month, category, amount):
+        """Record one expense in O(1); expenses from other months are ignored"""
+        if (year, month) == (self.year, self.month):
+            self.spent[category] = self.spent.get(category, 0) + amount
+
+    def add_frame(self, expenses):
+        """Record a batch of new expenses (only the batch is scanned)"""
+        if expenses.empty:
+            return
+        this_month = expenses[(expenses['Year'].astype(int) == self.year) &
+                              (expenses['Month'].astype(int) == self.month)]
+        for category, amount in this_month.groupby('Category')['Amount'].sum().items():
+            self.spent[category] = self.spent.get(category, 0) + float(amount)
+
+    def status(self, budgets, today=None):
+        """Spent, projected end-of-month spend and alert level for each budgeted category"""
+        today = today or datetime.now()
+        days_in_month = calendar.monthrange(self.year, self.month)[1]
+        elapsed = min(days_in_month, max(1, today.day)) if self.is_current(today) else days_in_month
+
+        rows = []
+        for category, budget in budgets.items():
+            spent = self.spent.get(category, 0)
+            projected = spent / elapsed * days_in_month
+            if budget > 0 and spent > budget:
+                alert = 'over'
+            elif budget > 0 and projected > budget:
+                alert = 'on pace to exceed'
+            else:
+                alert = 'ok'
+            rows.append({
+                'Category': category,
+                'Budget': budget,
+                'Spent': spent,
+                'Projected': projected,
+                'Used %': spent / budget * 100 if budget > 0 else 0,
+                'Alert': alert,
+            })
+        return rows
@@ -0,0 +1,204 @@
+"""
+Smart Budget Planner - Derived-data cache and background warm-up
+Everything the pages derive from one ledger revision (currency conversions, aggregates,
+savings snapshot, roadmap, predictions, anomaly scores) is memoized in a per-revision
+cache. After a change, a small process-wide thread pool fills that cache ahead of the next
+page visit, and a newer change cancels the session's warm-ups that have not started yet.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+
+from budget_analytics import CATEGORIES, savings_snapshot
+from fx_rates import HOME_CURRENCY, convert_ledger, converted_aggregates
+from goal_optimizer import solve_goal_plan
+from ledger_archive import combined_rollup
+from ml_insights import detect_anomalies, predict_next_month
+from profiling import section
+from recurring_charges import detect_recurring, fixed_monthly_outflow
+from seasonal_predictor import predict_seasonal
+from seasonal_views import seasonal_views
+from spending_windows import SpendingWindows
+
+_MISSING = object()
+# Threads shared by every session's warmer, so concurrent sessions can't multiply the ML refits
+WARM_WORKERS = 2
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+
+def shared_pool():
+    """The process-wide warm-up pool, created on first use"""
+    global _shared_pool
+    with _shared_pool_lock:
+        if _shared_pool is None:
+            _shared_pool = ThreadPoolExecutor(max_workers=WARM_WORKERS, thread_name_prefix='cache-warm')
+        return _shared_pool
+
+
+def resolve(cache, key, compute):
+    """cache[key], computing it here unless a running background warm-up is about to deliver it"""
+    value = cache.get(key, _MISSING)
+    if isinstance(value, Future):
+        # A warm-up still waiting in the queue is cheaper to do inline than to wait for
+        if value.cancel():
+            value = _MISSING
+        else:
+            try:
+                return value.result()
+            except CancelledError:
+                value = _MISSING
+    if value is _MISSING:
+        value = cache[key] = compute()
+    return value
+
+
+class LedgerArtifacts:
+    """Derived data of one ledger revision, memoized in `cache` under (name, variant) keys.
+
+    The variant is a currency for money figures, or the planning key for savings and goal
+    plans. Artifacts read their inputs through get(), so pages and the warmer share them.
+    """
+
+    def __init__(self, cache, expenses, table=None, archive=None, profilers=(), plan=None):
+        self.cache = cache
+        self.expenses = expenses
+        self.table = table
+        self.archive = archive
+        self.profilers = profilers
+        # salary, income_ledger, emergency_fund_target, goals, floor_pct[, now]; the goal plan's
+        # variant is (savings variant, ...) so floor and goal edits reuse the snapshot
+        self.plan = plan or {}
+
+    def get(self, name, variant=None):
+        return resolve(self.cache, (name, variant), lambda: self.compute(name, variant))
+
+    def compute(self, name, variant=None):
+        with section(f"artifact:{name}", *self.profilers):
+            return getattr(self, f"_{name}")(variant)
+
+    def history(self, currency=HOME_CURRENCY):
+        """Every month in `currency`: the ledger, or the daily rollup once months are archived"""
+        return self.get('ledger' if self.archive is None else 'history', currency)
+
+    # Artifacts
+
+    def _ledger(self, currency):
+        return convert_ledger(self.expenses, self.table, currency)
+
+    def _rollup(self, _):
+        return combined_rollup(self.archive, self.expenses)
+
+    def _history(self, currency):
+        return convert_ledger(self.get('rollup'), self.table, currency)
+
+    def _summary(self, currency):
+        return converted_aggregates(self.get('rollup'), self.table, currency)
+
+    def _windows(self, currency):
+        return SpendingWindows(self.history(currency))
+
+    def _seasonal_views(self, currency):
+        return seasonal_views(self.history(currency), CATEGORIES)
+
+    def _recurring(self, _):
+        return detect_recurring(self.get('ledger', HOME_CURRENCY), now=self.plan.get('now'))
+
+    def _savings(self, _):
+        return savings_snapshot(self.history(HOME_CURRENCY), self.plan['salary'], self.plan['income_ledger'],
+                                self.plan['emergency_fund_target'], now=self.plan.get('now'),
+                                windows=self.get('windows', HOME_CURRENCY))
+
+    def _goal_plan(self, variant):
+        snapshot = self.get('savings', variant[0])
+        return solve_goal_plan(self.plan['goals'], snapshot['category_spending'],
+                               snapshot['monthly_savings_capacity'], snapshot['calculated_savings'],
+                               self.plan['emergency_fund_target'], floor_pct=self.plan['floor_pct'],
+                               fixed_spending=fixed_monthly_outflow(self.get('recurring')[0]), now=self.plan.get('now'))
+
+    def _predictions(self, _):
+        """(year, month, Random Forest predictions, seconds to fit and predict)"""
+        start = time.perf_counter()
+        year, month, predictions = predict_next_month(self.get('ledger', HOME_CURRENCY), CATEGORIES,
+                                                      profilers=self.profilers)
+        return year, month, predictions, time.perf_counter() - start
+
+    def _seasonal_prediction(self, _):
+        start = time.perf_counter()
+        year, month, predictions = predict_seasonal(self.get('ledger', HOME_CURRENCY), CATEGORIES)
+        return year, month, predictions, time.perf_counter() - start
+
+    def _anomalies(self, _):
+        """(anomalous rows, mask of recurring rows left out of the scoring)"""
+        recurring = self.get('recurring')[1].to_numpy() >= 0
+        return detect_anomalies(self.get('ledger', HOME_CURRENCY), exclude=recurring,
+                                profilers=self.profilers), recurring
+
+
+class CacheWarmer:
+    """Fills one session's artifact cache for its latest revision on the shared warm-up pool"""
+
+    def __init__(self, pool=None, history=100):
+        self._pool = pool or shared_pool()
+        self._lock = threading.Lock()
+        self._pending = []
+        self.revision = None
+        self.generation = 0
+        self.log = deque(maxlen=history)
+
+    def schedule(self, revision, artifacts, keys):
+        """Queue warm-ups of `keys` ((name, variant) pairs, inputs first) unless `revision` is already warming.
+
+        Warm-ups of the previous revision that haven't started are cancelled.
+        """
+        with self._lock:
+            if revision == self.revision:
+                return False
+            self.cancel()
+            self.revision = revision
+            self.generation += 1
+            for key in keys:
+                if key in artifacts.cache:
+                    continue
+                placeholder = Future()
+                artifacts.cache[key] = placeholder
+                self._pending.append((key, placeholder))
+                self._pool.submit(self._run, self.generation, artifacts, key, placeholder)
+        return True
+
+    def cancel(self):
+        for key, placeholder in self._pending:
+            if placeholder.cancel():
+                self._record(key, self.generation, 'cancelled', 0.0)
+        self._pending = []
+
+    def _run(self, generation, artifacts, key, placeholder):
+        if not placeholder.set_running_or_notify_cancel():
+            return
+        start = time.perf_counter()
+        try:
+            value = artifacts.compute(*key)
+        except Exception as exc:
+            placeholder.set_exception(exc)
+            self._record(key, generation, f'failed: {exc}', time.perf_counter() - start)
+            return
+        placeholder.set_result(value)
+        if artifacts.cache.get(key) is placeholder:
+            artifacts.cache[key] = value
+        self._record(key, generation, 'warm', time.perf_counter() - start)
+
+    def _record(self, key, generation, status, seconds):
+        name, variant = key
+        label = f"{name} ({variant})" if isinstance(variant, str) else name
+        self.log.append({'Run': generation, 'Artifact': label, 'Status': status, 'ms': seconds * 1000})
+
+    @property
+    def pending(self):
+        """Warm-ups of the current revision still queued or running"""
+        return sum(not placeholder.done() for _, placeholder in self._pending)
+
+    def latest(self):
+        """Warm-up log entries of the current revision"""
+        return [entry for entry in self.log if entry['Run'] == self.generation]
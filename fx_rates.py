@@ -0,0 +1,174 @@
+"""
+Smart Budget Planner - Multi-currency support
+FX rate tables loaded from a local CSV/JSON file (cached per day) and vectorized
+conversion of ledgers and their aggregates into any base currency.
+"""
+
+import hashlib
+import json
+import os
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Currency of salary, budgets, goals and rate-less amounts; set once per deployment
+HOME_CURRENCY = os.environ.get('BUDGET_HOME_CURRENCY', 'USD').strip().upper()
+# Optional rate table (Currency,Rate[,Date]); without it every amount is in the home currency
+FX_RATES_PATH = os.environ.get('BUDGET_FX_RATES', os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                              'fx_rates.csv'))
+CURRENCY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£', 'JPY': '¥', 'TRY': '₺', 'IQD': 'IQD '}
+
+
+def currency_symbol(currency):
+    return CURRENCY_SYMBOLS.get(currency, f"{currency} ")
+
+
+def format_money(amount, currency=HOME_CURRENCY, decimals=2):
+    return f"{currency_symbol(currency)}{amount:,.{decimals}f}"
+
+
+class FXTable:
+    """Rates quoted as units of each currency per 1 unit of `quote`, optionally dated.
+
+    Dated tables convert each expense at the rate dated closest to it.
+    """
+
+    def __init__(self, rates, quote=HOME_CURRENCY):
+        rates = rates.copy()
+        rates['Currency'] = rates['Currency'].str.upper().str.strip()
+        rates['Rate'] = rates['Rate'].astype(float)
+        self.dated = 'Date' in rates.columns and rates['Date'].notna().any()
+        if self.dated:
+            rates['Date'] = pd.to_datetime(rates['Date'])
+            rates = rates.sort_values('Date', kind='stable')
+        else:
+            rates = rates.drop_duplicates('Currency', keep='last')
+        quote = quote.upper()
+        if quote not in set(rates['Currency']):
+            rates = pd.concat([rates, pd.DataFrame({'Currency': [quote], 'Rate': [1.0]})], ignore_index=True)
+            if self.dated:
+                rates['Date'] = rates['Date'].fillna(rates['Date'].min())
+        self.rates = rates.reset_index(drop=True)
+        self.quote = quote
+        self.version = hashlib.sha1(pd.util.hash_pandas_object(self.rates, index=False).to_numpy()).hexdigest()[:12]
+
+    @property
+    def currencies(self):
+        return sorted(self.rates['Currency'].unique())
+
+    @classmethod
+    def from_file(cls, path):
+        """CSV with Currency,Rate[,Date] columns (rates per USD), or JSON {"base": "USD", "rates": {...}}
+        with either flat rates or {"2025-01-01": {...}, ...} per day"""
+        path = Path(path)
+        if path.suffix.lower() == '.json':
+            data = json.loads(path.read_text())
+            rates = data['rates']
+            if rates and all(isinstance(v, dict) for v in rates.values()):
+                frame = pd.DataFrame([(d, c, r) for d, day_rates in rates.items() for c, r in day_rates.items()],
+                                     columns=['Date', 'Currency', 'Rate'])
+            else:
+                frame = pd.DataFrame(list(rates.items()), columns=['Currency', 'Rate'])
+            return cls(frame, data.get('base', HOME_CURRENCY))
+        return cls(pd.read_csv(path))
+
+    def rates_for(self, currencies, dates=None):
+        """Quote-per-unit rate for each (currency, date) pair in one vectorized lookup"""
+        currencies = pd.Series(currencies, dtype=object).str.upper().to_numpy()
+        if not self.dated or dates is None:
+            latest = self.rates.drop_duplicates('Currency', keep='last').set_index('Currency')['Rate']
+            return pd.Series(currencies).map(latest).to_numpy(dtype=float)
+
+        left = pd.DataFrame({'Currency': currencies, 'Date': pd.to_datetime(pd.Series(dates), errors='coerce',
+                                                                            format='mixed').to_numpy(),
+                             'pos': np.arange(len(currencies))})
+        left['Date'] = left['Date'].fillna(self.rates['Date'].max())
+        merged = pd.merge_asof(left.sort_values('Date', kind='stable'), self.rates[['Date', 'Currency', 'Rate']],
+                               on='Date', by='Currency', direction='nearest')
+        out = np.empty(len(left))
+        out[merged['pos'].to_numpy()] = merged['Rate'].to_numpy(dtype=float)
+        return out
+
+    def factors(self, currencies, dates, base):
+        """Multiplier from each row's currency into `base`"""
+        base_rate = self.rates_for(np.full(len(currencies), base.upper(), dtype=object), dates)
+        return base_rate / self.rates_for(currencies, dates)
+
+
+@lru_cache(maxsize=8)
+def _load_table(path, mtime_ns, day):
+    return FXTable.from_file(path)
+
+
+def load_fx_table(path, day=None):
+    """Rate table for `path`, re-read at most once per day (or when the file changes); None if missing"""
+    if not path or not os.path.exists(path):
+        return None
+    return _load_table(str(path), os.stat(path).st_mtime_ns, day or date.today())
+
+
+def row_currencies(expenses, home=HOME_CURRENCY):
+    """Each row's currency; rows without one are in the home currency"""
+    if 'Currency' not in expenses.columns:
+        return pd.Series(home, index=expenses.index, dtype=object)
+    return expenses['Currency'].fillna(home).astype(str).str.upper()
+
+
+def is_single_currency(expenses, currency, home=HOME_CURRENCY):
+    return bool((row_currencies(expenses, home) == currency.upper()).all())
+
+
+def unknown_currencies(expenses, table, home=HOME_CURRENCY):
+    """Sorted currencies of `expenses` rows that `table` has no rate for (none without a table)"""
+    if table is None or expenses.empty:
+        return []
+    return sorted(set(row_currencies(expenses, home).unique()) - set(table.currencies))
+
+
+def _require_rates(table, currencies, base):
+    unknown = sorted((set(currencies) | {base.upper()}) - set(table.currencies))
+    if unknown:
+        raise ValueError(f"no FX rate for: {', '.join(unknown)}")
+
+
+def convert_ledger(expenses, table, base, home=HOME_CURRENCY):
+    """Copy of the ledger with every Amount in `base` (the same frame if nothing needs converting).
+
+    Raises ValueError for rows in a currency the table has no rate for; drop those on import.
+    """
+    if expenses.empty or table is None or is_single_currency(expenses, base, home):
+        return expenses
+    _require_rates(table, row_currencies(expenses, home).unique(), base)
+    converted = expenses.copy()
+    factors = table.factors(row_currencies(expenses, home).to_numpy(), expenses['Date'], base)
+    converted['Amount'] = expenses['Amount'].to_numpy(dtype=float) * factors
+    converted['Currency'] = base.upper()
+    return converted
+
+
+def ledger_rollup(expenses, home=HOME_CURRENCY):
+    """Spending per (Year, Month, Date, Category, Currency): the only input aggregates need
+    to be re-priced in another currency"""
+    frame = expenses[['Year', 'Month', 'Date', 'Category', 'Amount']].assign(
+        Currency=row_currencies(expenses, home).to_numpy())
+    return frame.groupby(['Year', 'Month', 'Date', 'Category', 'Currency'], sort=False, observed=True).agg(
+        Amount=('Amount', 'sum'), Count=('Amount', 'size')).reset_index()
+
+
+def converted_aggregates(rollup, table, base):
+    """Total, transaction count, category totals and monthly totals in `base` from a ledger rollup"""
+    amounts = rollup['Amount'].to_numpy(dtype=float)
+    if table is not None and not (rollup['Currency'] == base.upper()).all():
+        _require_rates(table, rollup['Currency'].unique(), base)
+        amounts = amounts * table.factors(rollup['Currency'].to_numpy(), rollup['Date'], base)
+    priced = rollup[['Year', 'Month', 'Category']].assign(Amount=amounts)
+    return {
+        'currency': base.upper(),
+        'total': float(amounts.sum()),
+        'count': int(rollup['Count'].sum()),
+        'category_totals': priced.groupby('Category')['Amount'].sum(),
+        'monthly': priced.groupby(['Year', 'Month'])['Amount'].sum().reset_index(),
+    }
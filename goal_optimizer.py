@@ -0,0 +1,127 @@
+"""
+Smart Budget Planner - Goal allocation solver
+Computes the minimal spending cuts and a funding schedule that meet every goal deadline,
+respecting per-category minimum spending floors and the emergency fund.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from goal_store import PRIORITY_ORDER, goal_table
+
+# Minimum monthly spend per category, as a fraction of current spending
+DEFAULT_FLOOR_PCT = {
+    'Food': 0.70, 'Transportation': 0.80, 'Entertainment': 0.30,
+    'Shopping': 0.30, 'Bills': 1.00, 'Healthcare': 1.00,
+    'Education': 1.00, 'Other': 0.50
+}
+
+
+def minimal_cuts(spending, floors, amount):
+    """Spread `amount` of monthly cuts over categories in proportion to their headroom above the floor.
+
+    Returns (cuts, uncovered) where uncovered is the part of `amount` the floors don't allow.
+    """
+    spending = np.asarray(spending, dtype=float)
+    headroom = np.maximum(0, spending - np.minimum(spending, floors))
+    total_headroom = headroom.sum()
+
+    covered = min(amount, total_headroom)
+    if covered <= 0:
+        return np.zeros_like(spending), max(0, amount)
+    return headroom * (covered / total_headroom), amount - covered
+
+
+def _schedule(amounts, deadlines, capacity, savings, emergency_target):
+    """Sequential funding schedule (amounts already in funding order)"""
+    emergency_shortfall = max(0, emergency_target - savings)
+    available = max(0, savings - emergency_target)
+
+    # Money still to be saved from monthly capacity once each goal is funded
+    remaining = np.maximum(0, emergency_shortfall + np.cumsum(amounts) - available)
+    if capacity > 0:
+        end = np.ceil(remaining / capacity)
+        emergency_months = np.ceil(emergency_shortfall / capacity)
+    else:
+        end = np.where(remaining > 0, np.inf, 0)
+        emergency_months = np.inf if emergency_shortfall > 0 else 0
+
+    start = np.concatenate(([emergency_months], end[:-1]))[:len(end)]
+    return start, end, remaining, end <= deadlines
+
+
+@lru_cache(maxsize=64)
+def _solve(goal_rows, spend_items, floor_items, capacity, savings, emergency_target):
+    names = np.array([g[0] for g in goal_rows], dtype=object)
+    amounts = np.array([g[1] for g in goal_rows], dtype=float)
+    labels = np.array([g[2] for g in goal_rows], dtype=object)
+    priorities = np.array([PRIORITY_ORDER.get(p, 1) for p in labels], dtype=int)
+    deadlines = np.array([g[3] for g in goal_rows], dtype=float)
+
+    # Fund goals by priority, then earliest deadline
+    order = np.lexsort((deadlines, priorities))
+    names, amounts, labels, deadlines = names[order], amounts[order], labels[order], deadlines[order]
+
+    start, end, remaining, _ = _schedule(amounts, deadlines, capacity, savings, emergency_target)
+
+    # Smallest monthly capacity that meets every (future) deadline in this order
+    future = deadlines > 0
+    required = (remaining[future] / deadlines[future]).max() if future.any() else 0
+    gap = max(0, required - capacity)
+
+    categories = [c for c, _ in spend_items]
+    spending = np.array([s for _, s in spend_items], dtype=float)
+    floors = np.array([dict(floor_items).get(c, 0) for c in categories], dtype=float)
+    cuts, uncovered = minimal_cuts(spending, floors, gap)
+
+    new_capacity = capacity + cuts.sum()
+    start, end, _, on_time = _schedule(amounts, deadlines, new_capacity, savings, emergency_target)
+
+    schedule = pd.DataFrame({
+        'Goal': names,
+        'Priority': labels,
+        'Amount': amounts,
+        'Deadline (months)': deadlines.astype(int),
+        'Start Month': start,
+        'End Month': end,
+        'On Time': on_time,
+    })
+    cut_plan = pd.DataFrame({
+        'Category': categories,
+        'Current Monthly': spending,
+        'Floor': np.minimum(spending, floors),
+        'Cut': cuts,
+        'Suggested Target': spending - cuts,
+    }).sort_values('Cut', ascending=False)
+
+    return {
+        'schedule': schedule,
+        'cuts': cut_plan[cut_plan['Cut'] > 0.005],
+        'required_capacity': float(required),
+        'savings_gap': float(gap),
+        'total_cut': float(cuts.sum()),
+        'uncovered_gap': float(uncovered),
+        'capacity_after_cuts': float(new_capacity),
+    }
+
+
+def solve_goal_plan(goals, category_spending, monthly_savings_capacity, calculated_savings,
+                    emergency_fund_target, floor_pct=None, fixed_spending=None, now=None):
+    """Minimal category cuts and funding schedule for `goals`.
+
+    `fixed_spending` ({category: monthly amount}, e.g. detected recurring bills) is never cut.
+    Results are cached per input state; treat the returned DataFrames as read-only.
+    """
+    floor_pct = DEFAULT_FLOOR_PCT if floor_pct is None else floor_pct
+    table = goal_table(goals, now)
+    goal_rows = tuple(zip(table['name'].tolist(), table['target_amount'].tolist(), table['priority'].tolist(),
+                          table['months_until'].tolist()))
+    spend_items = tuple((c, round(float(s), 2)) for c, s in category_spending.items())
+    fixed_spending = fixed_spending or {}
+    floor_items = tuple((c, min(s, max(s * floor_pct.get(c, 0), fixed_spending.get(c, 0))))
+                        for c, s in spend_items)
+
+    return _solve(goal_rows, spend_items, floor_items, round(float(monthly_savings_capacity), 2),
+                  round(float(calculated_savings), 2), float(emergency_fund_target))
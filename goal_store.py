@@ -0,0 +1,124 @@
+"""
+Smart Budget Planner - Goal store
+Goals as small immutable records with stable IDs. Months remaining and the monthly
+saving needed are derived from the current date whenever they are read, and the store
+sorts and filters all goals at once by priority and deadline.
+"""
+
+import uuid
+from dataclasses import dataclass, replace
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+PRIORITIES = ['High', 'Medium', 'Low']
+PRIORITY_ORDER = {p: i for i, p in enumerate(PRIORITIES)}
+GOAL_COLUMNS = ['id', 'name', 'priority', 'priority_rank', 'target_amount', 'target_year', 'target_month',
+                'months_until', 'monthly_needed']
+
+
+def months_until(target_year, target_month, now=None):
+    """Months from the current month to a target month (scalars or arrays)"""
+    now = now or datetime.now()
+    return np.asarray(target_year) * 12 + np.asarray(target_month) - (now.year * 12 + now.month)
+
+
+@dataclass(frozen=True, slots=True)
+class Goal:
+    id: str
+    name: str
+    target_amount: float
+    target_year: int
+    target_month: int
+    priority: str = 'Medium'
+    allocated_savings: float = 0.0
+
+    @classmethod
+    def new(cls, name, target_amount, target_year, target_month, priority='Medium'):
+        return cls(uuid.uuid4().hex[:8], name, float(target_amount), int(target_year), int(target_month), priority)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Goal from a plain dict (e.g. a goals JSON file); stored derived fields are ignored"""
+        return cls(str(data.get('id') or uuid.uuid4().hex[:8]), data['name'], float(data['target_amount']),
+                   int(data['target_year']), int(data['target_month']), data.get('priority', 'Medium'),
+                   float(data.get('allocated_savings', 0)))
+
+    @property
+    def priority_rank(self):
+        return PRIORITY_ORDER.get(self.priority, 1)
+
+    def months_until(self, now=None):
+        return int(months_until(self.target_year, self.target_month, now))
+
+    def monthly_savings_needed(self, now=None):
+        """Saving per month to reach the target by its month (all of it once the deadline is here)"""
+        return self.target_amount / max(1, self.months_until(now))
+
+
+def goal_table(goals, now=None):
+    """One row per goal with its derived fields computed for `now` in one pass"""
+    goals = [g if isinstance(g, Goal) else Goal.from_dict(g) for g in goals]
+    if not goals:
+        return pd.DataFrame(columns=GOAL_COLUMNS)
+    table = pd.DataFrame({
+        'id': [g.id for g in goals],
+        'name': [g.name for g in goals],
+        'priority': [g.priority for g in goals],
+        'priority_rank': [g.priority_rank for g in goals],
+        'target_amount': np.array([g.target_amount for g in goals], dtype=float),
+        'target_year': np.array([g.target_year for g in goals], dtype=int),
+        'target_month': np.array([g.target_month for g in goals], dtype=int),
+    })
+    table['months_until'] = months_until(table['target_year'].to_numpy(), table['target_month'].to_numpy(), now)
+    table['monthly_needed'] = table['target_amount'] / np.maximum(1, table['months_until'])
+    return table
+
+
+def ordered_goals(goals, now=None, priorities=None, due_within=None):
+    """Goal table in roadmap order (priority, then deadline), optionally filtered"""
+    table = goal_table(goals, now)
+    keep = np.ones(len(table), dtype=bool)
+    if priorities is not None:
+        keep &= table['priority'].isin(priorities).to_numpy()
+    if due_within is not None:
+        keep &= table['months_until'].to_numpy() <= due_within
+    table = table[keep]
+    order = np.lexsort((table['months_until'].to_numpy(), table['priority_rank'].to_numpy()))
+    return table.iloc[order].reset_index(drop=True)
+
+
+class GoalStore:
+    """Immutable collection of goals; changes return a new store that shares the untouched goals"""
+
+    __slots__ = ('goals',)
+
+    def __init__(self, goals=()):
+        self.goals = tuple(g if isinstance(g, Goal) else Goal.from_dict(g) for g in goals)
+
+    def __iter__(self):
+        return iter(self.goals)
+
+    def __len__(self):
+        return len(self.goals)
+
+    def get(self, goal_id):
+        return next((g for g in self.goals if g.id == goal_id), None)
+
+    def add(self, goal):
+        return GoalStore(self.goals + (goal,))
+
+    def update(self, goal_id, **changes):
+        return GoalStore(replace(g, **changes) if g.id == goal_id else g for g in self.goals)
+
+    def remove(self, goal_id):
+        return GoalStore(g for g in self.goals if g.id != goal_id)
+
+    def table(self, now=None):
+        return goal_table(self.goals, now)
+
+    def ordered(self, now=None, priorities=None, due_within=None):
+        """Goals in roadmap order (priority, then deadline), optionally filtered"""
+        by_id = {g.id: g for g in self.goals}
+        return [by_id[i] for i in ordered_goals(self.goals, now, priorities, due_within)['id']]
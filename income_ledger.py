@@ -0,0 +1,107 @@
+"""
+Smart Budget Planner - Monthly income ledger
+Dense per-month income arrays (one per source) indexed by calendar month, with
+prefix sums for vectorized "income over months X-Y" queries.
+"""
+
+from datetime import datetime
+
+import numpy as np
+
+
+def month_index(year, month):
+    """Calendar month as a single integer (works on scalars and arrays)"""
+    return np.asarray(year) * 12 + np.asarray(month) - 1
+
+
+def month_label(index):
+    """'YYYY-MM' key for a month index"""
+    return f"{index // 12}-{index % 12 + 1:02d}"
+
+
+class IncomeLedger:
+    """Monthly income per source from `start` (a month index) up to the last recorded month.
+
+    Months after the last recorded month repeat its income; months before `start`
+    repeat the first month's income.
+    """
+
+    def __init__(self, start, n_months=1):
+        self.start = int(start)
+        self.sources = {}
+        self._n_months = int(n_months)
+        self._prefix = None
+
+    @classmethod
+    def from_salary(cls, base_salary, months=24, today=None, source='Salary'):
+        """Salary history for the last `months` calendar months (15% raise each August)"""
+        today = today or datetime.now()
+        current = int(month_index(today.year, today.month))
+        ledger = cls(current - months + 1, months)
+
+        idx = np.arange(ledger.start, current + 1)
+        years, month_nums = idx // 12, idx % 12 + 1
+        years_back = (today.year - years) + ((today.month < 8) & (month_nums >= 8))
+        ledger.sources[source] = base_salary / (1.15 ** years_back)
+        return ledger
+
+    @property
+    def end(self):
+        return self.start + self._n_months - 1
+
+    def _extend(self, first, last):
+        """Grow every source array to cover month indexes first..last, repeating its first and last
+        month outwards (as income_between extrapolates)"""
+        before = max(0, self.start - first)
+        after = max(0, last - self.end)
+        if not before and not after:
+            return
+        for name, values in self.sources.items():
+            self.sources[name] = np.concatenate([np.full(before, values[0]), values, np.full(after, values[-1])])
+        self.start -= before
+        self._n_months += before + after
+
+    def set_income(self, source, year, month, amount):
+        """Record `amount` per month for `source` from the given month onwards (e.g. a raise)"""
+        idx = int(month_index(year, month))
+        self._extend(idx, idx)
+        if source not in self.sources:
+            self.sources[source] = np.zeros(self._n_months)
+        self.sources[source][idx - self.start:] = amount
+        self._prefix = None
+
+    def remove_source(self, source):
+        self.sources.pop(source, None)
+        self._prefix = None
+
+    def monthly_totals(self):
+        """Total income per month from `start` to `end`"""
+        if not self.sources:
+            return np.zeros(self._n_months)
+        return np.sum(list(self.sources.values()), axis=0)
+
+    def income_for_month(self, year, month):
+        idx = int(month_index(year, month))
+        return float(self.income_between(idx, idx))
+
+    def income_between(self, first, last):
+        """Total income for month indexes first..last inclusive (scalars or arrays)"""
+        if self._prefix is None:
+            self._prefix = np.concatenate(([0.0], np.cumsum(self.monthly_totals())))
+        prefix = self._prefix
+        totals = np.diff(prefix)
+
+        first = np.asarray(first)
+        last = np.asarray(last)
+        lo = np.clip(first - self.start, 0, self._n_months)
+        hi = np.clip(last - self.start + 1, 0, self._n_months)
+        inside = np.where(hi > lo, prefix[hi] - prefix[np.minimum(lo, hi)], 0)
+
+        # Extrapolate outside the recorded range with the first / last month's income
+        head = np.clip(np.minimum(last + 1, self.start) - first, 0, None) * totals[0]
+        tail = np.clip(last - np.maximum(first - 1, self.end), 0, None) * totals[-1]
+        return np.where(last >= first, inside + head + tail, 0)
+
+    def history(self):
+        """{'YYYY-MM': total income} for the recorded months"""
+        return {month_label(self.start + i): float(v) for i, v in enumerate(self.monthly_totals())}
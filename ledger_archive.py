@@ -0,0 +1,150 @@
+"""
+Smart Budget Planner - Hot/cold ledger tiering
+Keeps the recent months of the ledger in memory and moves older months to an on-disk
+archive of uncompressed Arrow IPC segments. Segments are memory-mapped on read, so
+full-history scans use the page cache (zero-copy buffers) instead of session memory,
+and each segment's pre-aggregated daily rollup answers history totals without reading rows.
+"""
+
+import os
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from budget_analytics import EXPENSE_COLUMNS, encode_descriptions
+from fx_rates import ledger_rollup
+from income_ledger import month_index
+
+HOT_MONTHS = 13
+ROLLUP_COLUMNS = ['Year', 'Month', 'Date', 'Category', 'Currency', 'Amount', 'Count']
+
+
+def tier_cutoff(hot_months=HOT_MONTHS, now=None):
+    """First month index that stays in memory"""
+    now = pd.Timestamp(now) if now is not None else pd.Timestamp.now()
+    return int(month_index(now.year, now.month)) - hot_months + 1
+
+
+def split_hot_cold(expenses, hot_months=HOT_MONTHS, now=None):
+    """(rows from the last `hot_months` months, older rows)"""
+    idx = month_index(expenses['Year'].to_numpy(dtype=int), expenses['Month'].to_numpy(dtype=int))
+    hot = idx >= tier_cutoff(hot_months, now)
+    return expenses[hot], expenses[~hot]
+
+
+def _write_segment(path, frame):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _map_segment(path):
+    """Arrow table whose buffers point into the memory-mapped file"""
+    return pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+
+
+class LedgerArchive:
+    """Append-only directory of cold ledger segments (rows + daily rollup per segment)"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._cleanup = None
+        self.segments = sorted(self.directory.glob('rows-*.arrow'))
+        rollups = [_map_segment(p).to_pandas() for p in sorted(self.directory.glob('rollup-*.arrow'))]
+        self._rollup = pd.concat(rollups, ignore_index=True) if rollups else pd.DataFrame(columns=ROLLUP_COLUMNS)
+
+    @classmethod
+    def create(cls, parent=None):
+        """A fresh archive in its own directory under `parent` (BUDGET_ARCHIVE_DIR or the temp dir).
+
+        The directory belongs to the archive: it is removed by close(), when the archive is garbage
+        collected (its session ended) or at interpreter exit, whichever comes first.
+        """
+        parent = parent or os.environ.get('BUDGET_ARCHIVE_DIR') or tempfile.gettempdir()
+        Path(parent).mkdir(parents=True, exist_ok=True)
+        archive = cls(tempfile.mkdtemp(prefix='ledger-archive-', dir=parent))
+        archive._cleanup = weakref.finalize(archive, shutil.rmtree, str(archive.directory), ignore_errors=True)
+        return archive
+
+    def close(self):
+        """Delete the directory of an archive made by create(); opened directories are left alone"""
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def append(self, rows):
+        """Write `rows` as a new segment; existing segments are never rewritten"""
+        if rows.empty:
+            return
+        number = len(self.segments) + 1
+        rows = rows.reset_index(drop=True)
+        rollup = ledger_rollup(rows)
+        _write_segment(self.directory / f'rows-{number:05d}.arrow', rows)
+        _write_segment(self.directory / f'rollup-{number:05d}.arrow', rollup)
+        self.segments.append(self.directory / f'rows-{number:05d}.arrow')
+        self._rollup = pd.concat([self._rollup, rollup], ignore_index=True) if len(self._rollup) else rollup
+
+    # Reads
+
+    @property
+    def rollup(self):
+        """Spending per (Year, Month, Date, Category, Currency) for every archived row"""
+        return self._rollup
+
+    @property
+    def rows(self):
+        return int(self._rollup['Count'].sum()) if len(self._rollup) else 0
+
+    @property
+    def disk_bytes(self):
+        return sum(p.stat().st_size for p in self.directory.glob('*.arrow'))
+
+    def table(self, columns=None):
+        """All archived rows as one memory-mapped Arrow table (nothing is copied until converted)"""
+        if not self.segments:
+            return None
+        tables = [_map_segment(p) for p in self.segments]
+        table = pa.concat_tables(tables, promote_options='default')
+        return table.select(columns) if columns else table
+
+    def read(self, first_month=None, last_month=None, columns=None):
+        """Archived rows between two month indexes as a DataFrame; only the matching rows are materialized.
+
+        Reading a whole single segment keeps the numeric columns (Year, Month, Amount) as read-only
+        views of the memory-mapped file. Otherwise pandas needs each column contiguous, so the
+        selected rows are copied once (filtering or joining segments); text columns are always
+        converted to pandas strings/categories.
+        """
+        table = self.table()
+        if table is None:
+            return pd.DataFrame(columns=columns or EXPENSE_COLUMNS)
+        idx = pc.add(pc.multiply(pc.cast(table['Year'], pa.int64()), 12),
+                     pc.subtract(pc.cast(table['Month'], pa.int64()), 1))
+        mask = None
+        if first_month is not None:
+            mask = pc.greater_equal(idx, first_month)
+        if last_month is not None:
+            upper = pc.less_equal(idx, last_month)
+            mask = upper if mask is None else pc.and_(mask, upper)
+        if mask is not None:
+            table = table.filter(mask)
+        if columns:
+            table = table.select(columns)
+        # One block per column, so numeric columns aren't consolidated into a copied 2-D block
+        frame = table.to_pandas(split_blocks=True)
+        return encode_descriptions(frame) if 'Description' in frame.columns else frame
+
+
+def combined_rollup(archive, hot):
+    """Daily rollup of the whole history: the archive's stored rollup plus the in-memory rows"""
+    hot_rollup = ledger_rollup(hot) if not hot.empty else pd.DataFrame(columns=ROLLUP_COLUMNS)
+    if archive is None or not len(archive.rollup):
+        return hot_rollup
+    if hot_rollup.empty:
+        return archive.rollup
+    return pd.concat([archive.rollup, hot_rollup], ignore_index=True)
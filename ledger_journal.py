@@ -0,0 +1,172 @@
+"""
+Smart Budget Planner - Undo/redo journal
+Every change to the expenses or goals is recorded as a version that shares unchanged
+ledger chunks and goal dicts with the previous one, so history costs memory in
+proportion to what changed rather than to the number of versions.
+"""
+
+from datetime import datetime
+from itertools import count
+
+from budget_analytics import concat_expenses
+
+MAX_VERSIONS = 100
+# Runs of this many rows are sealed: later merges never copy them again
+SEALED_ROWS = 50_000
+# Small chunks (appends) allowed after the last sealed run before they are merged into one
+MAX_SMALL_CHUNKS = 16
+# Process-wide, so a revision number is never reused by another journal or session
+_LEDGER_REVISIONS = count(1)
+
+
+class Version:
+    """Immutable state of the ledger (a tuple of DataFrame chunks) and goals after one operation.
+
+    `ledger_revision` identifies the ledger contents: it changes with every expense change but
+    is carried over when only the goals change.
+    """
+
+    __slots__ = ('chunks', 'goals', 'label', 'timestamp', 'rows', 'ledger_revision')
+
+    def __init__(self, chunks, goals, label, timestamp=None, ledger_revision=None):
+        self.chunks = tuple(c for c in chunks if len(c))
+        self.goals = tuple(goals)
+        self.label = label
+        self.timestamp = timestamp or datetime.now()
+        self.rows = sum(len(c) for c in self.chunks)
+        self.ledger_revision = ledger_revision or next(_LEDGER_REVISIONS)
+
+
+def _compact(chunks):
+    """Chunks with a long tail of small ones merged into a single run.
+
+    Only chunks after the last sealed (SEALED_ROWS or more) run are merged, so a merge copies
+    fewer than SEALED_ROWS + MAX_SMALL_CHUNKS appends' worth of rows however long the ledger is;
+    older versions keep referencing the originals.
+    """
+    start = len(chunks)
+    while start > 0 and len(chunks[start - 1]) < SEALED_ROWS:
+        start -= 1
+    if len(chunks) - start <= MAX_SMALL_CHUNKS:
+        return chunks
+    return chunks[:start] + [concat_expenses(chunks[start:])]
+
+
+class LedgerJournal:
+    """Linear history of versions with an undo/redo cursor"""
+
+    def __init__(self, expenses, goals=(), max_versions=MAX_VERSIONS):
+        self.max_versions = max_versions
+        self.versions = [Version([expenses], goals, 'Start')]
+        self.position = 0
+        self._materialized = (self.versions[0], expenses)
+        self._chunk_bytes = {}
+
+    @property
+    def current(self):
+        return self.versions[self.position]
+
+    @property
+    def ledger_revision(self):
+        """Counter of the current ledger contents, for keying caches derived from it"""
+        return self.current.ledger_revision
+
+    def _commit(self, chunks, goals, label):
+        previous = self.current
+        # A new change discards the redo branch
+        del self.versions[self.position + 1:]
+        chunks = _compact([c for c in chunks if len(c)])
+        unchanged = len(chunks) == len(previous.chunks) and all(a is b for a, b in zip(chunks, previous.chunks))
+        self.versions.append(Version(chunks, goals, label,
+                                     ledger_revision=previous.ledger_revision if unchanged else None))
+        if len(self.versions) > self.max_versions:
+            del self.versions[:len(self.versions) - self.max_versions]
+        self.position = len(self.versions) - 1
+        return self.current
+
+    # Operations
+
+    def append(self, rows, label='Add expenses', expenses=None):
+        """Record appended rows; pass the already-materialized result as `expenses` to skip a re-concat"""
+        version = self._commit(self.current.chunks + (rows,), self.current.goals, label)
+        if expenses is not None:
+            self._materialized = (version, expenses)
+        return version
+
+    def replace(self, expenses, label='Replace expenses'):
+        version = self._commit([expenses], self.current.goals, label)
+        self._materialized = (version, expenses)
+        return version
+
+    def delete_rows(self, keep, label='Delete expenses'):
+        """Keep rows where `keep(chunk)` is True; chunks without deletions are shared, not copied"""
+        chunks = []
+        for chunk in self.current.chunks:
+            mask = keep(chunk)
+            chunks.append(chunk if mask.all() else chunk[mask])
+        return self._commit(chunks, self.current.goals, label)
+
+    def set_goals(self, goals, label='Update goals'):
+        return self._commit(self.current.chunks, goals, label)
+
+    def restore(self, index):
+        """Make an earlier version current again as a new, undoable change"""
+        old = self.versions[index]
+        return self._commit(old.chunks, old.goals, f"Restore: {old.label}")
+
+    # Navigation
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.versions) - 1
+
+    def undo(self):
+        if self.can_undo:
+            self.position -= 1
+        return self.current
+
+    def redo(self):
+        if self.can_redo:
+            self.position += 1
+        return self.current
+
+    # Views
+
+    def expenses(self, version=None):
+        """Materialized ledger for a version (the current one by default)"""
+        version = version or self.current
+        if self._materialized[0] is version:
+            return self._materialized[1]
+        frame = concat_expenses(version.chunks)
+        if version is self.current:
+            self._materialized = (version, frame)
+        return frame
+
+    def as_of(self, when):
+        """Latest version recorded at or before `when` (point-in-time view)"""
+        candidates = [v for v in self.versions[:self.position + 1] if v.timestamp <= when]
+        return candidates[-1] if candidates else self.versions[0]
+
+    def history(self):
+        """One row per version: label, time, ledger rows, goal count and whether it is current"""
+        return [{
+            'Step': i,
+            'Change': v.label,
+            'Time': v.timestamp.strftime('%H:%M:%S'),
+            'Expenses': v.rows,
+            'Goals': len(v.goals),
+            'Current': i == self.position,
+        } for i, v in enumerate(self.versions)]
+
+    def shared_bytes(self):
+        """(bytes held by all distinct chunks, bytes if every version were a full copy)"""
+        distinct = {id(c): c for v in self.versions for c in v.chunks}
+        # Chunks never change, so each is measured once while it stays in the history
+        self._chunk_bytes = {key: self._chunk_bytes.get(key) or int(c.memory_usage(deep=True).sum())
+                             for key, c in distinct.items()}
+        full = sum(self._chunk_bytes[id(c)] for v in self.versions for c in v.chunks)
+        return sum(self._chunk_bytes.values()), full
@@ -0,0 +1,390 @@
+"""
+Smart Budget Planner - Concurrent-session load test
+Starts budget_app_web.py on a local Streamlit server and drives N simulated browser
+sessions at once over Streamlit's websocket protocol (no external service). Each session
+opens the app, sets a salary, imports a CSV, then browses the Dashboard, runs predictions
+and detects anomalies; the run reports per-interaction latency percentiles, the server's
+RSS growth while the sessions are open, and the RSS it still holds after they close.
+The websocket client (websockets) is a development requirement, not an app one.
+
+Usage:
+    pip install -r requirements-dev.txt
+    python load_test.py --sessions 50 --csv sample_expenses.csv --rounds 2
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import requests
+import websockets
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.Common_pb2 import UploadedFileInfo
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_PATH = Path(__file__).resolve().parent / 'budget_app_web.py'
+PERCENTILES = [50, 95, 99]
+
+
+def rss_bytes(pid):
+    """Resident set size of process `pid` (Linux /proc, else `ps`)"""
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        return int(subprocess.check_output(['ps', '-o', 'rss=', '-p', str(pid)])) * 1024
+
+
+class RssSampler:
+    """Background thread recording a process's RSS every `interval` seconds"""
+
+    def __init__(self, pid, interval=0.1):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='rss-sampler', daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append(rss_bytes(self.pid))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak(self):
+        return max(self.samples) if self.samples else rss_bytes(self.pid)
+
+
+class AppServer:
+    """`streamlit run budget_app_web.py` on a free local port for the duration of a with-block"""
+
+    def __init__(self, session_ttl=None, startup_timeout=60):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            self.port = probe.getsockname()[1]
+        self.url = f'http://127.0.0.1:{self.port}'
+        self.session_ttl = session_ttl
+        self.startup_timeout = startup_timeout
+        self.process = None
+
+    def __enter__(self):
+        command = [sys.executable, '-m', 'streamlit', 'run', str(APP_PATH),
+                   '--server.headless', 'true', '--server.address', '127.0.0.1', '--server.port', str(self.port),
+                   '--server.fileWatcherType', 'none', '--browser.gatherUsageStats', 'false',
+                   # The simulated clients don't fetch the XSRF cookie a browser would get with the page
+                   '--server.enableXsrfProtection', 'false']
+        if self.session_ttl is not None:
+            command += ['--server.disconnectedSessionTTL', str(self.session_ttl)]
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + self.startup_timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"Streamlit server exited with code {self.process.returncode}")
+            try:
+                if requests.get(f'{self.url}/_stcore/health', timeout=1).ok:
+                    return self
+            except requests.ConnectionError:
+                pass
+            time.sleep(0.2)
+        self.__exit__()
+        raise RuntimeError(f"Streamlit server did not start within {self.startup_timeout}s")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    @property
+    def pid(self):
+        return self.process.pid
+
+
+class AppError(Exception):
+    """The app raised an exception during a run"""
+
+
+class SimulatedSession:
+    """One browser tab: a websocket to the server and the widget values it sends with each rerun"""
+
+    def __init__(self, url, timeout=120):
+        self.url = url
+        self.timeout = timeout
+        self.session_id = None
+        self.page_hash = ''
+        self.widgets = {}  # label -> (element type, widget proto, fragment id) from the latest run
+        self.states = {}  # widget id -> WidgetState, resent with every rerun like a browser does
+        self.exceptions = []
+        self._socket = None
+        self._reader = None
+        self._finished = None
+        self._replies = {}
+
+    async def connect(self):
+        self._socket = await websockets.connect(f"ws{self.url[4:]}/_stcore/stream", subprotocols=['streamlit'],
+                                                max_size=None)
+        self._reader = asyncio.create_task(self._read())
+
+    async def close(self):
+        if self._socket is not None:
+            await self._socket.close()
+            await self._reader
+
+    async def _read(self):
+        try:
+            async for raw in self._socket:
+                msg = ForwardMsg()
+                msg.ParseFromString(raw)
+                self._handle(msg)
+        except websockets.ConnectionClosed:
+            pass
+        for waiter in [self._finished, *self._replies.values()]:
+            if waiter is not None and not waiter.done():
+                waiter.set_exception(ConnectionError("websocket closed"))
+
+    def _handle(self, msg):
+        kind = msg.WhichOneof('type')
+        if kind == 'new_session':
+            self.session_id = msg.new_session.initialize.session_id
+            if not msg.new_session.fragment_ids_this_run:
+                self.page_hash = msg.new_session.page_script_hash
+                self.widgets = {}
+        elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            element = msg.delta.new_element
+            element_type = element.WhichOneof('type')
+            if element_type == 'exception':
+                self.exceptions.append(element.exception.message)
+            elif element_type is not None:
+                widget = getattr(element, element_type)
+                if 'id' in widget.DESCRIPTOR.fields_by_name and 'label' in widget.DESCRIPTOR.fields_by_name:
+                    self.widgets[widget.label] = (element_type, widget, msg.delta.fragment_id)
+        elif kind == 'script_finished':
+            if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN and self._finished \
+                    and not self._finished.done():
+                self._finished.set_result(msg.script_finished)
+        elif kind == 'file_urls_response':
+            reply = self._replies.pop(msg.file_urls_response.response_id, None)
+            if reply is not None:
+                reply.set_result(msg.file_urls_response)
+
+    async def _send(self, back_msg):
+        await self._socket.send(back_msg.SerializeToString())
+
+    async def rerun(self, triggers=(), fragment_id=''):
+        """Send the widget values (plus one-shot button `triggers`) and wait for the run to finish"""
+        msg = BackMsg()
+        msg.rerun_script.page_script_hash = self.page_hash
+        msg.rerun_script.widget_states.widgets.extend([*self.states.values(), *triggers])
+        if fragment_id:
+            msg.rerun_script.fragment_id = fragment_id
+        self.exceptions = []
+        self._finished = asyncio.get_running_loop().create_future()
+        await self._send(msg)
+        status = await asyncio.wait_for(self._finished, self.timeout)
+        if status == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+            raise AppError("compile error")
+        if self.exceptions:
+            raise AppError(self.exceptions[0])
+
+    def widget(self, label):
+        try:
+            return self.widgets[label]
+        except KeyError:
+            raise LookupError(f"no widget labelled {label!r} on the page") from None
+
+    async def set_value(self, label, field, value):
+        """Set a widget's value; widgets outside forms rerun the app (or their fragment) like a browser"""
+        _, widget, fragment_id = self.widget(label)
+        state = WidgetState(id=widget.id)
+        setattr(state, field, value)
+        self.states[widget.id] = state
+        if not getattr(widget, 'form_id', ''):
+            await self.rerun(fragment_id=fragment_id)
+
+    async def click(self, label):
+        _, widget, fragment_id = self.widget(label)
+        await self.rerun([WidgetState(id=widget.id, trigger_value=True)], fragment_id)
+
+    async def upload(self, label, name, content, mime='text/csv'):
+        """Upload a file through the server's upload endpoint and hand it to a file uploader"""
+        _, widget, fragment_id = self.widget(label)
+        msg = BackMsg()
+        msg.file_urls_request.request_id = uuid.uuid4().hex
+        msg.file_urls_request.session_id = self.session_id
+        msg.file_urls_request.file_names.append(name)
+        reply = self._replies[msg.file_urls_request.request_id] = asyncio.get_running_loop().create_future()
+        await self._send(msg)
+        urls = (await asyncio.wait_for(reply, self.timeout)).file_urls[0]
+        upload_url = urls.upload_url if urls.upload_url.startswith('http') else self.url + urls.upload_url
+        response = await asyncio.to_thread(requests.put, upload_url, files={'file': (name, content, mime)},
+                                           timeout=self.timeout)
+        response.raise_for_status()
+        state = WidgetState(id=widget.id)
+        state.file_uploader_state_value.uploaded_file_info.append(
+            UploadedFileInfo(file_id=urls.file_id, name=name, size=len(content), file_urls=urls))
+        self.states[widget.id] = state
+        await self.rerun(fragment_id=fragment_id)
+
+
+# Session script: (interaction, coroutine function of the session), one app run each
+
+def _page(name):
+    return lambda session: session.set_value("Select Page", 'string_value', name)
+
+
+def _set_salary(salary):
+    async def set_salary(session):
+        # A form: the value goes to the server with the submit click
+        await session.set_value("Enter your monthly salary:", 'double_value', float(salary))
+        await session.click("Set Salary")
+    return set_salary
+
+
+def session_steps(csv_name, csv_content, salary):
+    """(setup interactions run once, browsing interactions repeated every round)"""
+    setup = [
+        ('open', lambda s: s.rerun()),
+        ('setup_page', _page("⚙️ Setup")),
+        ('set_salary', _set_salary(salary)),
+        ('expenses_page', _page("💳 Expenses")),
+        ('upload_csv', lambda s: s.upload("Choose CSV or ZIP files", csv_name, csv_content)),
+        ('import_csv', lambda s: s.click("Import CSV")),
+    ]
+    browse = [
+        ('dashboard', _page("📊 Dashboard")),
+        ('ai_insights', _page("🤖 AI Insights")),
+        ('run_predictions', lambda s: s.click("Run AI Predictions")),
+        ('detect_anomalies', lambda s: s.click("Detect Anomalies")),
+    ]
+    return setup, browse
+
+
+async def run_session(url, steps, timeout, delay=0.0):
+    """[(interaction, seconds, error or None)] for one simulated session"""
+    await asyncio.sleep(delay)
+    session = SimulatedSession(url, timeout)
+    timings = []
+    try:
+        await session.connect()
+        for name, action in steps:
+            began = time.perf_counter()
+            error = None
+            try:
+                await action(session)
+            except Exception as exc:
+                error = f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+            timings.append((name, time.perf_counter() - began, error))
+    finally:
+        await session.close()
+    return timings
+
+
+async def run_sessions(url, steps, sessions, timeout, ramp=0.0):
+    """All sessions' timings; session starts are spread evenly over `ramp` seconds"""
+    results = await asyncio.gather(*(run_session(url, steps, timeout, ramp * i / sessions)
+                                     for i in range(sessions)))
+    return [timing for timings in results for timing in timings]
+
+
+def latency_table(timings):
+    """Per-interaction count, errors and latency percentiles in ms, in script order"""
+    rows = []
+    for step in dict.fromkeys(step for step, _, _ in timings):
+        seconds = np.array([s for name, s, _ in timings if name == step]) * 1000
+        row = {'step': step, 'count': len(seconds),
+               'errors': sum(1 for name, _, error in timings if name == step and error)}
+        row.update({f'p{p}_ms': float(np.percentile(seconds, p)) for p in PERCENTILES})
+        row['max_ms'] = float(seconds.max())
+        rows.append(row)
+    return rows
+
+
+def load_test(sessions, csv_path, salary=4000, rounds=1, timeout=120, ramp=0.0, settle=5.0, session_ttl=None):
+    """Run `sessions` concurrent sessions against a fresh server; latency and server memory results.
+
+    One session runs alone first, so imports, compiled code and model warm-up are in the
+    RSS baseline rather than counted as growth. Closed sessions stay on the server for
+    `session_ttl` seconds (Streamlit's disconnectedSessionTTL) and count as retained until then.
+    """
+    csv_path = Path(csv_path)
+    setup, browse = session_steps(csv_path.name, csv_path.read_bytes(), salary)
+    steps = setup + browse * rounds
+    with AppServer(session_ttl) as server:
+        asyncio.run(run_sessions(server.url, steps, 1, timeout))
+        time.sleep(settle)
+        baseline = rss_bytes(server.pid)
+        with RssSampler(server.pid) as sampler:
+            began = time.perf_counter()
+            timings = asyncio.run(run_sessions(server.url, steps, sessions, timeout, ramp))
+            wall = time.perf_counter() - began
+        peak = sampler.peak
+        time.sleep(settle)
+        closed = rss_bytes(server.pid)
+    return {
+        'sessions': sessions,
+        'rounds': rounds,
+        'wall_s': wall,
+        'steps': latency_table(timings),
+        'rss_baseline_mb': baseline / 1e6,
+        'rss_peak_mb': peak / 1e6,
+        'rss_after_close_mb': closed / 1e6,
+        'rss_growth_mb': (peak - baseline) / 1e6,
+        'rss_retained_mb': (closed - baseline) / 1e6,
+        'errors': sorted({f"{step}: {error}" for step, _, error in timings if error}),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent simulated sessions against budget_app_web.py")
+    parser.add_argument('--sessions', type=int, default=10)
+    parser.add_argument('--csv', default=str(Path(__file__).resolve().parent / 'sample_expenses.csv'),
+                        help="Expense CSV every session imports")
+    parser.add_argument('--salary', type=float, default=4000)
+    parser.add_argument('--rounds', type=int, default=1,
+                        help="Times each session repeats Dashboard -> predictions -> anomalies")
+    parser.add_argument('--ramp', type=float, default=0.0, help="Seconds over which sessions start (0: all at once)")
+    parser.add_argument('--timeout', type=float, default=120, help="Seconds allowed per interaction")
+    parser.add_argument('--settle', type=float, default=5.0, help="Seconds to wait before each RSS reading")
+    parser.add_argument('--session-ttl', type=int, help="Server's disconnectedSessionTTL (Streamlit default: 120)")
+    parser.add_argument('--json', help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = load_test(args.sessions, args.csv, args.salary, args.rounds, args.timeout, args.ramp,
+                        args.settle, args.session_ttl)
+
+    print(f"{results['sessions']} sessions x {results['rounds']} rounds in {results['wall_s']:.1f}s")
+    print(f"{'interaction':18}{'count':>7}{'errors':>8}" + "".join(f"{f'p{p} ms':>10}" for p in PERCENTILES)
+          + f"{'max ms':>10}")
+    for row in results['steps']:
+        print(f"{row['step']:18}{row['count']:7}{row['errors']:8}"
+              + "".join(f"{row[f'p{p}_ms']:10.0f}" for p in PERCENTILES) + f"{row['max_ms']:10.0f}")
+    print(f"Server RSS: {results['rss_baseline_mb']:.0f} MB before, {results['rss_peak_mb']:.0f} MB peak "
+          f"(+{results['rss_growth_mb']:.0f} MB), {results['rss_after_close_mb']:.0f} MB after sessions closed "
+          f"({results['rss_retained_mb']:+.0f} MB retained)")
+    for error in results['errors'][:10]:
+        print(f"error: {error}")
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Smart Budget Planner - Machine-learning insights
+Random Forest spending predictions and IsolationForest anomaly detection,
+callable from the Streamlit pages, the batch CLI or anything else.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor, IsolationForest
+from sklearn.preprocessing import LabelEncoder
+
+from budget_analytics import CATEGORIES
+from profiling import section
+
+MIN_PREDICTION_ROWS = 50
+MIN_ANOMALY_ROWS = 30
+
+
+def next_month(now=None):
+    """(year, month) of the month after `now`"""
+    now = now or datetime.now()
+    return (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+
+
+def predict_next_month(expenses, categories=CATEGORIES, now=None, profilers=()):
+    """Random Forest prediction of next month's spending per category.
+
+    Returns (year, month, DataFrame[Category, Predicted Amount]).
+    """
+    monthly_data = expenses.groupby(['Year', 'Month', 'Category'])['Amount'].sum().reset_index()
+
+    le = LabelEncoder()
+    monthly_data['Category_Encoded'] = le.fit_transform(monthly_data['Category'])
+
+    X = monthly_data[['Year', 'Month', 'Category_Encoded']].to_numpy(dtype=float)
+    y = monthly_data['Amount'].to_numpy(dtype=float)
+
+    rf = RandomForestRegressor(n_estimators=100, random_state=42)
+    with section("rf_fit", *profilers):
+        rf.fit(X, y)
+
+    year, month = next_month(now)
+
+    # One batched predict for every category seen in the ledger
+    known = [cat for cat in categories if cat in set(le.classes_)]
+    features = np.column_stack([
+        np.full(len(known), year), np.full(len(known), month), le.transform(known)
+    ]).astype(float)
+    predictions = rf.predict(features) if known else np.array([])
+
+    return year, month, pd.DataFrame({'Category': known, 'Predicted Amount': predictions})
+
+
+def detect_anomalies(expenses, contamination=0.1, exclude=None, profilers=()):
+    """Expenses whose amount IsolationForest flags as unusual.
+
+    Rows where the boolean `exclude` mask is set (e.g. recurring rent) are left out entirely;
+    fewer than MIN_ANOMALY_ROWS rows left to score give no anomalies.
+    """
+    if exclude is not None:
+        expenses = expenses[~np.asarray(exclude, dtype=bool)]
+    if len(expenses) < MIN_ANOMALY_ROWS:
+        return expenses.iloc[:0]
+    amounts = expenses['Amount'].to_numpy(dtype=float)
+
+    # Same trees and threshold as fit_predict(contamination=...), but each distinct amount
+    # is scored once: ledgers repeat the same amounts many times over
+    iso = IsolationForest(contamination='auto', random_state=42)
+    with section("isolation_forest_fit", *profilers):
+        iso.fit(amounts.reshape(-1, 1))
+        values, inverse = np.unique(amounts, return_inverse=True)
+        scores = iso.score_samples(values.reshape(-1, 1))[inverse]
+
+    return expenses[scores < np.percentile(scores, 100 * contamination)]
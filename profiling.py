@@ -0,0 +1,107 @@
+"""
+Smart Budget Planner - Hot-path profiling
+Lightweight timers and allocation counters for the app's major sections, aggregated
+per session and per process and exportable as JSON or Prometheus text.
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+import numpy as np
+
+MAX_SAMPLES = 500
+
+
+class Profiler:
+    """Recent duration/allocation samples per section plus lifetime counts and totals"""
+
+    def __init__(self, max_samples=MAX_SAMPLES):
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = defaultdict(int)
+        self._totals = defaultdict(float)
+
+    def record(self, name, seconds, blocks):
+        with self._lock:
+            if name not in self._samples:
+                self._samples[name] = deque(maxlen=self.max_samples)
+            self._samples[name].append((seconds, blocks))
+            self._counts[name] += 1
+            self._totals[name] += seconds
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._totals.clear()
+
+    def summary(self):
+        """One row per section: call count, p50/p95/max duration and average allocated blocks"""
+        with self._lock:
+            snapshot = {name: np.array(samples) for name, samples in self._samples.items()}
+            counts, totals = dict(self._counts), dict(self._totals)
+
+        rows = []
+        for name, samples in sorted(snapshot.items()):
+            durations = samples[:, 0] * 1000
+            rows.append({
+                'section': name,
+                'count': counts[name],
+                'p50_ms': float(np.percentile(durations, 50)),
+                'p95_ms': float(np.percentile(durations, 95)),
+                'max_ms': float(durations.max()),
+                'total_s': totals[name],
+                'avg_alloc_blocks': float(samples[:, 1].mean()),
+            })
+        return rows
+
+
+# Shared by every session served by this process
+PROCESS_PROFILER = Profiler()
+
+
+@contextmanager
+def section(name, *profilers):
+    """Time a block and count the net memory blocks it allocated"""
+    blocks = sys.getallocatedblocks()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        allocated = sys.getallocatedblocks() - blocks
+        for profiler in (PROCESS_PROFILER,) + profilers:
+            profiler.record(name, elapsed, allocated)
+
+
+def to_json(profilers):
+    """{scope: summary rows} as a JSON string, e.g. to_json({'session': p, 'process': PROCESS_PROFILER})"""
+    return json.dumps({scope: p.summary() for scope, p in profilers.items()}, indent=2)
+
+
+def to_prometheus(profilers, prefix='budget_section'):
+    """Prometheus text exposition: a duration summary and an allocation gauge per section and scope"""
+    lines = [
+        f"# HELP {prefix}_duration_seconds Time spent in an instrumented app section.",
+        f"# TYPE {prefix}_duration_seconds summary",
+    ]
+    for scope, profiler in profilers.items():
+        for row in profiler.summary():
+            labels = f'section="{row["section"]}",scope="{scope}"'
+            for quantile, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms')):
+                lines.append(f'{prefix}_duration_seconds{{{labels},quantile="{quantile}"}} {row[key] / 1000:.6f}')
+            lines.append(f"{prefix}_duration_seconds_sum{{{labels}}} {row['total_s']:.6f}")
+            lines.append(f"{prefix}_duration_seconds_count{{{labels}}} {row['count']}")
+
+    lines.append(f"# HELP {prefix}_alloc_blocks Average net memory blocks allocated per call.")
+    lines.append(f"# TYPE {prefix}_alloc_blocks gauge")
+    for scope, profiler in profilers.items():
+        for row in profiler.summary():
+            lines.append(f'{prefix}_alloc_blocks{{section="{row["section"]}",scope="{scope}"}} '
+                         f"{row['avg_alloc_blocks']:.1f}")
+    return "\n".join(lines) + "\n"
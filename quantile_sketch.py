@@ -0,0 +1,207 @@
+"""
+Smart Budget Planner - Streaming quantile sketches
+KLL sketches of transaction sizes per (category, month), updated as expenses arrive.
+Medians, p90/p99 and "how unusual is this amount" answers come from a few hundred
+retained items per sketch instead of a ledger scan, and sketches of different months
+(or different users' ledgers) merge into one with the same accuracy guarantee.
+"""
+
+import numpy as np
+import pandas as pd
+
+from income_ledger import month_index
+
+QUANTILES = [0.5, 0.9, 0.99]
+# "Unusually large" hints need this share of a category's history below the amount...
+UNUSUAL_QUANTILE = 0.95
+# ...and at least this many expenses behind the estimate
+MIN_SKETCH_COUNT = 20
+
+
+class KLLSketch:
+    """Mergeable quantile sketch (Karnin-Lang-Liberty) over a stream of numbers.
+
+    Level h holds items that each stand for 2**h inputs. A level over its capacity is
+    sorted and every other item (random offset) is promoted, so rank error stays around
+    1.7/k of the count whatever the stream length.
+    """
+
+    __slots__ = ('k', 'levels', 'n', 'min', 'max', '_rng')
+
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.n = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return self.n
+
+    def _capacity(self, level):
+        # Capacities shrink geometrically below the top level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1))))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) <= self._capacity(level):
+                level += 1
+                continue
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            # An odd item out stays behind so the weights still add up to n
+            keep, items = items[:len(items) % 2], items[len(items) % 2:]
+            promoted = items[self._rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            # A new top level lowers every capacity below it, so start over from the bottom
+            level = 0
+
+    def update(self, values):
+        """Add one value or an array of values"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.n += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold `other` into this sketch (in place)"""
+        if not other.n:
+            return self
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def copy(self):
+        sketch = KLLSketch(self.k)
+        sketch.levels = [items.copy() for items in self.levels]
+        sketch.n, sketch.min, sketch.max = self.n, self.min, self.max
+        return sketch
+
+    def _weighted(self):
+        """Retained items in order with their cumulative weights"""
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs=QUANTILES):
+        """Values at the given quantiles (NaN when empty); q=0 and q=1 are the exact min and max"""
+        qs = np.asarray(qs, dtype=float)
+        if not self.n:
+            return np.full(qs.shape, np.nan)
+        items, cumulative = self._weighted()
+        idx = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+        values = items[np.minimum(idx, len(items) - 1)]
+        return np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, values))
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def rank(self, value):
+        """Estimated fraction of the stream at or below `value`"""
+        if not self.n:
+            return np.nan
+        items, cumulative = self._weighted()
+        below = np.searchsorted(items, value, side='right')
+        return float(cumulative[below - 1] / cumulative[-1]) if below else 0.0
+
+
+class AmountSketches:
+    """KLL sketch of expense amounts per (category, month index), maintained incrementally"""
+
+    def __init__(self, k=200):
+        self.k = k
+        self.sketches = {}
+
+    @classmethod
+    def from_ledger(cls, expenses, k=200):
+        """Sketches for every (category, month) of a ledger with one grouped pass"""
+        sketches = cls(k)
+        sketches.add_frame(expenses)
+        return sketches
+
+    def add(self, year, month, category, amount):
+        key = (category, int(month_index(year, month)))
+        if key not in self.sketches:
+            self.sketches[key] = KLLSketch(self.k)
+        self.sketches[key].update(amount)
+
+    def add_frame(self, expenses):
+        """Record a batch of new expenses (only the batch is scanned)"""
+        if expenses.empty:
+            return
+        months = month_index(expenses['Year'].to_numpy(dtype=int), expenses['Month'].to_numpy(dtype=int))
+        amounts = expenses['Amount'].to_numpy(dtype=float)
+        groups = pd.Series(np.arange(len(expenses))).groupby([expenses['Category'].astype(str).to_numpy(), months])
+        for (category, month), rows in groups:
+            key = (category, int(month))
+            if key not in self.sketches:
+                self.sketches[key] = KLLSketch(self.k)
+            self.sketches[key].update(amounts[rows.to_numpy()])
+
+    def merge(self, other):
+        """Fold another store (other months, another ledger) into this one"""
+        for key, sketch in other.sketches.items():
+            if key in self.sketches:
+                self.sketches[key].merge(sketch)
+            else:
+                self.sketches[key] = sketch.copy()
+        return self
+
+    def between(self, first_month=None, last_month=None):
+        """Copy of the sketches of months in [first_month, last_month]"""
+        store = AmountSketches(self.k)
+        store.sketches = {key: sketch.copy() for key, sketch in self.sketches.items()
+                          if (first_month is None or key[1] >= first_month)
+                          and (last_month is None or key[1] <= last_month)}
+        return store
+
+    @property
+    def count(self):
+        return sum(s.n for s in self.sketches.values())
+
+    def merged(self, categories=None, first_month=None, last_month=None):
+        """One sketch over the chosen categories and month-index range (inclusive)"""
+        sketch = KLLSketch(self.k)
+        for (category, month), part in self.sketches.items():
+            if categories is not None and category not in categories:
+                continue
+            if (first_month is not None and month < first_month) or (last_month is not None and month > last_month):
+                continue
+            sketch.merge(part)
+        return sketch
+
+    def percentile_table(self, categories, qs=QUANTILES, first_month=None, last_month=None):
+        """Count and amount quantiles per category (plus all categories) over a month range"""
+        rows = []
+        for category in [*categories, None]:
+            sketch = self.merged([category] if category else None, first_month, last_month)
+            if not sketch.n:
+                continue
+            row = {'Category': category or 'All', 'Count': sketch.n}
+            row.update({f"P{round(q * 100)}": v for q, v in zip(qs, sketch.quantiles(qs))})
+            row['Max'] = sketch.max
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def percentile_of(self, category, amount, first_month=None, last_month=None):
+        """(share of the category's expenses at or below `amount`, expenses the estimate is based on)"""
+        sketch = self.merged([category], first_month, last_month)
+        return sketch.rank(amount), sketch.n
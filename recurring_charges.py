@@ -0,0 +1,177 @@
+"""
+Smart Budget Planner - Recurring charge detector
+Finds bills and subscriptions by grouping expenses on merchant and
+similar amounts, then classifying the gaps between their dates in one vectorized pass.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from budget_analytics import merchant_codes
+
+# (name, min gap days, max gap days, step, step unit, min occurrences)
+PERIODS = [
+    ('Weekly', 5, 9, 7, 'D', 4),
+    ('Biweekly', 12, 17, 14, 'D', 3),
+    ('Monthly', 26, 35, 1, 'M', 3),
+    ('Quarterly', 84, 98, 3, 'M', 3),
+    ('Yearly', 350, 380, 12, 'M', 3),
+]
+AMOUNT_TOLERANCE = 1.25     # sorted amounts within 25% of their neighbour belong to one series
+MIN_REGULAR_SHARE = 0.75    # share of gaps that must fall in the dominant period
+STALE_PERIODS = 1.5         # a series with no charge for this many periods is inactive (cancelled)
+AVG_DAYS_PER_MONTH = 30.44
+
+
+def _period_bins():
+    edges, labels = [], []
+    for i, (_, lo, hi, _, _, _) in enumerate(PERIODS):
+        edges += [lo, hi + 1]
+        labels += [i, -1]
+    return np.array(edges), np.array([-1] + labels)
+
+
+def detect_recurring(expenses, now=None):
+    """(series DataFrame, per-row series id) for recurring charges in the ledger.
+
+    Row ids are -1 for expenses that are not part of a recurring series. Series whose last
+    charge is more than STALE_PERIODS periods before `now` are kept but marked not Active.
+    """
+    empty = pd.DataFrame(columns=['Series', 'Description', 'Category', 'Amount', 'Period',
+                                  'Period Index', 'Interval Days', 'Occurrences', 'First Date', 'Last Date',
+                                  'Next Date', 'Monthly Amount', 'Active'])
+    row_series = pd.Series(-1, index=expenses.index, dtype=int)
+    if expenses.empty:
+        return empty, row_series
+
+    dates = pd.to_datetime(expenses['Date'], errors='coerce', format='mixed')
+    amounts = expenses['Amount'].to_numpy(dtype=float)
+    valid = dates.notna().to_numpy() & (amounts > 0)
+
+    frame = pd.DataFrame({
+        'merchant': merchant_codes(expenses)[0],
+        'category': expenses['Category'].to_numpy(),
+        'day': dates.to_numpy().astype('datetime64[D]').astype(np.int64),
+        'amount': amounts,
+        'row': np.arange(len(expenses)),
+    })[valid]
+
+    # Sorted by amount within each merchant, a series breaks only where the next amount jumps
+    # by more than the tolerance, so a price change doesn't split a subscription at a fixed edge
+    frame = frame.sort_values(['merchant', 'category', 'amount'], kind='stable')
+    merchant, category, amount = (frame[col].to_numpy() for col in ('merchant', 'category', 'amount'))
+    starts = np.r_[True, (merchant[1:] != merchant[:-1]) | (category[1:] != category[:-1])
+                   | (amount[1:] > amount[:-1] * AMOUNT_TOLERANCE)]
+    frame['group'] = np.cumsum(starts) - 1
+
+    # One sort puts every candidate series in contiguous, date-ordered runs
+    frame = frame.sort_values(['group', 'day'], kind='stable')
+    group = frame['group'].to_numpy()
+    day = frame['day'].to_numpy()
+    n_groups = int(group.max()) + 1
+
+    same = np.r_[False, group[1:] == group[:-1]]
+    gaps = np.where(same, np.diff(day, prepend=day[0]), -1)
+
+    # Histogram of gaps per (group, period bucket)
+    edges, labels = _period_bins()
+    bucket = labels[np.searchsorted(edges, gaps, side='right')]
+    counted = same & (bucket >= 0)
+    hist = np.zeros((n_groups, len(PERIODS)), dtype=int)
+    np.add.at(hist, (group[counted], bucket[counted]), 1)
+    n_gaps = np.bincount(group[same], minlength=n_groups)
+
+    dominant = hist.argmax(axis=1)
+    share = hist[np.arange(n_groups), dominant] / np.maximum(n_gaps, 1)
+    min_occurrences = np.array([p[5] for p in PERIODS])[dominant]
+    is_recurring = (n_gaps + 1 >= min_occurrences) & (share >= MIN_REGULAR_SHARE)
+    if not is_recurring.any():
+        return empty, row_series
+
+    frame['gap'] = np.where(same, gaps, np.nan)
+    stats = frame.groupby('group').agg(
+        Category=('category', 'first'),
+        Amount=('amount', 'median'), Interval=('gap', 'median'),
+        Occurrences=('day', 'size'), First=('day', 'min'), Last=('day', 'max'),
+    ).reindex(np.flatnonzero(is_recurring))
+
+    series = pd.DataFrame({
+        'Series': np.arange(len(stats)),
+        'Description': expenses['Description'].to_numpy()[
+            frame.groupby('group')['row'].last().reindex(stats.index).to_numpy()],
+        'Category': stats['Category'].to_numpy(),
+        'Amount': stats['Amount'].to_numpy(),
+        'Period': [PERIODS[p][0] for p in dominant[stats.index]],
+        'Period Index': dominant[stats.index],
+        'Interval Days': stats['Interval'].to_numpy(),
+        'Occurrences': stats['Occurrences'].to_numpy(),
+        'First Date': pd.to_datetime(stats['First'].to_numpy(), unit='D'),
+        'Last Date': pd.to_datetime(stats['Last'].to_numpy(), unit='D'),
+    })
+    series['Next Date'] = _advance(series['Last Date'], series['Period Index'], 1)
+    per_month = np.array([AVG_DAYS_PER_MONTH / p[3] if p[4] == 'D' else 1 / p[3] for p in PERIODS])
+    series['Monthly Amount'] = series['Amount'] * per_month[series['Period Index']]
+    period_days = AVG_DAYS_PER_MONTH / per_month[series['Period Index']]
+    idle_days = (pd.Timestamp(now or datetime.now()).normalize() - series['Last Date']).dt.days.to_numpy()
+    series['Active'] = idle_days <= STALE_PERIODS * period_days
+
+    series_of_group = np.full(n_groups, -1)
+    series_of_group[stats.index] = series['Series'].to_numpy()
+    row_series.iloc[frame['row'].to_numpy()] = series_of_group[group]
+    return series, row_series
+
+
+def _advance(dates, periods, k):
+    """Dates moved forward by k steps of each row's period (calendar months keep the day of month)"""
+    days = np.asarray(pd.to_datetime(dates)).astype('datetime64[D]')
+    steps = np.array([PERIODS[p][3] for p in periods]) * k
+    by_month = np.array([PERIODS[p][4] == 'M' for p in periods], dtype=bool)
+
+    day_based = days + np.where(by_month, 0, steps).astype('timedelta64[D]')
+    start_month = days.astype('datetime64[M]')
+    day_of_month = (days - start_month.astype('datetime64[D]')).astype(int)
+    months = start_month + np.where(by_month, steps, 0).astype('timedelta64[M]')
+    month_len = ((months + 1).astype('datetime64[D]') - months.astype('datetime64[D]')).astype(int)
+    month_based = months.astype('datetime64[D]') + np.minimum(day_of_month, month_len - 1).astype('timedelta64[D]')
+    return pd.to_datetime(np.where(by_month, month_based, day_based))
+
+
+def project_occurrences(series, months=12, now=None):
+    """Expected future charges of each active series from today through the next `months` months"""
+    now = pd.Timestamp(now or datetime.now()).normalize()
+    end = now + pd.DateOffset(months=months)
+    series = _active(series)
+    if series.empty:
+        return pd.DataFrame(columns=['Date', 'Description', 'Category', 'Amount'])
+
+    # Upper bound on steps per series: the whole span from its last charge to `end`
+    periods = series['Period Index'].to_numpy(dtype=int)
+    step_days = np.array([p[3] if p[4] == 'D' else p[3] * 28 for p in PERIODS])[periods]
+    span = (end - series['Last Date']).dt.days.to_numpy()
+    counts = np.maximum(0, span // step_days + 1)
+
+    idx = np.repeat(np.arange(len(series)), counts)
+    k = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+    dates = _advance(series['Last Date'].to_numpy()[idx], periods[idx], k)
+    # Occurrences already due before today may just not be recorded yet, so they are skipped
+    keep = (dates >= now) & (dates <= end)
+    return pd.DataFrame({
+        'Date': dates[keep],
+        'Description': series['Description'].to_numpy()[idx][keep],
+        'Category': series['Category'].to_numpy()[idx][keep],
+        'Amount': series['Amount'].to_numpy()[idx][keep],
+    }).sort_values('Date', kind='stable').reset_index(drop=True)
+
+
+def _active(series):
+    return series[series['Active']] if 'Active' in series.columns else series
+
+
+def fixed_monthly_outflow(series):
+    """{category: monthly equivalent of its active recurring charges}"""
+    series = _active(series)
+    if series.empty:
+        return {}
+    return series.groupby('Category')['Monthly Amount'].sum().astype(float).to_dict()
@@ -0,0 +1,112 @@
+"""
+Smart Budget Planner - Monte Carlo savings forecaster
+Bootstraps whole months of category spending from the ledger history to simulate
+future savings paths and the probability of reaching each goal by its deadline.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from goal_store import ordered_goals
+
+FAN_PERCENTILES = [5, 25, 50, 75, 95]
+# Paths x months kept in memory (float32: 4 bytes each); longer horizons get fewer paths
+MAX_PATH_CELLS = 10_000_000
+# Paths x months simulated at once, bounding the int64/float64 temporaries of each block
+BLOCK_CELLS = 1_000_000
+
+
+def monthly_category_matrix(expenses):
+    """Month x category spending matrix (one row per calendar month in the ledger)"""
+    if expenses.empty:
+        return pd.DataFrame()
+    matrix = expenses.pivot_table(index=['Year', 'Month'], columns='Category',
+                                  values='Amount', aggfunc='sum', fill_value=0)
+    return matrix.astype(float)
+
+
+def _simulate_chunk(monthly_totals, income, start_savings, horizon, n_paths, seed):
+    """Cumulative savings paths for one chunk, shape (n_paths, horizon), built a block of rows at a time"""
+    rng = np.random.default_rng(seed)
+    paths = np.empty((n_paths, horizon), dtype=np.float32)
+    step = max(1, BLOCK_CELLS // horizon)
+    for lo in range(0, n_paths, step):
+        hi = min(n_paths, lo + step)
+        # Resample whole months so category correlations within a month are kept
+        picks = rng.integers(0, len(monthly_totals), size=(hi - lo, horizon))
+        net = income - monthly_totals[picks]
+        paths[lo:hi] = start_savings + np.cumsum(net, axis=1, dtype=np.float64)
+    return paths
+
+
+def simulate_paths(monthly_totals, income, start_savings, horizon, n_paths=20000, seed=42, workers=None):
+    """Simulate savings paths; `workers` > 1 splits the paths across a process pool"""
+    monthly_totals = np.asarray(monthly_totals, dtype=np.float64)
+    seeds = np.random.SeedSequence(seed).spawn(max(1, workers or 1))
+
+    if not workers or workers <= 1:
+        return _simulate_chunk(monthly_totals, income, start_savings, horizon, n_paths, seeds[0])
+
+    sizes = np.full(workers, n_paths // workers)
+    sizes[:n_paths % workers] += 1
+    with ProcessPoolExecutor(max_workers=min(workers, os.cpu_count() or 1)) as pool:
+        chunks = pool.map(_simulate_chunk, [monthly_totals] * workers, [income] * workers,
+                          [start_savings] * workers, [horizon] * workers, sizes, seeds)
+        return np.vstack(list(chunks))
+
+
+def forecast_goals(expenses, salary, start_savings, emergency_fund_target, goals,
+                   n_paths=20000, horizon=None, seed=42, workers=None, fixed_monthly=0.0, now=None):
+    """Probability of funding each goal on time plus percentile fan of savings per month ahead.
+
+    `fixed_monthly` is a known recurring outflow charged every month; leave those charges
+    out of `expenses` so they aren't also resampled. At most MAX_PATH_CELLS // horizon paths
+    are simulated. Returns None when there are no complete months to resample.
+    """
+    matrix = monthly_category_matrix(expenses)
+    now = now or datetime.now()
+    if (now.year, now.month) in matrix.index and len(matrix) > 1:
+        # The current month is still in progress, so it would understate spending
+        matrix = matrix.drop(index=(now.year, now.month))
+    if matrix.empty:
+        return None
+
+    ordered = ordered_goals(goals, now)
+    deadlines = ordered['months_until'].to_numpy(dtype=int)
+    if horizon is None:
+        horizon = int(max(12, deadlines.max(initial=0)))
+    n_paths = max(1, min(n_paths, MAX_PATH_CELLS // horizon))
+
+    paths = simulate_paths(matrix.sum(axis=1).to_numpy(), salary - fixed_monthly, start_savings,
+                           horizon, n_paths, seed, workers)
+
+    # Goals are funded in roadmap order, after the emergency fund
+    needed = emergency_fund_target + np.cumsum(ordered['target_amount'].to_numpy())
+    probabilities = np.zeros(len(ordered))
+    due = (deadlines >= 1) & (deadlines <= horizon)
+    if due.any():
+        at_deadline = paths[:, deadlines[due] - 1]
+        probabilities[due] = (at_deadline >= needed[due]).mean(axis=0)
+    probabilities[deadlines < 1] = (start_savings >= needed[deadlines < 1]).astype(float)
+
+    goal_df = pd.DataFrame({
+        'Goal': ordered['name'].to_numpy(),
+        'Priority': ordered['priority'].to_numpy(),
+        'Deadline (months)': deadlines,
+        'Savings Needed': needed,
+        'Probability': probabilities,
+    })
+    fan = pd.DataFrame(np.percentile(paths, FAN_PERCENTILES, axis=0).T,
+                       columns=[f"p{p}" for p in FAN_PERCENTILES])
+    fan.insert(0, 'Month', np.arange(1, horizon + 1))
+
+    return {
+        'goals': goal_df,
+        'fan': fan,
+        'months_sampled': len(matrix),
+        'n_paths': len(paths),
+    }
@@ -0,0 +1,55 @@
+"""
+Smart Budget Planner - What-if scenario sweeps
+Evaluates a whole grid of salary, category-spending and emergency-target variations
+in one NumPy broadcast, using the same capacity and roadmap rules as the Goals page.
+"""
+
+import numpy as np
+
+from goal_store import ordered_goals
+
+
+def pct_range(start, stop, step):
+    """Inclusive percentage grid, e.g. pct_range(-10, 20, 5) -> [-10, -5, ..., 20]"""
+    return np.arange(start, stop + step / 2, step, dtype=float)
+
+
+def sweep(salary, category_spending, savings, emergency_targets, goals,
+          salary_pcts, category=None, category_pcts=(0,), now=None):
+    """Capacity and roadmap outcomes for every (salary %, category %, emergency target) combination.
+
+    Returned arrays are indexed [salary, category, emergency]; capacity has no emergency axis.
+    """
+    s = 1 + np.asarray(salary_pcts, dtype=float)[:, None] / 100            # (S, 1)
+    c = 1 + np.asarray(category_pcts, dtype=float)[None, :] / 100          # (1, C)
+    e = np.asarray(emergency_targets, dtype=float)[None, None, :]          # (1, 1, E)
+
+    total_spending = float(category_spending.sum()) if len(category_spending) else 0.0
+    cat_spending = float(category_spending.get(category, 0)) if category else 0.0
+
+    # Same rule as the Goals page: salary minus average monthly spending
+    spending = total_spending - cat_spending + cat_spending * c                # (1, C)
+    capacity = np.maximum(0, salary * s - spending)                         # (S, C)
+
+    # Goals in roadmap order: priority, then deadline
+    rows = ordered_goals(goals, now)
+    deadlines = rows['months_until'].to_numpy(dtype=float)
+    cumulative = np.cumsum(rows['target_amount'].to_numpy(dtype=float))
+
+    # Savings still needed once each goal is funded (emergency fund comes first)
+    remaining = np.maximum(0, cumulative[None, None, None, :] + e[..., None] - savings)  # (1, 1, E, K)
+    cap = capacity[:, :, None, None]                                                   # (S, C, 1, 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        end = np.where(remaining > 0, np.ceil(remaining / cap), 0)                     # (S, C, E, K)
+
+    on_time = (end <= deadlines).sum(axis=-1)
+    months_to_all = end[..., -1] if len(rows) else np.zeros(cap.shape[:3])
+
+    return {
+        'salary_pcts': np.asarray(salary_pcts, dtype=float),
+        'category_pcts': np.asarray(category_pcts, dtype=float),
+        'emergency_targets': np.asarray(emergency_targets, dtype=float),
+        'capacity': capacity,
+        'months_to_all_goals': months_to_all,
+        'goals_on_time': on_time,
+    }
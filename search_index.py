@@ -0,0 +1,109 @@
+"""
+Smart Budget Planner - Description search index
+Inverted index from description tokens to sorted row ids. Only distinct descriptions are
+tokenized, appended rows extend the posting lists in place, and a query intersects the
+posting lists of its terms (each term matching as a prefix) instead of scanning the ledger.
+"""
+
+import re
+from collections import defaultdict
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    """Lower-case alphanumeric tokens of a description or query"""
+    return TOKEN.findall(str(text).lower())
+
+
+class DescriptionIndex:
+    """Token -> sorted row ids over a ledger's Description column, extended as rows are appended"""
+
+    def __init__(self):
+        self.rows = 0
+        # token -> sorted int32 row-id chunks, consolidated into one array when queried
+        self._postings = {}
+        self._tokens = {}
+        self._vocabulary = None
+
+    @classmethod
+    def from_ledger(cls, expenses):
+        index = cls()
+        index.extend(expenses)
+        return index
+
+    def extend(self, expenses):
+        """Index the ledger rows past the ones already indexed (a shorter ledger is re-indexed)"""
+        if len(expenses) < self.rows:
+            self.__init__()
+        if len(expenses) == self.rows:
+            return self
+        descriptions = expenses['Description'].iloc[self.rows:]
+        codes, uniques = pd.factorize(descriptions)
+        # Rows grouped by description; rows without one (code -1) sort first and are skipped
+        order = np.argsort(codes, kind='stable').astype(np.int32) + self.rows
+        bounds = np.r_[0, np.cumsum(np.bincount(codes[codes >= 0], minlength=len(uniques)))] + (codes < 0).sum()
+
+        added = defaultdict(list)
+        for code, text in enumerate(uniques):
+            if text not in self._tokens:
+                self._tokens[text] = tuple(set(tokenize(text)))
+            for token in self._tokens[text]:
+                added[token].append(order[bounds[code]:bounds[code + 1]])
+        for token, parts in added.items():
+            # New row ids are all past the existing ones, so appending keeps each list sorted
+            rows = parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+            if token not in self._postings:
+                self._postings[token] = []
+                self._vocabulary = None
+            self._postings[token].append(rows)
+        self.rows = len(expenses)
+        return self
+
+    @property
+    def vocabulary(self):
+        """All indexed tokens, sorted for prefix lookups"""
+        if self._vocabulary is None:
+            self._vocabulary = np.array(sorted(self._postings), dtype=object)
+        return self._vocabulary
+
+    def postings(self, token):
+        """Sorted row ids of rows containing `token`"""
+        chunks = self._postings.get(token)
+        if not chunks:
+            return np.empty(0, dtype=np.int32)
+        if len(chunks) > 1:
+            chunks[:] = [np.concatenate(chunks)]
+        return chunks[0]
+
+    def prefix_postings(self, prefix):
+        """Sorted row ids of rows with a token starting with `prefix`"""
+        vocabulary = self.vocabulary
+        lo = np.searchsorted(vocabulary, prefix, side='left')
+        hi = np.searchsorted(vocabulary, prefix[:-1] + chr(ord(prefix[-1]) + 1), side='left')
+        tokens = vocabulary[lo:hi]
+        if len(tokens) == 1:
+            return self.postings(tokens[0])
+        hit = np.zeros(self.rows, dtype=bool)
+        for token in tokens:
+            hit[self.postings(token)] = True
+        return np.flatnonzero(hit).astype(np.int32)
+
+    def search(self, query):
+        """Sorted row ids matching every term of `query` (each as a prefix); none for a query without terms"""
+        terms = sorted(set(tokenize(query)))
+        if not terms:
+            return np.empty(0, dtype=np.int32)
+        matches = sorted((self.prefix_postings(term) for term in terms), key=len)
+        return reduce(lambda a, b: np.intersect1d(a, b, assume_unique=True), matches)
+
+
+def match_summary(expenses, rows):
+    """Count, total and per-category totals of the matching rows of `expenses`"""
+    matched = expenses[['Category', 'Amount']].iloc[rows]
+    by_category = matched.groupby('Category', observed=True)['Amount'].sum().sort_values(ascending=False)
+    return {'count': len(rows), 'total': float(matched['Amount'].sum()), 'category_totals': by_category}
@@ -0,0 +1,135 @@
+"""
+Smart Budget Planner - Seasonal trend predictor
+The notebook's "CLEVER AI" method (year-over-year growth, 6-month trend, recent momentum,
+long-run average, seasonal multipliers and inflation) computed for all categories at once
+from the monthly aggregates.
+"""
+
+import numpy as np
+import pandas as pd
+
+from budget_analytics import CATEGORIES
+from income_ledger import month_index
+from ml_insights import next_month
+
+SEASONS = ['Winter', 'Spring', 'Summer', 'Autumn']
+
+SEASONAL_TIPS = {
+    'Winter': ['heating bills increase', 'winter clothes', 'holiday expenses'],
+    'Spring': ['spring cleaning', 'outdoor activities', 'lighter clothing'],
+    'Summer': ['cooling costs', 'vacation expenses', 'summer activities'],
+    'Autumn': ['back-to-school costs', 'heater preparation', 'autumn clothing']
+}
+
+SEASONAL_MULTIPLIERS = {
+    'Winter': {'Bills': 1.35, 'Healthcare': 1.25, 'Food': 1.10, 'Shopping': 1.15, 'Entertainment': 0.85},
+    'Spring': {'Entertainment': 1.25, 'Transportation': 1.10, 'Shopping': 1.10, 'Bills': 0.85},
+    'Summer': {'Entertainment': 1.30, 'Bills': 1.20, 'Transportation': 1.15, 'Education': 0.80},
+    'Autumn': {'Education': 1.40, 'Shopping': 1.20, 'Bills': 0.90},
+}
+
+MONTHLY_INFLATION = 1.01
+
+# Base weight and confidence of each component
+YOY_WEIGHT, TREND_WEIGHT, RECENT_WEIGHT, OVERALL_WEIGHT = 0.30, 0.20, 0.40, 0.10
+TREND_CONFIDENCE, RECENT_CONFIDENCE = 0.75, 0.9
+
+
+def get_season(month):
+    """Season name for a month number (scalar or array)"""
+    names = np.array(SEASONS)[(np.asarray(month) % 12) // 3]
+    return names.item() if names.ndim == 0 else names
+
+
+def seasonal_multipliers(season, categories=CATEGORIES):
+    return np.array([SEASONAL_MULTIPLIERS.get(season, {}).get(c, 1.0) for c in categories])
+
+
+def monthly_matrix(expenses, categories=CATEGORIES, last=None):
+    """Dense (months x categories) spending matrix ending at month index `last`, and its first month index"""
+    idx = month_index(expenses['Year'].to_numpy(dtype=int), expenses['Month'].to_numpy(dtype=int))
+    first = int(idx.min())
+    last = int(idx.max()) if last is None else max(int(last), int(idx.max()))
+
+    cat_codes = pd.Categorical(expenses['Category'], categories=categories).codes
+    known = cat_codes >= 0
+    matrix = np.zeros((last - first + 1, len(categories)))
+    np.add.at(matrix, (idx[known] - first, cat_codes[known]), expenses['Amount'].to_numpy(dtype=float)[known])
+    return matrix, first
+
+
+def _window(matrix, first, start, stop):
+    """Rows for month indexes start..stop-1 (zeros outside the recorded range)"""
+    out = np.zeros((stop - start, matrix.shape[1]))
+    lo, hi = max(start, first), min(stop, first + len(matrix))
+    if hi > lo:
+        out[lo - start:hi - start] = matrix[lo - first:hi - first]
+    return out
+
+
+def predict_seasonal(expenses, categories=CATEGORIES, now=None):
+    """Seasonal trend prediction of next month's spending per category.
+
+    Returns (year, month, DataFrame[Category, Predicted Amount, Confidence, YoY, Trend,
+    Recent Avg, Overall Avg, Seasonal x]).
+    """
+    year, month = next_month(now)
+    target = int(month_index(year, month))
+    matrix, first = monthly_matrix(expenses, categories, last=target - 1)
+    present = matrix > 0
+
+    # 1. Year over year: same month last year, grown by the rate from the year before
+    last_year = _window(matrix, first, target - 12, target - 11)[0]
+    two_years = _window(matrix, first, target - 24, target - 23)[0]
+    both = (last_year > 0) & (two_years > 0)
+    growth = np.divide(last_year - two_years, two_years, out=np.zeros_like(last_year), where=both)
+    yoy = np.where(both, last_year * (1 + growth), np.where(last_year > 0, last_year * MONTHLY_INFLATION, 0))
+    yoy_conf = np.where(both, 0.85, np.where(last_year > 0, 0.6, 0))
+
+    # 2. Linear trend over the months with spending in the last 6, evaluated one step ahead
+    recent6 = _window(matrix, first, target - 6, target)
+    mask = recent6 > 0
+    n = mask.sum(axis=0)
+    # Months are numbered 0..n-1 within each category, as in np.polyfit over the values
+    x = np.where(mask, np.cumsum(mask, axis=0) - 1, 0)
+    sx, sy = x.sum(axis=0), np.where(mask, recent6, 0).sum(axis=0)
+    sxx, sxy = (x * x * mask).sum(axis=0), (x * recent6 * mask).sum(axis=0)
+    denom = n * sxx - sx ** 2
+    slope = np.divide(n * sxy - sx * sy, denom, out=np.zeros_like(sy), where=denom > 0)
+    intercept = np.divide(sy - slope * sx, n, out=np.zeros_like(sy), where=n > 0)
+    trend = slope * n + intercept
+    trend_conf = np.where(n >= 3, TREND_CONFIDENCE, 0)
+
+    # 3. Recent momentum: average of the last 3 months with spending
+    recent3 = _window(matrix, first, target - 3, target)
+    n3 = (recent3 > 0).sum(axis=0)
+    recent_avg = np.divide(recent3.sum(axis=0), n3, out=np.zeros(len(categories)), where=n3 > 0)
+    recent_conf = np.where(n3 > 0, RECENT_CONFIDENCE, 0)
+
+    # 4. Long-run average over months with spending
+    n_all = present.sum(axis=0)
+    overall_avg = np.divide(matrix.sum(axis=0), n_all, out=np.zeros(len(categories)), where=n_all > 0)
+
+    season = get_season(month)
+    seasonal = seasonal_multipliers(season, categories)
+
+    # 5. Confidence-weighted blend of the available components
+    w_yoy = np.where(yoy_conf > 0, YOY_WEIGHT * yoy_conf, 0)
+    w_trend = np.where((trend_conf > 0) & (trend > 0), TREND_WEIGHT * trend_conf, 0)
+    w_recent = np.where((recent_conf > 0) & (recent_avg > 0), RECENT_WEIGHT * recent_conf, 0)
+    weights = np.stack([w_yoy, w_trend, w_recent, np.full(len(categories), OVERALL_WEIGHT)])
+    values = np.stack([yoy, trend, recent_avg * seasonal, overall_avg * seasonal])
+    predicted = (weights * values).sum(axis=0) / weights.sum(axis=0) * MONTHLY_INFLATION
+
+    confidence = np.minimum(100, yoy_conf * 30 + trend_conf * 20 + recent_conf * 40 + 10)
+
+    return year, month, pd.DataFrame({
+        'Category': list(categories),
+        'Predicted Amount': predicted,
+        'Confidence': confidence,
+        'YoY': yoy,
+        'Trend': trend,
+        'Recent Avg': recent_avg,
+        'Overall Avg': overall_avg,
+        'Seasonal x': seasonal,
+    })
@@ -0,0 +1,116 @@
+"""
+Smart Budget Planner - Year-over-year and seasonal comparisons
+The notebook's 2-year seasonal insights for the Analysis page: each view is a reshape of
+the dense month x category matrix (years x 12 months, or season-years x 4 seasons x 3
+months) instead of one filter per month or season.
+"""
+
+import numpy as np
+import pandas as pd
+
+from budget_analytics import CATEGORIES, MONTH_NAMES
+from seasonal_predictor import SEASONS, monthly_matrix
+
+
+def _pct_change(current, previous):
+    """Percentage change, NaN where there is nothing to compare against"""
+    current, previous = np.asarray(current, dtype=float), np.asarray(previous, dtype=float)
+    return np.divide(current - previous, previous, out=np.full(np.broadcast(current, previous).shape, np.nan),
+                     where=previous > 0) * 100
+
+
+def _padded(matrix, first, start, length):
+    """`length` rows of the matrix beginning at month index `start`, NaN outside the recorded range"""
+    out = np.full((length, matrix.shape[1]), np.nan)
+    out[first - start:first - start + len(matrix)] = matrix
+    return out
+
+
+def year_over_year(matrix, first, categories=CATEGORIES):
+    """Monthly totals against the same month a year earlier, plus the latest month by category"""
+    start = first - first % 12
+    years = (first + len(matrix) - 1) // 12 - start // 12 + 1
+    # (years, 12, categories): the same month of consecutive years lines up on axis 0
+    cube = _padded(matrix, first, start, years * 12).reshape(years, 12, -1)
+    prior = np.concatenate([np.full((1, 12, cube.shape[2]), np.nan), cube[:-1]])
+
+    totals, prior_totals = cube.sum(axis=2), prior.sum(axis=2)
+    recorded = ~np.isnan(totals.ravel())
+    year_of = np.repeat(np.arange(years) + start // 12, 12)
+    month_of = np.tile(np.arange(1, 13), years)
+    months = pd.DataFrame({
+        'Year': year_of,
+        'Month': month_of,
+        'Period': [f"{MONTH_NAMES[m][:3]} {y}" for y, m in zip(year_of, month_of)],
+        'Total': totals.ravel(),
+        'Last Year': prior_totals.ravel(),
+        'YoY %': _pct_change(totals.ravel(), prior_totals.ravel()),
+    })[recorded].reset_index(drop=True)
+
+    grid = pd.DataFrame(totals, index=np.arange(years) + start // 12,
+                        columns=[name[:3] for name in MONTH_NAMES[1:]])
+
+    latest_year, latest_month = divmod(first + len(matrix) - 1, 12)
+    this, last = cube[-1, latest_month], prior[-1, latest_month]
+    latest = pd.DataFrame({
+        'Category': list(categories),
+        'This Year': this,
+        'Last Year': np.nan_to_num(last),
+        'Change %': _pct_change(this, np.nan_to_num(last)),
+    })
+    return months, grid, latest, (latest_year, latest_month + 1)
+
+
+def season_over_season(matrix, first, categories=CATEGORIES):
+    """Spending, category mix and changes per (season year, season).
+
+    December belongs to the following year's Winter, as in get_season.
+    """
+    # Season years run December..November, so month index 12*y - 1 opens season year y
+    start_year = (first + 1) // 12
+    end_year = (first + len(matrix)) // 12
+    start = 12 * start_year - 1
+    n_years = end_year - start_year + 1
+    padded = _padded(matrix, first, start, n_years * 12)
+
+    # (season years, 4 seasons, 3 months, categories) summed over the months of each season
+    blocks = padded.reshape(n_years, 4, 3, -1)
+    recorded_months = (~np.isnan(blocks[..., 0])).sum(axis=2).ravel()
+    spending = np.nansum(blocks, axis=2).reshape(n_years * 4, -1)
+
+    totals = spending.sum(axis=1)
+    mix = np.divide(spending, totals[:, None], out=np.zeros_like(spending), where=totals[:, None] > 0)
+    # Only whole seasons are compared; a season still in progress would show a spurious drop
+    complete = np.where(recorded_months == 3, totals, np.nan)
+    previous = np.r_[np.nan, complete[:-1]]
+    last_year = np.r_[np.full(4, np.nan), complete[:-4]]
+
+    seasons = pd.DataFrame(spending, columns=list(categories))
+    seasons.insert(0, 'Season Year', np.repeat(np.arange(start_year, end_year + 1), 4))
+    seasons.insert(1, 'Season', np.tile(SEASONS, n_years))
+    seasons.insert(2, 'Label', seasons['Season'] + ' ' + seasons['Season Year'].astype(str))
+    seasons.insert(3, 'Months', recorded_months)
+    seasons['Total'] = totals
+    seasons['vs Previous Season %'] = _pct_change(complete, previous)
+    seasons['vs Last Year %'] = _pct_change(complete, last_year)
+
+    shares = pd.DataFrame(mix * 100, columns=list(categories))
+    shares.insert(0, 'Label', seasons['Label'])
+    keep = recorded_months > 0
+    return seasons[keep].reset_index(drop=True), shares[keep].reset_index(drop=True)
+
+
+def seasonal_views(expenses, categories=CATEGORIES):
+    """All year-over-year and seasonal views from one month x category matrix"""
+    matrix, first = monthly_matrix(expenses, categories)
+    months, grid, latest, (year, month) = year_over_year(matrix, first, categories)
+    seasons, mix = season_over_season(matrix, first, categories)
+    return {
+        'months': months,
+        'grid': grid,
+        'latest': latest,
+        'latest_year': year,
+        'latest_month': month,
+        'seasons': seasons,
+        'season_mix': mix,
+    }
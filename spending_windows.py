@@ -0,0 +1,162 @@
+"""
+Smart Budget Planner - Rolling spending windows
+Daily per-category totals and their prefix sums, built once per ledger, so the total,
+average, volatility and trailing-vs-prior comparison of any day window and any set of
+categories is a constant-time difference of two prefix rows.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+WINDOWS = [7, 30, 90, 365]
+
+
+def _day(when):
+    """Day number (days since 1970-01-01) of a date-like value"""
+    return int(np.datetime64(pd.Timestamp(when).date(), 'D').astype(np.int64))
+
+
+class SpendingWindows:
+    """Prefix sums over the ledger's daily (days x categories) spending matrix.
+
+    Row t of each prefix array covers the days before day `first + t`, so a window of
+    days [start, stop) is `prefix[stop - first] - prefix[start - first]` after clipping.
+    """
+
+    def __init__(self, expenses, categories=None):
+        dates = pd.to_datetime(expenses['Date'], errors='coerce', format='mixed')
+        valid = dates.notna().to_numpy()
+        if categories is None:
+            categories = sorted(expenses['Category'].dropna().astype(str).unique())
+        self.categories = list(categories)
+
+        days = dates.to_numpy()[valid].astype('datetime64[D]').astype(np.int64)
+        cat_codes = pd.Categorical(expenses['Category'], categories=self.categories).codes[valid]
+        amounts = expenses['Amount'].to_numpy(dtype=float)[valid]
+        known = cat_codes >= 0
+        days, cat_codes, amounts = days[known], cat_codes[known], amounts[known]
+
+        self.first = int(days.min()) if len(days) else _day(datetime.now())
+        self.last = int(days.max()) if len(days) else self.first
+        n_days = self.last - self.first + 1
+
+        daily = np.zeros((n_days, len(self.categories)))
+        np.add.at(daily, (days - self.first, cat_codes), amounts)
+        self.daily = daily
+
+        zero = np.zeros((1, len(self.categories)))
+        self.prefix = np.concatenate([zero, np.cumsum(daily, axis=0)])
+        # Prefix of each day's outer product, so the variance of any category mix is w' Q w
+        outer = daily[:, :, None] * daily[:, None, :]
+        self.prefix_sq = np.concatenate([zero[:, :, None] * zero[:, None, :], np.cumsum(outer, axis=0)])
+
+        # Months with spending: one marker on the first spending day of each month
+        month = (np.arange(self.first, self.last + 1).astype('datetime64[D]')
+                 .astype('datetime64[M]').astype(np.int64))
+        spent = daily.sum(axis=1) > 0
+        first_spend = spent & (pd.Series(spent).groupby(month).cumsum().to_numpy() == 1)
+        self.month_prefix = np.r_[0, np.cumsum(first_spend)]
+        self.day_month = month
+        # Position (relative to `first`) of the first spending day in each day's month, or n_days if none
+        first_pos = np.where(first_spend, np.arange(n_days), n_days)
+        self.month_first_spend = pd.Series(first_pos).groupby(month).transform('min').to_numpy()
+        self.month_end = pd.Series(np.arange(n_days)).groupby(month).transform('max').to_numpy() + 1
+
+    # Helpers
+
+    def _weights(self, categories=None):
+        if categories is None:
+            return np.ones(len(self.categories))
+        return np.isin(self.categories, list(categories)).astype(float)
+
+    def _clip(self, start, stop):
+        """Window of absolute day numbers [start, stop) as prefix row indexes"""
+        n_days = len(self.daily)
+        lo = min(max(start - self.first, 0), n_days)
+        hi = min(max(stop - self.first, 0), n_days)
+        return lo, max(lo, hi)
+
+    def _bounds(self, days, end=None):
+        """[start, stop) of the `days`-day window ending on (and including) `end`, today by default"""
+        stop = _day(end or datetime.now()) + 1
+        return stop - days, stop
+
+    # Window queries (O(1) in the ledger size)
+
+    def category_totals(self, start, stop):
+        lo, hi = self._clip(start, stop)
+        return self.prefix[hi] - self.prefix[lo]
+
+    def total(self, start, stop, categories=None):
+        return float(self.category_totals(start, stop) @ self._weights(categories))
+
+    def volatility(self, start, stop, categories=None):
+        """Standard deviation of daily spending over the window (days without spending count as 0)"""
+        n = stop - start
+        if n <= 0:
+            return 0.0
+        w = self._weights(categories)
+        lo, hi = self._clip(start, stop)
+        total = (self.prefix[hi] - self.prefix[lo]) @ w
+        squares = w @ (self.prefix_sq[hi] - self.prefix_sq[lo]) @ w
+        return float(np.sqrt(max(0.0, squares / n - (total / n) ** 2)))
+
+    def active_months(self, start, stop):
+        """Calendar months with any spending inside [start, stop)"""
+        lo, hi = self._clip(start, stop)
+        if hi <= lo:
+            return 0
+        count = int(self.month_prefix[hi] - self.month_prefix[lo])
+        # The first month started before the window: it counts if it has spending inside it
+        if self.month_first_spend[lo] < lo:
+            head = min(self.month_end[lo], hi)
+            count += int(self.prefix[head].sum() - self.prefix[lo].sum() > 0)
+        return count
+
+    def window(self, days, end=None, categories=None):
+        """Total, daily average, volatility and change vs the `days` days before it"""
+        start, stop = self._bounds(days, end)
+        total = self.total(start, stop, categories)
+        prior = self.total(start - days, start, categories)
+        return {
+            'Window': f"{days} days",
+            'Total': total,
+            'Daily Avg': total / days,
+            'Volatility': self.volatility(start, stop, categories),
+            'Prior Total': prior,
+            'Change %': (total - prior) / prior * 100 if prior > 0 else np.nan,
+        }
+
+    def summary(self, windows=WINDOWS, end=None, categories=None):
+        return pd.DataFrame([self.window(days, end, categories) for days in windows])
+
+    def monthly_average(self, days=90, now=None):
+        """(average monthly total, per-category Series) over the last `days` days, averaged
+        across the months that actually have spending; later-dated rows are included"""
+        start = self._bounds(days, now)[1] - days
+        stop = max(start, self.last + 1)
+        months = self.active_months(start, stop)
+        totals = self.category_totals(start, stop)
+        if not months:
+            return 0, pd.Series(dtype=float)
+        per_category = pd.Series(totals / months, index=self.categories)
+        return float(totals.sum() / months), per_category[totals > 0]
+
+    # Series for charting (O(n) in the number of days)
+
+    def rolling(self, days, categories=None):
+        """Trailing `days`-day daily average and volatility for every day of the ledger"""
+        w = self._weights(categories)
+        sums = self.prefix @ w
+        squares = np.einsum('tij,i,j->t', self.prefix_sq, w, w)
+        hi = np.arange(1, len(sums))
+        lo = np.maximum(hi - days, 0)
+        mean = (sums[hi] - sums[lo]) / days
+        variance = (squares[hi] - squares[lo]) / days - mean ** 2
+        return pd.DataFrame({
+            'Date': pd.to_datetime(np.arange(self.first, self.last + 1), unit='D'),
+            'Daily Avg': mean,
+            'Volatility': np.sqrt(np.maximum(variance, 0)),
+        })
@@ -0,0 +1,362 @@
+"""
+Smart Budget Planner - Monthly statements
+Renders a self-contained HTML statement (Dashboard metrics, category breakdown, budget vs
+actual, goal progress, anomalies) for every ledger in a directory across a process pool.
+Charts are inline SVG, so statements need no network, browser or plotting backend; PDF
+copies are written too when WeasyPrint is installed.
+
+Usage:
+    python statements.py ledgers/ --output statements/ --month 2026-09 --salary 4000 --workers 8
+"""
+
+import argparse
+import calendar
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from html import escape
+from pathlib import Path
+from string import Template
+
+import numpy as np
+import pandas as pd
+
+from budget_analytics import EMERGENCY_FUND_TARGET, MONTH_NAMES, default_budgets, total_income
+from budget_batch import find_ledgers, load_ledger, run_batch
+from budget_tracker import BudgetTracker
+from cache_warmer import LedgerArtifacts
+from fx_rates import FX_RATES_PATH, HOME_CURRENCY, format_money, load_fx_table
+from goal_store import GoalStore
+from income_ledger import month_index
+from ml_insights import MIN_ANOMALY_ROWS
+
+TREND_MONTHS = 12
+MAX_ANOMALIES = 10
+COLORS = ['#4CAF50', '#2196F3', '#FF9800', '#9C27B0', '#F44336', '#00BCD4', '#795548', '#607D8B']
+
+PAGE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+  @page { size: A4; margin: 16mm; }
+  body { font-family: -apple-system, "Segoe UI", Helvetica, Arial, sans-serif; color: #222; max-width: 820px; margin: 24px auto; }
+  h1 { margin-bottom: 0; } h2 { border-bottom: 2px solid #4CAF50; padding-bottom: 4px; margin-top: 28px; }
+  .sub { color: #666; margin-top: 4px; }
+  .metrics { display: flex; gap: 12px; }
+  .metric { flex: 1; border: 1px solid #ddd; border-radius: 8px; padding: 10px 12px; }
+  .metric .label { color: #666; font-size: 12px; } .metric .value { font-size: 22px; font-weight: 600; }
+  .metric .delta { font-size: 12px; color: #666; }
+  table { width: 100%; border-collapse: collapse; font-size: 13px; margin-top: 8px; }
+  th, td { text-align: left; padding: 4px 6px; border-bottom: 1px solid #eee; } td.num, th.num { text-align: right; }
+  .bar { background: #eee; border-radius: 4px; height: 10px; width: 120px; }
+  .bar div { background: #4CAF50; border-radius: 4px; height: 10px; }
+  .over { color: #C62828; font-weight: 600; } .muted { color: #888; }
+  section { page-break-inside: avoid; }
+</style>
+</head>
+<body>
+<h1>$title</h1>
+<p class="sub">$subtitle</p>
+$body
+</body>
+</html>
+""")
+
+
+# Figures
+
+def _day(year, month, day=1):
+    """Day number (days since 1970-01-01), as SpendingWindows counts days"""
+    return int(np.datetime64(f"{year:04d}-{month:02d}-{day:02d}", 'D').astype(np.int64))
+
+
+def ledger_through(expenses, year, month):
+    """Rows dated on or before the end of the statement month"""
+    months = month_index(expenses['Year'].to_numpy(dtype=int), expenses['Month'].to_numpy(dtype=int))
+    return expenses[months <= month_index(year, month)].reset_index(drop=True)
+
+
+def latest_month(expenses):
+    months = month_index(expenses['Year'].to_numpy(dtype=int), expenses['Month'].to_numpy(dtype=int))
+    last = int(months.max())
+    return last // 12, last % 12 + 1
+
+
+def goal_progress(goal_plan, available):
+    """Funded amount and progress per goal, filling goals from savings in funding order"""
+    schedule = goal_plan['schedule']
+    amounts = schedule['Amount'].to_numpy(dtype=float)
+    before = np.concatenate(([0.0], np.cumsum(amounts)[:-1]))
+    funded = np.clip(available - before, 0, amounts)
+    return schedule.assign(Funded=funded, Progress=np.where(amounts > 0, funded / np.maximum(amounts, 1e-9), 1.0))
+
+
+def statement_data(artifacts, year, month, budgets=None):
+    """Every figure of one statement; shares the artifacts' cached ledger aggregates"""
+    plan = artifacts.plan
+    start = _day(year, month)
+    stop = start + calendar.monthrange(year, month)[1]
+
+    windows = artifacts.get('windows', HOME_CURRENCY)
+    by_category = pd.Series(windows.category_totals(start, stop), index=windows.categories)
+    by_category = by_category[by_category > 0].sort_values(ascending=False)
+    previous = windows.total(_day(year - (month == 1), (month - 2) % 12 + 1), start)
+
+    rollup = artifacts.get('rollup')
+    in_month = (rollup['Year'].astype(int) == year) & (rollup['Month'].astype(int) == month)
+    summary = artifacts.get('summary', HOME_CURRENCY)
+    monthly = summary['monthly'].tail(TREND_MONTHS)
+
+    data = {
+        'year': year,
+        'month': month,
+        'spent': float(by_category.sum()),
+        'previous': previous,
+        'count': int(rollup.loc[in_month, 'Count'].sum()),
+        'category_totals': by_category,
+        'trend': [(f"{MONTH_NAMES[int(m)][:3]} {int(y) % 100:02d}", float(a), (int(y), int(m)) == (year, month))
+                  for y, m, a in monthly[['Year', 'Month', 'Amount']].itertuples(index=False)],
+        'savings': None,
+        'budget_status': [],
+        'goals': None,
+        'anomalies': None,
+    }
+
+    if plan.get('salary'):
+        snapshot = artifacts.get('savings', 'statement')
+        income = total_income(artifacts.get('ledger', HOME_CURRENCY), plan['salary'], plan['income_ledger'])
+        data['savings'] = {'income': income, 'saved': snapshot['calculated_savings'],
+                           'rate': snapshot['calculated_savings'] / income * 100 if income > 0 else 0,
+                           'capacity': snapshot['monthly_savings_capacity'],
+                           'emergency_shortfall': snapshot['emergency_shortfall']}
+        tracker = BudgetTracker(year, month)
+        tracker.spent = by_category.to_dict()
+        data['budget_status'] = tracker.status(budgets or default_budgets(plan['salary']), today=plan['now'])
+        if len(plan['goals']):
+            data['goals'] = goal_progress(artifacts.get('goal_plan', ('statement',)), snapshot['available_for_goals'])
+
+    if len(artifacts.expenses) >= MIN_ANOMALY_ROWS:
+        anomalies = artifacts.get('anomalies')[0]
+        anomalies = anomalies[(anomalies['Year'].astype(int) == year) & (anomalies['Month'].astype(int) == month)]
+        data['anomalies'] = anomalies.sort_values('Amount', ascending=False)
+    return data
+
+
+# Charts (inline SVG)
+
+def svg_hbars(labels, values, markers=None, width=560, row=24, money=format_money):
+    """Horizontal bars with value labels; optional per-row marker (e.g. the budget) as a tick"""
+    label_w, value_w = 120, 90
+    scale_max = max([*values, *(markers or [])], default=0) or 1
+    plot_w = width - label_w - value_w
+    parts = []
+    for i, (label, value) in enumerate(zip(labels, values)):
+        y = i * row
+        bar_w = plot_w * value / scale_max
+        over = markers is not None and markers[i] > 0 and value > markers[i]
+        color = '#F44336' if over else COLORS[i % len(COLORS)]
+        parts.append(f'<text x="{label_w - 6}" y="{y + row * 0.65:.1f}" text-anchor="end">{escape(str(label))}</text>'
+                     f'<rect x="{label_w}" y="{y + 4}" width="{bar_w:.1f}" height="{row - 8}" rx="3" fill="{color}"/>'
+                     f'<text x="{label_w + bar_w + 4:.1f}" y="{y + row * 0.65:.1f}">{escape(money(value))}</text>')
+        if markers is not None:
+            x = label_w + plot_w * markers[i] / scale_max
+            parts.append(f'<line x1="{x:.1f}" x2="{x:.1f}" y1="{y + 1}" y2="{y + row - 1}" stroke="#222" stroke-width="2"/>')
+    height = max(row, row * len(labels))
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-size="12" '
+            f'font-family="sans-serif">{"".join(parts)}</svg>')
+
+
+def svg_columns(points, width=560, height=180):
+    """Column chart of (label, value, highlighted) points"""
+    if not points:
+        return ''
+    top, bottom = 16, 22
+    scale_max = max(value for _, value, _ in points) or 1
+    slot = width / len(points)
+    parts = []
+    for i, (label, value, highlight) in enumerate(points):
+        h = (height - top - bottom) * value / scale_max
+        x = i * slot + slot * 0.15
+        parts.append(f'<rect x="{x:.1f}" y="{height - bottom - h:.1f}" width="{slot * 0.7:.1f}" height="{h:.1f}" '
+                     f'rx="2" fill="{"#4CAF50" if highlight else "#B0BEC5"}"/>'
+                     f'<text x="{x + slot * 0.35:.1f}" y="{height - 6}" text-anchor="middle">{escape(label)}</text>')
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" font-size="10" '
+            f'font-family="sans-serif">{"".join(parts)}</svg>')
+
+
+# HTML
+
+def _metric(label, value, delta=''):
+    return (f'<div class="metric"><div class="label">{escape(label)}</div><div class="value">{escape(value)}</div>'
+            f'<div class="delta">{escape(delta)}</div></div>')
+
+
+def _table(headers, rows, numeric=()):
+    head = ''.join(f'<th class="num">{escape(h)}</th>' if h in numeric else f'<th>{escape(h)}</th>' for h in headers)
+    body = ''.join('<tr>' + ''.join(f'<td class="num">{cell}</td>' if h in numeric else f'<td>{cell}</td>'
+                                    for h, cell in zip(headers, row)) + '</tr>' for row in rows)
+    return f'<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>'
+
+
+def render_statement(data, name, goals=0):
+    """Self-contained HTML for one statement"""
+    money = format_money
+    spent, previous = data['spent'], data['previous']
+    change = f"{(spent - previous) / previous * 100:+.1f}% vs last month" if previous > 0 else "no spending last month"
+    metrics = [_metric("Spent", money(spent), f"{data['count']} transactions"),
+               _metric("Avg Transaction", money(spent / data['count']) if data['count'] else money(0), change)]
+    if data['savings']:
+        metrics.append(_metric("Total Savings", money(data['savings']['saved']), f"{data['savings']['rate']:.1f}% rate"))
+    metrics.append(_metric("Active Goals", str(goals), "financial targets"))
+    sections = [f'<section class="metrics">{"".join(metrics)}</section>']
+
+    totals = data['category_totals']
+    if len(totals):
+        shares = totals / totals.sum() * 100
+        sections.append('<section><h2>Category Breakdown</h2>' + svg_hbars(list(totals.index), totals.tolist())
+                        + _table(['Category', 'Amount', 'Share'],
+                                 [(escape(c), money(a), f"{s:.1f}%") for c, a, s in zip(totals.index, totals, shares)],
+                                 numeric=('Amount', 'Share')) + '</section>')
+    else:
+        sections.append('<section><h2>Category Breakdown</h2><p class="muted">No spending this month.</p></section>')
+
+    sections.append('<section><h2>Monthly Trend</h2>' + svg_columns(data['trend']) + '</section>')
+
+    if data['budget_status']:
+        status = [row for row in data['budget_status'] if row['Budget'] > 0 or row['Spent'] > 0]
+        rows = [(escape(row['Category']), money(row['Budget']), money(row['Spent']),
+                 f'<span class="over">{row["Used %"]:.0f}%</span>' if row['Alert'] == 'over' else f"{row['Used %']:.0f}%")
+                for row in status]
+        sections.append('<section><h2>Budget vs Actual</h2>'
+                        + svg_hbars([r['Category'] for r in status], [r['Spent'] for r in status],
+                                    markers=[r['Budget'] for r in status])
+                        + _table(['Category', 'Budget', 'Spent', 'Used'], rows, numeric=('Budget', 'Spent', 'Used'))
+                        + '</section>')
+
+    if data['goals'] is not None:
+        rows = [(escape(str(g['Goal'])), escape(str(g['Priority'])), money(g['Amount']), money(g['Funded']),
+                 f'<div class="bar"><div style="width:{min(100, g["Progress"] * 100):.0f}%"></div></div>',
+                 f"{g['Deadline (months)']} months",
+                 'yes' if g['On Time'] else '<span class="over">no</span>')
+                for _, g in data['goals'].iterrows()]
+        savings = data['savings']
+        note = (f'<p class="muted">Emergency fund short by {money(savings["emergency_shortfall"])}; '
+                f'goals are funded once it is full.</p>' if savings['emergency_shortfall'] > 0 else '')
+        sections.append('<section><h2>Goal Progress</h2>'
+                        + _table(['Goal', 'Priority', 'Target', 'Funded', 'Progress', 'Due in', 'On track'], rows,
+                                 numeric=('Target', 'Funded'))
+                        + note + '</section>')
+
+    if data['anomalies'] is not None:
+        anomalies = data['anomalies']
+        if anomalies.empty:
+            body = '<p class="muted">No unusual expenses this month.</p>'
+        else:
+            body = (f'<p>{len(anomalies)} unusual expense(s) this month'
+                    f'{f", largest {MAX_ANOMALIES} shown" if len(anomalies) > MAX_ANOMALIES else ""}.</p>'
+                    + _table(['Date', 'Category', 'Amount', 'Description'],
+                             [(escape(str(a.Date)), escape(str(a.Category)), money(a.Amount), escape(str(a.Description)))
+                              for a in anomalies.head(MAX_ANOMALIES).itertuples()], numeric=('Amount',)))
+        sections.append(f'<section><h2>Unusual Expenses</h2>{body}</section>')
+
+    period = f"{MONTH_NAMES[data['month']]} {data['year']}"
+    return PAGE.substitute(title=escape(f"Statement for {name} - {period}"),
+                           subtitle=escape(f"Amounts in {HOME_CURRENCY} · generated {datetime.now():%Y-%m-%d %H:%M}"),
+                           body='\n'.join(sections))
+
+
+# Pipeline
+
+def load_goals(path):
+    return GoalStore(json.loads(Path(path).read_text())) if path and Path(path).exists() else GoalStore()
+
+
+def process_statement(path, output_dir, salary=None, emergency_fund_target=None, month=None, goals=None, pdf=False,
+                      fx_rates=None):
+    """Load one ledger and write its statement; returns (name, rows, seconds).
+
+    Goals come from <ledger>.goals.json next to the ledger, else from the shared `goals` file.
+    """
+    start = time.perf_counter()
+    path = Path(path)
+    expenses = load_ledger(path, load_fx_table(fx_rates))
+    if expenses.empty:
+        raise ValueError("ledger has no valid expenses")
+    year, month_number = month or latest_month(expenses)
+    expenses = ledger_through(expenses, year, month_number)
+    if expenses.empty:
+        raise ValueError(f"no expenses on or before {year}-{month_number:02d}")
+
+    store = load_goals(path.with_suffix('.goals.json')) or load_goals(goals)
+    plan = {'salary': salary or 0, 'income_ledger': None,
+            'emergency_fund_target': emergency_fund_target if emergency_fund_target is not None else EMERGENCY_FUND_TARGET,
+            'goals': store, 'floor_pct': None,
+            'now': datetime(year, month_number, calendar.monthrange(year, month_number)[1], 23, 59)}
+    artifacts = LedgerArtifacts({}, expenses, plan=plan)
+    html = render_statement(statement_data(artifacts, year, month_number), path.stem, len(store))
+
+    out_path = Path(output_dir) / f"{path.stem}.{year}-{month_number:02d}.statement.html"
+    out_path.write_text(html, encoding='utf-8')
+    if pdf:
+        from weasyprint import HTML
+        HTML(string=html).write_pdf(out_path.with_suffix('').with_suffix('.statement.pdf'))
+    return path.name, len(expenses), time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render monthly HTML statements for a directory of expense ledgers")
+    parser.add_argument('input_dir', help="directory of expense CSV or Parquet files (one per user)")
+    parser.add_argument('--output', '-o', default='statements', help="directory for <ledger>.<month>.statement.html")
+    parser.add_argument('--month', default=None, help="statement month as YYYY-MM (default: each ledger's latest)")
+    parser.add_argument('--workers', '-w', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--salary', type=float, default=None, help="monthly salary for savings, budgets and goals")
+    parser.add_argument('--emergency-target', type=float, default=None,
+                        help=f"emergency fund target (default: {EMERGENCY_FUND_TARGET})")
+    parser.add_argument('--goals', default=None, help="goals JSON used for ledgers without their own .goals.json")
+    parser.add_argument('--pdf', action='store_true', help="also write PDF copies (needs weasyprint)")
+    parser.add_argument('--fx-rates', default=FX_RATES_PATH,
+                        help=f"FX rate table for converting amounts to {HOME_CURRENCY} (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    month = None
+    if args.month:
+        try:
+            parsed = datetime.strptime(args.month, '%Y-%m')
+        except ValueError:
+            parser.error("--month must look like 2026-09")
+        month = (parsed.year, parsed.month)
+    if args.pdf:
+        try:
+            import weasyprint  # noqa: F401
+        except ImportError:
+            parser.error("--pdf needs weasyprint (pip install weasyprint)")
+
+    paths = find_ledgers(args.input_dir)
+    if not paths:
+        print(f"No ledgers found in {args.input_dir}", file=sys.stderr)
+        return 1
+
+    results, failures, wall = run_batch(paths, args.output, args.workers, args.salary, args.emergency_target,
+                                        process=process_statement, month=month, goals=args.goals, pdf=args.pdf,
+                                        fx_rates=args.fx_rates)
+
+    for name, error in failures:
+        print(f"FAILED {name}: {error}", file=sys.stderr)
+
+    if results:
+        latencies = np.array([seconds for _, _, seconds in results]) * 1000
+        total_rows = sum(rows for _, rows, _ in results)
+        print(f"Rendered {len(results)} statements ({total_rows:,} rows) in {wall:.2f}s "
+              f"with {args.workers} workers")
+        print(f"Throughput: {len(results) / wall:.1f} statements/s")
+        print(f"Per-statement latency: p50 {np.percentile(latencies, 50):.0f} ms, "
+              f"p95 {np.percentile(latencies, 95):.0f} ms, max {latencies.max():.0f} ms")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
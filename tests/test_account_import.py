@@ -0,0 +1,81 @@
+import io
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from account_import import TRANSFER_WORDS, detect_transfers, expand_uploads, merge_sorted, new_rows, parse_files
+from budget_analytics import clean_expenses
+
+
+def csv(*rows, header="Date,Category,Amount,Description"):
+    return "\n".join((header,) + rows).encode()
+
+
+def imported(*files):
+    batch, days, credits = merge_sorted(parse_files(list(files)))
+    return batch, detect_transfers(batch, days, credits)
+
+
+def test_transfer_wording_without_counterpart_is_spending():
+    batch, transfer_to = imported(("checking.csv", csv("2025-03-01,Bills,900,Wire transfer to landlord",
+                                                       "2025-03-02,Food,12,Cafe",
+                                                       "2025-03-03,Other,-40,Refund")))
+    assert len(batch) == 2
+    assert list(transfer_to) == ['', '']
+
+
+def test_credit_without_matching_expense_is_ignored():
+    batch, transfer_to = imported(("checking.csv", csv("2025-03-01,Food,25,Grocer")),
+                                  ("savings.csv", csv("2025-03-02,Other,-500,Deposit")))
+    assert list(transfer_to) == ['']
+
+
+def test_expense_matched_by_credit_in_other_account():
+    batch, transfer_to = imported(("checking.csv", csv("2025-03-01,Bills,500,CARD PAYMENT VISA",
+                                                       "2025-03-02,Food,45.5,Grocer")),
+                                  ("visa.csv", csv("2025-03-03,Other,-500,PAYMENT THANK YOU")))
+    by_description = dict(zip(batch['Description'].astype(str), transfer_to))
+    assert by_description == {'CARD PAYMENT VISA': 'visa', 'Grocer': ''}
+
+
+def test_worded_legs_in_two_accounts_are_both_transfers():
+    batch, transfer_to = imported(("checking.csv", csv("2025-03-01,Other,250,Transfer to savings")),
+                                  ("savings.csv", csv("2025-03-02,Other,250,Interest adjustment")))
+    assert sorted(transfer_to) == ['checking', 'savings']
+
+
+def test_transfers_outside_the_window_are_not_matched():
+    _, transfer_to = imported(("checking.csv", csv("2025-03-01,Other,250,Transfer to savings")),
+                              ("savings.csv", csv("2025-03-20,Other,250,Deposit")))
+    assert list(transfer_to) == ['', '']
+
+
+def test_bare_payment_is_not_transfer_wording():
+    assert not TRANSFER_WORDS.search("Loan payment")
+    assert TRANSFER_WORDS.search("Payment - Thank You")
+
+
+def test_parse_reports_missing_columns_per_file():
+    parsed = parse_files([("bad.csv", b"Date,Category\n2025-01-01,Food\n"),
+                          ("good.csv", csv("2025-01-01,Food,5,Cafe"))])
+    assert parsed[0]['error'] == "missing columns: Amount"
+    assert len(parsed[1]['expenses']) == 1
+
+
+def test_expand_uploads_unpacks_zip_csvs():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr("exports/visa.csv", csv("2025-01-01,Food,5,Cafe"))
+        archive.writestr("__MACOSX/exports/._visa.csv", b"")
+        archive.writestr("readme.txt", b"")
+    assert [name for name, _ in expand_uploads([("all.zip", buffer.getvalue())])] == ["exports/visa.csv"]
+
+
+def test_new_rows_skips_duplicates_and_matches_rows_without_account():
+    ledger = clean_expenses(pd.DataFrame({'Date': ['2025-01-02', '2025-01-04'], 'Category': ['Food', 'Food'],
+                                          'Amount': [5.0, 7.0], 'Account': ['', 'visa']}))
+    batch = clean_expenses(pd.DataFrame({'Date': ['2025-01-02', '2025-01-03', '2025-01-04', '2025-01-04'],
+                                         'Category': ['Food'] * 4, 'Amount': [5.0, 6.0, 7.0, 7.0],
+                                         'Account': ['visa', 'visa', 'visa', 'checking']}))
+    assert np.array_equal(new_rows(ledger, batch), [False, True, False, True])
@@ -0,0 +1,90 @@
+import http.client
+import json
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from budget_analytics import EMERGENCY_FUND_TARGET
+from budget_api import LedgerSource, make_server
+
+
+@pytest.fixture
+def api(tmp_path):
+    """(GET function returning (status, headers, JSON body), ledger path) for a served ledger"""
+    rng = np.random.default_rng(0)
+    days = pd.date_range('2025-01-01', periods=60, freq='D')
+    path = tmp_path / 'expenses.csv'
+    pd.DataFrame({
+        'Date': days.strftime('%Y-%m-%d'),
+        'Category': rng.choice(['Food', 'Bills', 'Shopping'], len(days)),
+        'Amount': rng.uniform(5, 50, len(days)).round(2),
+        'Description': 'Store',
+    }).to_csv(path, index=False)
+    goals = [{'name': 'Laptop', 'target_amount': 1500, 'priority': 'High', 'target_year': 2027, 'target_month': 6}]
+    server = make_server(LedgerSource(path, 4000, None, goals, fx_rates=None), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def get(url, headers=None):
+        connection = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=30)
+        connection.request('GET', url, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        connection.close()
+        return response.status, response, json.loads(body) if body else None
+
+    yield get, path
+    server.shutdown()
+    server.server_close()
+
+
+def test_endpoints_answer_with_json(api):
+    get, _ = api
+    status, _, body = get('/health')
+    assert (status, body) == (200, {'status': 'ok', 'rows': 60})
+    status, _, body = get('/categories')
+    assert status == 200
+    assert {c['Category'] for c in body['categories']} <= {'Food', 'Bills', 'Shopping'}
+    assert body['total'] == pytest.approx(sum(c['Amount'] for c in body['categories']))
+    for url in ('/monthly', '/savings', '/goals', '/predictions', '/anomalies'):
+        status, _, body = get(url)
+        assert status == 200, url
+        assert 'error' not in body, url
+
+
+def test_unknown_endpoint_is_404(api):
+    get, _ = api
+    assert get('/nope')[0] == 404
+
+
+@pytest.mark.parametrize('limit', ['x', '1.5', '-1'])
+def test_bad_limit_is_400(api, limit):
+    get, _ = api
+    status, _, body = get(f'/anomalies?limit={limit}')
+    assert status == 400
+    assert 'limit' in body['error']
+
+
+def test_limit_caps_anomalies(api):
+    get, _ = api
+    status, _, body = get('/anomalies?limit=0')
+    assert status == 200
+    assert body['anomalies'] == []
+
+
+def test_etag_revalidation_and_ledger_changes(api):
+    get, path = api
+    _, response, _ = get('/categories')
+    etag = response.getheader('ETag')
+    assert get('/categories', {'If-None-Match': etag})[0] == 304
+    with open(path, 'a') as f:
+        f.write("2025-03-05,Food,12.5,Extra row\n")
+    status, response, body = get('/health', {'If-None-Match': etag})
+    assert (status, body['rows']) == (200, 61)
+    assert response.getheader('ETag') != etag
+
+
+def test_default_emergency_target_is_shared(tmp_path):
+    assert LedgerSource(tmp_path / 'x.csv', 4000).emergency_fund_target == EMERGENCY_FUND_TARGET
+    assert LedgerSource(tmp_path / 'x.csv', 4000, 0).emergency_fund_target == 0
@@ -0,0 +1,27 @@
+import pandas as pd
+import pytest
+
+from budget_batch import find_ledgers, load_ledger
+
+RAW = pd.DataFrame({'Date': ['2025-01-01', '2025-01-02', 'not a date'],
+                    'Category': ['Food', 'Bills', 'Food'],
+                    'Amount': [4.5, 120.0, 3.0],
+                    'Description': ['Coffee', 'Power', 'Bad row']})
+
+
+@pytest.mark.parametrize('name', ['ledger.parquet', 'LEDGER.PARQUET', 'ledger.csv', 'LEDGER.CSV'])
+def test_load_ledger_reads_csv_and_parquet_in_any_case(tmp_path, name):
+    path = tmp_path / name
+    if path.suffix.lower() == '.parquet':
+        RAW.to_parquet(path)
+    else:
+        RAW.to_csv(path, index=False)
+    assert find_ledgers(tmp_path) == [path]
+    assert load_ledger(path)['Amount'].tolist() == [4.5, 120.0]
+
+
+def test_load_ledger_rejects_missing_columns(tmp_path):
+    path = tmp_path / 'ledger.csv'
+    RAW.drop(columns=['Category']).to_csv(path, index=False)
+    with pytest.raises(ValueError, match='missing columns: Category'):
+        load_ledger(path)
@@ -0,0 +1,54 @@
+import gc
+
+import numpy as np
+import pandas as pd
+
+from budget_analytics import clean_expenses
+from ledger_archive import LedgerArchive
+from income_ledger import month_index
+
+
+def ledger(months):
+    return clean_expenses(pd.DataFrame({
+        'Date': pd.date_range('2024-01-01', periods=months, freq='MS'),
+        'Category': 'Food',
+        'Amount': np.arange(months) + 1.0,
+        'Description': 'Grocery store',
+    }))
+
+
+def test_created_directory_is_removed_on_close(tmp_path):
+    archive = LedgerArchive.create(tmp_path)
+    archive.append(ledger(3))
+    directory = archive.directory
+    assert directory.exists()
+    archive.close()
+    assert not directory.exists()
+
+
+def test_created_directory_is_removed_with_the_archive(tmp_path):
+    archive = LedgerArchive.create(tmp_path)
+    archive.append(ledger(3))
+    directory = archive.directory
+    del archive
+    gc.collect()
+    assert not directory.exists()
+
+
+def test_opened_directory_is_kept(tmp_path):
+    LedgerArchive(tmp_path).append(ledger(3))
+    archive = LedgerArchive(tmp_path)
+    archive.close()
+    assert archive.rows == 3
+    assert list(tmp_path.glob('*.arrow'))
+
+
+def test_read_filters_months_across_segments(tmp_path):
+    archive = LedgerArchive.create(tmp_path)
+    archive.append(ledger(6).iloc[:3])
+    archive.append(ledger(6).iloc[3:])
+    assert archive.read()['Amount'].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    march, may = month_index(2024, 3), month_index(2024, 5)
+    assert archive.read(march, may)['Amount'].tolist() == [3.0, 4.0, 5.0]
+    assert archive.read(march, may, columns=['Amount']).columns.tolist() == ['Amount']
+    assert archive.rollup['Amount'].sum() == 21.0
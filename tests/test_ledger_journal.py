@@ -0,0 +1,87 @@
+import pandas as pd
+
+import ledger_journal
+from budget_analytics import clean_expenses
+from ledger_journal import LedgerJournal
+
+
+def ledger(n, start=0):
+    return clean_expenses(pd.DataFrame({
+        'Date': pd.date_range('2025-01-01', periods=n, freq='h') + pd.Timedelta(hours=start),
+        'Category': 'Food',
+        'Amount': [float(i + 1) for i in range(start, start + n)],
+        'Description': [f"Shop {i}" for i in range(start, start + n)],
+    }))
+
+
+def test_append_undo_redo():
+    journal = LedgerJournal(ledger(3))
+    journal.append(ledger(2, start=3))
+    assert len(journal.expenses()) == 5
+    assert journal.can_undo and not journal.can_redo
+
+    journal.undo()
+    assert journal.position == 0
+    assert journal.expenses()['Amount'].tolist() == [1.0, 2.0, 3.0]
+    assert journal.can_redo
+
+    journal.redo()
+    assert journal.expenses()['Amount'].tolist() == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_new_change_discards_redo_branch():
+    journal = LedgerJournal(ledger(3))
+    journal.append(ledger(1, start=3))
+    journal.undo()
+    journal.delete_rows(lambda chunk: chunk['Amount'] != 2.0)
+    assert not journal.can_redo
+    assert [v['Change'] for v in journal.history()] == ['Start', 'Delete expenses']
+    assert journal.expenses()['Amount'].tolist() == [1.0, 3.0]
+
+
+def test_restore_is_an_undoable_change():
+    journal = LedgerJournal(ledger(3))
+    journal.append(ledger(2, start=3))
+    journal.restore(0)
+    assert journal.current.rows == 3
+    assert journal.current.label == 'Restore: Start'
+    journal.undo()
+    assert journal.current.rows == 5
+
+
+def test_goal_changes_keep_the_ledger_revision():
+    journal = LedgerJournal(ledger(3))
+    revision = journal.ledger_revision
+    journal.set_goals([{'name': 'Car'}])
+    assert journal.ledger_revision == revision
+    journal.append(ledger(1, start=3))
+    assert journal.ledger_revision != revision
+
+
+def test_history_is_capped():
+    journal = LedgerJournal(ledger(1), max_versions=5)
+    for i in range(10):
+        journal.append(ledger(1, start=i + 1))
+    assert len(journal.versions) == 5
+    assert journal.current.rows == 11
+
+
+def test_compaction_merges_the_small_tail_only(monkeypatch):
+    monkeypatch.setattr(ledger_journal, 'SEALED_ROWS', 10)
+    monkeypatch.setattr(ledger_journal, 'MAX_SMALL_CHUNKS', 4)
+    journal = LedgerJournal(ledger(20))
+    sealed = journal.current.chunks[0]
+    rows = 20
+    for _ in range(30):
+        journal.append(ledger(1, start=rows))
+        rows += 1
+        chunks = journal.current.chunks
+        # The sealed run is never copied again, and the tail stays bounded
+        assert chunks[0] is sealed
+        assert len(chunks) <= 1 + (rows - 20) // 10 + 4
+    assert journal.expenses()['Amount'].tolist() == [float(i + 1) for i in range(rows)]
+    # Merged runs that reached the sealed size are shared by later versions as well
+    runs = journal.current.chunks
+    assert all(len(c) >= 10 for c in runs[:-4])
+    journal.append(ledger(1, start=rows))
+    assert all(a is b for a, b in zip(runs[:-4], journal.current.chunks))
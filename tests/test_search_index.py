@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from budget_analytics import clean_expenses
+from search_index import DescriptionIndex, match_summary, tokenize
+
+
+def ledger(*rows):
+    return clean_expenses(pd.DataFrame(rows, columns=['Date', 'Category', 'Amount', 'Description']))
+
+
+LEDGER = ledger(('2025-01-01', 'Entertainment', 15.49, 'Netflix subscription'),
+                ('2025-01-02', 'Food', 4.50, 'Coffee shop'),
+                ('2025-01-03', 'Food', 3.75, 'coffee SHOP downtown'),
+                ('2025-01-04', 'Bills', 1200.0, 'Rent'),
+                ('2025-02-01', 'Entertainment', 15.49, 'Netflix subscription'))
+
+
+def test_tokenize_lowercases_and_drops_punctuation():
+    assert tokenize("Coffee-Shop #12!") == ['coffee', 'shop', '12']
+
+
+def test_terms_match_as_prefixes_and_all_must_match():
+    index = DescriptionIndex.from_ledger(LEDGER)
+    assert index.search("net").tolist() == [0, 4]
+    assert index.search("cof sh").tolist() == [1, 2]
+    assert index.search("coffee rent").tolist() == []
+
+
+def test_query_without_terms_matches_nothing():
+    index = DescriptionIndex.from_ledger(LEDGER)
+    for query in ("!!!", "-", "   "):
+        rows = index.search(query)
+        assert len(rows) == 0
+        assert match_summary(LEDGER, rows)['count'] == 0
+
+
+def test_unknown_term_matches_nothing():
+    assert DescriptionIndex.from_ledger(LEDGER).search("zzz").tolist() == []
+
+
+def test_extend_indexes_only_new_rows_and_rebuilds_after_shrink():
+    index = DescriptionIndex.from_ledger(LEDGER.iloc[:3])
+    assert index.search("netflix").tolist() == [0]
+    index.extend(LEDGER)
+    assert index.rows == len(LEDGER)
+    assert index.search("netflix").tolist() == [0, 4]
+    assert index.search("rent").tolist() == [3]
+
+    index.extend(LEDGER.iloc[1:3].reset_index(drop=True))
+    assert index.rows == 2
+    assert index.search("netflix").tolist() == []
+    assert index.search("coffee").tolist() == [0, 1]
+
+
+def test_match_summary_totals_by_category():
+    rows = DescriptionIndex.from_ledger(LEDGER).search("netflix")
+    summary = match_summary(LEDGER, rows)
+    assert summary['count'] == 2
+    assert np.isclose(summary['total'], 30.98)
+    assert summary['category_totals'].to_dict() == {'Entertainment': 30.98}